@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Throughput and peak memory of --batch scoring with and without --pipeline.
+
+Writes ``--files`` synthetic proposals of ``--size`` for each count and
+scores them in a fresh process per path: ``pool`` is :func:`run_batch`,
+``pipeline`` is :class:`BatchPipeline`. Each child reports its wall time,
+the peak RSS of the parent process (where texts and results queue up)
+and, for the pipeline, its per-stage stats. Peak RSS should stay flat as
+the number of files grows, and both paths must write the same results.
+
+Usage:
+    python benchmarks/batch_pipeline.py
+    python benchmarks/batch_pipeline.py --files 1000,10000 --workers 8 -o pipeline.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from corpus import format_size, generate_proposal, parse_size  # noqa: E402
+
+PATHS = ('pool', 'pipeline')
+
+
+def max_rss() -> int:
+    """Peak resident set size of this process so far, in bytes."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def child(path_kind: str, directory: str, workers: int, output: str) -> Dict:
+    """Score every file in ``directory`` one way in this process."""
+    import asyncio
+    from score_proposal import BatchPipeline, ProposalScorer, collect_batch_files, run_batch
+    scorer = ProposalScorer(tokenizer='regex')
+    paths = collect_batch_files(directory)
+    entry = {}
+
+    start = time.perf_counter()
+    with open(output, 'w', encoding='utf-8') as out:
+        if path_kind == 'pool':
+            run_batch(scorer, paths, out, workers)
+        else:
+            pipeline = BatchPipeline(scorer, out, workers=workers)
+            asyncio.run(pipeline.run(paths))
+            entry['stats'] = pipeline.stats()
+    entry.update({
+        'seconds': time.perf_counter() - start,
+        'peak_rss_bytes': max_rss(),
+    })
+    return entry
+
+
+def measure(path_kind: str, directory: str, workers: int, output: str) -> Dict:
+    """Run :func:`child` in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child',
+         path_kind, directory, str(workers), output],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(out.stdout)
+
+
+def scores(output: str) -> Dict[str, float]:
+    """Total score per file of an NDJSON output."""
+    with open(output, 'r', encoding='utf-8') as f:
+        return {
+            record['file']: record.get('total_score')
+            for record in map(json.loads, f)
+        }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Compare the pool and pipeline batch paths."""
+    parser = argparse.ArgumentParser(description='Measure --batch with and without --pipeline')
+    parser.add_argument('--files', default='200,2000',
+                        help='Comma-separated file counts (default: 200,2000)')
+    parser.add_argument('--size', default='20KB', help='Size of each proposal (default: 20KB)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Scoring worker processes (default: CPU count)')
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        path_kind, directory, workers, output = args.child
+        print(json.dumps(child(path_kind, directory, int(workers), output)))
+        return
+
+    size = parse_size(args.size)
+    report = {'size': format_size(size), 'workers': args.workers, 'results': []}
+    with tempfile.TemporaryDirectory() as tmp:
+        written = 0
+        for count in (int(c) for c in args.files.split(',') if c.strip()):
+            directory = os.path.join(tmp, 'proposals')
+            os.makedirs(directory, exist_ok=True)
+            # Counts grow, so each one adds to the files of the last
+            for i in range(written, count):
+                with open(os.path.join(directory, f'proposal_{i:06d}.txt'), 'w',
+                          encoding='utf-8') as f:
+                    f.write(generate_proposal(size, density=(i % 10) / 10, seed=i))
+            written = max(written, count)
+
+            entry = {'files': count}
+            outputs = {}
+            for path_kind in PATHS:
+                outputs[path_kind] = os.path.join(tmp, f'{path_kind}.jsonl')
+                entry[path_kind] = measure(path_kind, directory, args.workers,
+                                           outputs[path_kind])
+                print(f"{count:>7} files  {path_kind:<8} {entry[path_kind]['seconds']:>7.2f} s   "
+                      f"{count / entry[path_kind]['seconds']:>7.1f} files/s   "
+                      f"peak {entry[path_kind]['peak_rss_bytes'] / (1 << 20):>7.1f} MB",
+                      file=sys.stderr)
+            if scores(outputs['pool']) != scores(outputs['pipeline']):
+                print("Error: pool and pipeline paths scored differently")
+                sys.exit(1)
+            report['results'].append(entry)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Synthetic HVAC proposal generator for the scoring benchmarks.
+
+Proposals are assembled from filler sentences and sentences built around
+rubric keywords, so their size and keyword density can be dialled in
+independently. Output is deterministic for a given seed, which keeps
+benchmark runs comparable between commits.
+
+Usage:
+    python benchmarks/corpus.py --size 10MB --density 0.3 -o big.txt
+    python benchmarks/corpus.py --size 64KB --count 200 -o corpus/
+"""
+
+import argparse
+import os
+import random
+import sys
+from typing import List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from score_proposal import ProposalScorer  # noqa: E402
+
+FILLER = [
+    "The service team covers {n} counties from two branch offices.",
+    "Technicians currently handle around {n} calls per week during peak season.",
+    "Our customers are mostly residential with a growing light commercial base.",
+    "Scheduling is done by two dispatchers working from a shared whiteboard.",
+    "Most equipment in the field is between {n} and {m} years old.",
+    "The warehouse stocks common parts for the top {n} unit models.",
+    "Management reviews branch performance at a monthly operations meeting.",
+    "Summer demand roughly doubles the call volume compared to spring.",
+    "Several senior technicians are expected to retire within {n} years.",
+    "Invoices are prepared at the end of each job and emailed the same day.",
+]
+
+KEYWORD_SENTENCES = [
+    "We will address {kw} as part of the first phase.",
+    "The plan for {kw} was reviewed with the operations manager.",
+    "Our approach to {kw} is described in the appendix.",
+    "A clear owner is assigned for {kw} and reports weekly.",
+    "{kw} is tracked against the agreed targets for {n} days.",
+]
+
+CONTRADICTIONS = [
+    "We will use existing data but the data is not ready.",
+    "The pilot covers dispatch however the scope is not defined.",
+]
+
+SIZE_UNITS = {'B': 1, 'KB': 1 << 10, 'MB': 1 << 20, 'GB': 1 << 30}
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a human-readable size such as ``512``, ``64KB`` or ``100MB``.
+
+    Args:
+        value: Size with an optional B/KB/MB/GB suffix
+
+    Returns:
+        Size in bytes
+    """
+    text = value.strip().upper()
+    for unit in sorted(SIZE_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * SIZE_UNITS[unit])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    """Render a byte count with the largest unit that divides it evenly."""
+    for unit in ('GB', 'MB', 'KB'):
+        if size >= SIZE_UNITS[unit] and size % SIZE_UNITS[unit] == 0:
+            return f"{size // SIZE_UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def generate_sentences(
+    count: int,
+    density: float = 0.3,
+    contradiction_rate: float = 0.01,
+    seed: int = 0,
+    rubric: Optional[dict] = None
+) -> List[str]:
+    """
+    Generate synthetic proposal sentences.
+
+    Args:
+        count: Number of sentences
+        density: Fraction of sentences that mention a rubric keyword
+        contradiction_rate: Fraction of sentences that are contradictions
+        seed: Random seed
+        rubric: Rubric to draw keywords from (default: ProposalScorer.RUBRIC)
+
+    Returns:
+        List of sentences
+    """
+    rng = random.Random(seed)
+    rubric = rubric or ProposalScorer.RUBRIC
+    keywords = [kw for config in rubric.values() for kw in config['keywords']]
+
+    sentences = []
+    for _ in range(count):
+        roll = rng.random()
+        n = rng.randint(2, 60)
+        if roll < contradiction_rate:
+            sentence = rng.choice(CONTRADICTIONS)
+        elif roll < contradiction_rate + density:
+            sentence = rng.choice(KEYWORD_SENTENCES).format(kw=rng.choice(keywords), n=n)
+            sentence = sentence[0].upper() + sentence[1:]
+        else:
+            sentence = rng.choice(FILLER).format(n=n, m=n + rng.randint(1, 10))
+        sentences.append(sentence)
+    return sentences
+
+
+def generate_proposal(
+    size: int,
+    density: float = 0.3,
+    contradiction_rate: float = 0.01,
+    seed: int = 0
+) -> str:
+    """
+    Generate a synthetic proposal of roughly ``size`` bytes.
+
+    Large proposals repeat a block of generated paragraphs rather than
+    drawing every sentence, so a 100MB document builds in about a second.
+
+    Args:
+        size: Target size in bytes (the result is within one sentence)
+        density: Fraction of sentences that mention a rubric keyword
+        contradiction_rate: Fraction of sentences that are contradictions
+        seed: Random seed
+
+    Returns:
+        Proposal text
+    """
+    block_sentences = max(1, min(size // 60, 20_000))
+    sentences = generate_sentences(block_sentences, density, contradiction_rate, seed)
+    paragraphs = [' '.join(sentences[i:i + 6]) for i in range(0, len(sentences), 6)]
+    block = '\n\n'.join(paragraphs) + '\n\n'
+
+    text = block * (size // len(block)) + block[:size % len(block)]
+    # Trim the tail back to a sentence boundary
+    cut = text.rfind('.')
+    return text[:cut + 1] if cut > 0 else text
+
+
+def main(argv: Optional[List[str]] = None):
+    """Write synthetic proposals to a file or directory."""
+    parser = argparse.ArgumentParser(description='Generate synthetic HVAC proposals')
+    parser.add_argument('--size', default='8KB', help='Size per proposal, e.g. 1KB, 100MB')
+    parser.add_argument('--density', type=float, default=0.3,
+                        help='Fraction of sentences mentioning a rubric keyword')
+    parser.add_argument('--contradictions', type=float, default=0.01,
+                        help='Fraction of contradictory sentences')
+    parser.add_argument('--count', type=int, default=1, help='Number of proposals')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('-o', '--output', help='Output file (or directory with --count > 1)')
+    args = parser.parse_args(argv)
+
+    size = parse_size(args.size)
+    if args.count == 1:
+        text = generate_proposal(size, args.density, args.contradictions, args.seed)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text)
+        else:
+            sys.stdout.write(text)
+        return
+
+    if not args.output:
+        print("Error: --count > 1 requires an output directory")
+        sys.exit(1)
+    os.makedirs(args.output, exist_ok=True)
+    for i in range(args.count):
+        text = generate_proposal(size, args.density, args.contradictions, args.seed + i)
+        with open(os.path.join(args.output, f'proposal_{i:05d}.txt'), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
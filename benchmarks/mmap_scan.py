@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Peak memory of scoring a plain-text proposal read whole versus mapped.
+
+Writes one synthetic proposal of ``--size`` and scores it in a fresh
+process per path. The ``read`` path decodes the file into a str and calls
+``score_proposal``. The ``mmap`` path calls ``score_file``, which scans
+the mapped bytes in blocks. Each child reports its resident set size
+after start-up and its peak RSS (``ru_maxrss``) once scored, and both
+paths must produce the same total score.
+
+Usage:
+    python benchmarks/mmap_scan.py
+    python benchmarks/mmap_scan.py --size 500MB -o mmap.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from corpus import format_size, parse_size  # noqa: E402
+
+PATHS = ('read', 'mmap')
+
+
+def max_rss() -> int:
+    """Peak resident set size of this process so far, in bytes."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def child(path_kind: str, path: str) -> Dict:
+    """Score ``path`` one way in this process and measure it."""
+    from score_proposal import ProposalScorer
+    scorer = ProposalScorer(tokenizer='regex')
+    scorer.load_resources()
+    startup = max_rss()
+
+    start = time.perf_counter()
+    if path_kind == 'read':
+        with open(path, 'r', encoding='utf-8') as f:
+            results = scorer.score_proposal(f.read(), use_cache=False)
+    else:
+        results = scorer.score_file(path, use_cache=False)
+    return {
+        'seconds': time.perf_counter() - start,
+        'startup_rss_bytes': startup,
+        'peak_rss_bytes': max_rss(),
+        'total_score': results['total_score'],
+    }
+
+
+def measure(path_kind: str, path: str) -> Dict:
+    """Run :func:`child` in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', path_kind, path],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(out.stdout)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Compare peak RSS of the read and mmap paths."""
+    parser = argparse.ArgumentParser(description='Measure peak RSS of read vs mmap scoring')
+    parser.add_argument('--size', default='100MB', help='Proposal size, e.g. 10MB, 1GB')
+    parser.add_argument('--density', type=float, default=0.3,
+                        help='Fraction of sentences mentioning a rubric keyword')
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+    parser.add_argument('--child', nargs=2, metavar=('PATH_KIND', 'FILE'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(child(*args.child)))
+        return
+
+    size = parse_size(args.size)
+    report = {'size': format_size(size), 'paths': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Generated in its own process: Linux children inherit the peak
+        # RSS of the process they were forked from
+        path = os.path.join(tmp, 'proposal.txt')
+        subprocess.run(
+            [sys.executable, os.path.join(HERE, 'corpus.py'), '--size', str(size),
+             '--density', str(args.density), '-o', path],
+            check=True
+        )
+        for path_kind in PATHS:
+            entry = report['paths'][path_kind] = measure(path_kind, path)
+            print(f"{path_kind:<5} {entry['seconds']:>8.2f} s   "
+                  f"startup {entry['startup_rss_bytes'] / (1 << 20):>7.1f} MB   "
+                  f"peak {entry['peak_rss_bytes'] / (1 << 20):>8.1f} MB", file=sys.stderr)
+
+    read, mapped = report['paths']['read'], report['paths']['mmap']
+    if read['total_score'] != mapped['total_score']:
+        print("Error: read and mmap paths scored differently")
+        sys.exit(1)
+    report['peak_rss_saved'] = 1 - mapped['peak_rss_bytes'] / read['peak_rss_bytes']
+    print(f"peak RSS {report['peak_rss_saved']:.0%} lower with mmap", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
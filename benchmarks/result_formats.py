@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Memory and output size of scoring results in bulk.
+
+Scores a set of synthetic proposals, then measures (1) the memory held
+by ``--count`` results kept as ``score_proposal`` dicts versus
+``ScoreResult`` objects, and (2) the bytes per result of each bulk
+output format next to the pretty-printed ``--json`` output. Results
+are copied through pickle, as they arrive from batch worker processes,
+so they do not share strings with the scorer.
+
+Usage:
+    python benchmarks/result_formats.py
+    python benchmarks/result_formats.py --count 100000 -o formats.json
+"""
+
+import argparse
+import io
+import json
+import os
+import pickle
+import sys
+import tracemalloc
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from corpus import generate_proposal  # noqa: E402
+from score_proposal import (  # noqa: E402
+    OUTPUT_FORMATS, OutputError, ProposalScorer, ScoreResult
+)
+
+
+def sample_results(count: int, distinct: int, size: int) -> List[Dict]:
+    """``count`` results cycling through ``distinct`` scored proposals."""
+    scorer = ProposalScorer(tokenizer='regex')
+    scored = [
+        pickle.dumps(scorer.score_proposal(generate_proposal(size, density=i / distinct, seed=i)))
+        for i in range(distinct)
+    ]
+    return [pickle.loads(scored[i % distinct]) for i in range(count)]
+
+
+def held_bytes(build) -> int:
+    """Bytes still allocated by the object ``build()`` returns."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def memory(results: List[Dict]) -> Dict:
+    """Memory of the results as dicts and as ScoreResult objects."""
+    pickled = [pickle.dumps(result) for result in results]
+    as_dicts = held_bytes(lambda: [pickle.loads(data) for data in pickled])
+    as_objects = held_bytes(lambda: [ScoreResult.from_dict(pickle.loads(data)) for data in pickled])
+    return {
+        'dict_bytes_per_result': as_dicts / len(results),
+        'score_result_bytes_per_result': as_objects / len(results),
+        'saved': 1 - as_objects / as_dicts,
+    }
+
+
+def output_sizes(results: List[Dict]) -> Dict[str, Dict]:
+    """Bytes per result of --json and of each bulk output format."""
+    pretty = sum(len(json.dumps(result, indent=2).encode('utf-8')) for result in results)
+    sizes = {'json (indent=2)': {'bytes_per_result': pretty / len(results)}}
+    for name, writer_class in sorted(OUTPUT_FORMATS.items()):
+        out = io.BytesIO() if writer_class.binary else io.StringIO()
+        try:
+            writer = writer_class(out)
+        except OutputError as e:
+            sizes[name] = {'error': str(e)}
+            continue
+        for i, result in enumerate(results):
+            writer.write(f'proposals/proposal_{i:06d}.txt', result)
+        writer.close()
+        data = out.getvalue()
+        nbytes = len(data if writer_class.binary else data.encode('utf-8'))
+        sizes[name] = {
+            'bytes_per_result': nbytes / len(results),
+            'vs_json': nbytes / pretty,
+        }
+    return sizes
+
+
+def main(argv: Optional[List[str]] = None):
+    """Measure result memory and output sizes."""
+    parser = argparse.ArgumentParser(description='Measure bulk result memory and output size')
+    parser.add_argument('--count', type=int, default=20_000, help='Results to hold and write')
+    parser.add_argument('--distinct', type=int, default=50, help='Distinct proposals scored')
+    parser.add_argument('--size', type=int, default=4096, help='Proposal size in bytes')
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    results = sample_results(args.count, args.distinct, args.size)
+    report = {
+        'count': args.count,
+        'memory': memory(results),
+        'output': output_sizes(results),
+    }
+
+    mem = report['memory']
+    print(f"memory   dict {mem['dict_bytes_per_result']:>8.0f} B/result   "
+          f"ScoreResult {mem['score_result_bytes_per_result']:>8.0f} B/result   "
+          f"({mem['saved']:.0%} saved)", file=sys.stderr)
+    for name, entry in report['output'].items():
+        if 'error' in entry:
+            print(f"{name:<16} skipped: {entry['error']}", file=sys.stderr)
+        else:
+            ratio = f"  ({entry['vs_json']:.0%} of --json)" if 'vs_json' in entry else ''
+            print(f"{name:<16} {entry['bytes_per_result']:>8.0f} B/result{ratio}",
+                  file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for the proposal scoring engine.
+
+Times ``score_proposal`` end to end, its stages (tokenize, keyword
+matching, ``_score_category``, ``_detect_contradictions``,
+``format_report``) and the CLI as a subprocess, over synthetic proposals
+from ``corpus.py``, plus the module's import time (best of fresh
+interpreters under ``-X importtime``), which must stay under
+``--import-budget``. Results are written as JSON so runs from different
+commits can be compared with ``--compare``.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1KB,1MB,100MB --density 0.5
+    python benchmarks/run_benchmarks.py -o after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from corpus import format_size, generate_proposal, parse_size  # noqa: E402
+from score_proposal import ProposalScorer, __version__  # noqa: E402
+
+DEFAULT_SIZES = '1KB,10KB,100KB,1MB,10MB'
+IMPORT_BUDGET_MS = 50.0
+STAGES = (
+    'tokenize', 'match', 'score_category', 'detect_contradictions',
+    'score_proposal', 'format_report', 'cli'
+)
+
+
+def time_call(func: Callable[[], object], repeat: int, budget: float) -> List[float]:
+    """
+    Time ``func`` up to ``repeat`` times, stopping early once ``budget``
+    seconds have been spent (it always runs at least once).
+
+    Returns:
+        Wall-clock seconds per run
+    """
+    runs = []
+    started = time.perf_counter()
+    while len(runs) < repeat:
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+        if time.perf_counter() - started > budget:
+            break
+    return runs
+
+
+def import_time(repeat: int) -> float:
+    """
+    Best import time of ``score_proposal`` over ``repeat`` fresh interpreters.
+
+    Returns:
+        Milliseconds, as reported by ``python -X importtime``
+    """
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # A warm bytecode cache of its own, so compilation is not counted
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=tmp)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        subprocess.run([sys.executable, '-c', 'import score_proposal'],
+                       cwd=ROOT, env=env, check=True)
+        for _ in range(repeat):
+            proc = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', 'import score_proposal'],
+                cwd=ROOT, env=env, check=True, capture_output=True, text=True
+            )
+            line = [l for l in proc.stderr.splitlines() if l.endswith('| score_proposal')][0]
+            timings.append(int(line.split('|')[1]) / 1000)
+    return min(timings)
+
+
+def git_commit() -> Optional[str]:
+    """Return the current commit hash, if ROOT is a git checkout."""
+    try:
+        out = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def stage_callables(scorer: ProposalScorer, text: str, path: str) -> Dict[str, Callable]:
+    """
+    Build a zero-argument callable per benchmark stage for one proposal.
+
+    Stages after tokenization reuse its output so each one is timed on
+    its own.
+    """
+    lowered = text.lower()
+    spans = scorer.tokenizer.sentence_spans(lowered)
+    matches = scorer.matcher.scan(lowered, spans)
+    results = scorer.score_proposal(text, use_cache=False)
+
+    def score_categories():
+        for index, (category, config) in enumerate(scorer.RUBRIC.items()):
+            scorer._score_category(
+                category, config,
+                matches.keywords_matched(index),
+                matches.relevant_sentences(index),
+                len(spans)
+            )
+
+    cli = [
+        sys.executable, os.path.join(ROOT, 'score_proposal.py'), path,
+        '--json', '--no-cache', '--tokenizer', scorer.tokenizer.name
+    ]
+    return {
+        'tokenize': lambda: scorer.tokenizer.tokenize(lowered),
+        'match': lambda: scorer.matcher.scan(lowered, spans),
+        'score_category': score_categories,
+        'detect_contradictions': lambda: scorer._detect_contradictions(lowered, spans, matches),
+        'score_proposal': lambda: scorer.score_proposal(text, use_cache=False),
+        'format_report': lambda: scorer.format_report(results),
+        'cli': lambda: subprocess.run(cli, check=True, stdout=subprocess.DEVNULL),
+    }
+
+
+def run(
+    sizes: List[int],
+    density: float,
+    tokenizer: str,
+    stages: List[str],
+    repeat: int,
+    budget: float
+) -> Dict:
+    """
+    Run the benchmark matrix.
+
+    Returns:
+        JSON-serializable report with run metadata and one entry per
+        (size, stage). A stage that raises is recorded with its error
+        instead of timings.
+    """
+    scorer = ProposalScorer(tokenizer=tokenizer)
+    scorer.load_resources()
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'scorer_version': __version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'tokenizer': tokenizer,
+            'density': density,
+        },
+        'results': [],
+    }
+    report['import_ms'] = import_time(repeat)
+    print(f"{'import':>7} {'score_proposal':<22} {report['import_ms']:>11.3f} ms", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            text = generate_proposal(size, density)
+            path = os.path.join(tmp, f'proposal_{size}.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            nbytes = len(text.encode('utf-8'))
+
+            callables = stage_callables(scorer, text, path)
+            for stage in stages:
+                entry = {'size': format_size(size), 'bytes': nbytes, 'stage': stage}
+                try:
+                    runs = time_call(callables[stage], repeat, budget)
+                except Exception as e:
+                    entry['error'] = f"{type(e).__name__}: {e}"
+                else:
+                    median = statistics.median(runs)
+                    entry.update({
+                        'runs': len(runs),
+                        'min': min(runs),
+                        'median': median,
+                        'mean': statistics.mean(runs),
+                        'mb_per_s': nbytes / (1 << 20) / median if median else None,
+                    })
+                report['results'].append(entry)
+                print(format_entry(entry), file=sys.stderr)
+    return report
+
+
+def format_entry(entry: Dict) -> str:
+    """Render one result entry as a table row."""
+    label = f"{entry['size']:>7} {entry['stage']:<22}"
+    if 'error' in entry:
+        return f"{label} ERROR {entry['error']}"
+    return (f"{label} {entry['median'] * 1000:>11.3f} ms"
+            f" {entry['mb_per_s'] or 0:>9.1f} MB/s  (n={entry['runs']})")
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> int:
+    """
+    Print median-time ratios of ``current`` against ``baseline``.
+
+    Args:
+        baseline: Report from an earlier run
+        current: Report from this run
+        threshold: Ratio above which a stage counts as a regression
+
+    Returns:
+        Number of regressions
+    """
+    before = {
+        (entry['size'], entry['stage']): entry
+        for entry in baseline['results'] if 'median' in entry
+    }
+    print(f"\nBaseline {baseline['meta'].get('commit')} -> "
+          f"current {current['meta'].get('commit')}")
+    regressions = 0
+    for entry in current['results']:
+        old = before.get((entry['size'], entry['stage']))
+        if old is None or 'median' not in entry:
+            continue
+        ratio = entry['median'] / old['median'] if old['median'] else float('inf')
+        flag = ''
+        if ratio > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{entry['size']:>7} {entry['stage']:<22} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point for the benchmark harness."""
+    parser = argparse.ArgumentParser(description='Benchmark the proposal scoring engine')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'Comma-separated proposal sizes (default: {DEFAULT_SIZES})')
+    parser.add_argument('--density', type=float, default=0.3,
+                        help='Fraction of sentences mentioning a rubric keyword')
+    parser.add_argument('--tokenizer', default='regex', help='Tokenizer backend (default: regex)')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help='Comma-separated stages to time (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='Maximum runs per stage')
+    parser.add_argument('--budget', type=float, default=5.0,
+                        help='Seconds per stage after which repeats stop early')
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='Compare against an earlier JSON report')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Slowdown ratio reported as a regression (default: 1.25)')
+    parser.add_argument('--import-budget', type=float, default=IMPORT_BUDGET_MS,
+                        help=f'Import time in ms above which the run fails '
+                             f'(default: {IMPORT_BUDGET_MS:g})')
+    args = parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        print(f"Error: Unknown stages: {', '.join(sorted(unknown))}")
+        sys.exit(1)
+
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    report = run(sizes, args.density, args.tokenizer, stages, args.repeat, args.budget)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    failed = report['import_ms'] > args.import_budget
+    if failed:
+        print(f"Import took {report['import_ms']:.1f} ms, over the "
+              f"{args.import_budget:g} ms budget", file=sys.stderr)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            failed = compare(json.load(f), report, args.threshold) > 0 or failed
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
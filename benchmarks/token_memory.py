@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Memory held by a tokenized proposal: lists of strings versus a Document.
+
+For each size, tokenizes one synthetic proposal the way ``score_proposal``
+does and measures (with tracemalloc) the bytes kept alive by the result.
+The ``lists`` representation is what the scorer held before documents
+were interned: sentence spans as a list of pairs and word tokens as a
+list of strings (per sentence in word mode, plus a token index of
+lists). The ``document`` representation is a :class:`Document` (plus its
+``TokenIndex`` in word mode). The shared vocabulary is warmed first, as
+it is in a long-running process, so its strings are not counted.
+
+Usage:
+    python benchmarks/token_memory.py
+    python benchmarks/token_memory.py --sizes 1MB,20MB --match word -o tokens.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from corpus import format_size, generate_proposal, parse_size  # noqa: E402
+from score_proposal import MATCH_MODES, ProposalScorer  # noqa: E402
+
+DEFAULT_SIZES = '100KB,1MB,10MB'
+
+
+def lists(scorer: ProposalScorer, text: str):
+    """The spans, word lists and (word/stem mode) list-based token index."""
+    tokenizer = scorer.tokenizer
+    spans = tokenizer.sentence_spans(text)
+    if scorer.match == 'substring':
+        return spans, tokenizer.words(text)
+
+    sentence_words = [tokenizer.words(text[start:end]) for start, end in spans]
+    normalize = scorer._matcher((scorer.rubric,)).normalize
+    tokens, sentence_of = [], []
+    for sentence, words in enumerate(sentence_words):
+        tokens.extend(map(normalize, words) if normalize else words)
+        sentence_of.extend([sentence] * len(words))
+    postings: Dict[str, List[int]] = {}
+    for position, token in enumerate(tokens):
+        postings.setdefault(token, []).append(position)
+    return spans, sentence_words, (tokens, sentence_of, postings)
+
+
+def document(scorer: ProposalScorer, text: str):
+    """The Document and (word/stem mode) TokenIndex the scorer builds."""
+    doc = scorer._tokenize(text)
+    if doc.sentence_starts is None:
+        return doc
+    return doc, scorer._matcher((scorer.rubric,)).index(doc)
+
+
+def held(build: Callable[[], object]) -> Dict:
+    """Bytes still allocated by the object ``build()`` returns, and its time."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    kept = build()
+    seconds = time.perf_counter() - start
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return {'bytes': after - before, 'seconds': seconds}
+
+
+def main(argv: Optional[List[str]] = None):
+    """Compare memory of list and Document tokenizations."""
+    parser = argparse.ArgumentParser(description='Measure memory of tokenized proposals')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'Comma-separated proposal sizes (default: {DEFAULT_SIZES})')
+    parser.add_argument('--density', type=float, default=0.3,
+                        help='Fraction of sentences mentioning a rubric keyword')
+    parser.add_argument('--tokenizer', default='regex', help='Tokenizer backend (default: regex)')
+    parser.add_argument('--match', default='substring', choices=MATCH_MODES,
+                        help='Keyword matching mode (default: substring)')
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    scorer = ProposalScorer(tokenizer=args.tokenizer, match=args.match)
+    scorer.load_resources()
+    report = {'tokenizer': args.tokenizer, 'match': args.match, 'results': []}
+    for size in (parse_size(s) for s in args.sizes.split(',') if s.strip()):
+        text = generate_proposal(size, args.density).lower()
+        scorer.score_proposal(text, use_cache=False)
+        entry = {
+            'size': format_size(size),
+            'tokens': len(scorer._tokenize(text).token_ids),
+            'lists': held(lambda: lists(scorer, text)),
+            'document': held(lambda: document(scorer, text)),
+        }
+        entry['ratio'] = entry['lists']['bytes'] / max(entry['document']['bytes'], 1)
+        report['results'].append(entry)
+        print(f"{entry['size']:>7}  lists {entry['lists']['bytes'] / entry['tokens']:>7.1f} B/token"
+              f"  document {entry['document']['bytes'] / entry['tokens']:>6.1f} B/token"
+              f"  ({entry['ratio']:.1f}x smaller)", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tokenization speed of the regex backend against NLTK.
+
+For each size, tokenizes one lowercased synthetic proposal with both
+backends (best of ``--repeat`` runs each) and reports seconds, MB/s and
+the regex speedup, along with the total score drift between them.
+Exits non-zero if any speedup is below ``--min-speedup``.
+
+Usage:
+    python benchmarks/tokenizer_speed.py
+    python benchmarks/tokenizer_speed.py --sizes 100KB,10MB --min-speedup 10 -o tokenizers.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from corpus import format_size, generate_proposal, parse_size  # noqa: E402
+from score_proposal import TOKENIZERS, ProposalScorer  # noqa: E402
+
+DEFAULT_SIZES = '10KB,100KB,1MB'
+
+
+def best_of(func, repeat: int) -> float:
+    """Fastest of ``repeat`` timed calls, in seconds."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return min(runs)
+
+
+def measure(text: str, repeat: int) -> Dict:
+    """Tokenize ``text`` with each backend and compare."""
+    lowered = text.lower()
+    nbytes = len(text.encode('utf-8'))
+    entry = {'bytes': nbytes, 'seconds': {}, 'mb_per_s': {}, 'total_score': {}}
+    for name in ('nltk', 'regex'):
+        tokenizer = TOKENIZERS[name]()
+        tokenizer.load()
+        seconds = best_of(lambda: tokenizer.tokenize(lowered), repeat)
+        entry['seconds'][name] = seconds
+        entry['mb_per_s'][name] = nbytes / (1 << 20) / seconds
+        scorer = ProposalScorer(tokenizer=name)
+        entry['total_score'][name] = scorer.score_proposal(text, use_cache=False)['total_score']
+    entry['speedup'] = entry['seconds']['nltk'] / entry['seconds']['regex']
+    entry['total_drift'] = round(entry['total_score']['regex'] - entry['total_score']['nltk'], 1)
+    return entry
+
+
+def main(argv: Optional[List[str]] = None):
+    """Compare tokenizer backends."""
+    parser = argparse.ArgumentParser(description='Measure regex vs NLTK tokenization speed')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f'Comma-separated proposal sizes (default: {DEFAULT_SIZES})')
+    parser.add_argument('--density', type=float, default=0.3,
+                        help='Fraction of sentences mentioning a rubric keyword')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per backend (best is kept)')
+    parser.add_argument('--min-speedup', type=float, default=10.0,
+                        help='Exit non-zero below this regex speedup (default: 10)')
+    parser.add_argument('-o', '--output', help='Write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    report = {'results': []}
+    slow = 0
+    for size in (parse_size(s) for s in args.sizes.split(',') if s.strip()):
+        entry = measure(generate_proposal(size, args.density), args.repeat)
+        entry['size'] = format_size(size)
+        report['results'].append(entry)
+        slow += entry['speedup'] < args.min_speedup
+        print(f"{entry['size']:>7}  nltk {entry['seconds']['nltk'] * 1000:>10.1f} ms  "
+              f"regex {entry['seconds']['regex'] * 1000:>8.1f} ms  "
+              f"{entry['speedup']:>6.1f}x  drift {entry['total_drift']:+.1f}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    sys.exit(1 if slow else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,23 @@ Usage:
     python score_proposal.py proposal.txt
     python score_proposal.py proposal.txt --verbose
     python score_proposal.py --interactive
+    python score_proposal.py proposal.pdf --json
+    python score_proposal.py proposal.txt --report-format html --output report.html
+    python score_proposal.py --batch proposals/ --workers 8
+    python score_proposal.py --watch intake/
+    python score_proposal.py --batch proposals/ --sections
+    python score_proposal.py --batch archive/ --pipeline --readers 8
+    python score_proposal.py serve --port 8765
+    python score_proposal.py proposal.txt --offline --nltk-data vendor/nltk_data
+    python score_proposal.py proposal.txt --rubric rubrics/northeast.yaml
+    python score_proposal.py --batch archive/ --corpus corpus.sqlite3 --record
+    python score_proposal.py analyze corpus.sqlite3
+
+NLTK is imported lazily and its data (punkt, stopwords) is loaded on first
+use. On air-gapped hosts, vendor the data once with
+``python -m nltk.downloader -d vendor/nltk_data punkt_tab stopwords`` and
+point the scorer at it with ``--nltk-data`` or ``HVAC_NLTK_DATA``;
+``--offline`` or ``HVAC_SCORER_OFFLINE=1`` disables downloads entirely.
 
 Author: Maurice - AI Arbitrage Coach
 License: MIT
@@ -16,391 +33,5953 @@ Version: 1.0.0
 """
 
 import argparse
+import bisect
+import contextlib
+import functools
+import glob
+import hashlib
+import heapq
+import io
 import json
+import os
+import re
 import sys
-from typing import Dict, List, Tuple
+import threading
+import time
+import types
+import zlib
+from array import array
+from collections import Counter, OrderedDict
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set,
+    Tuple
+)
 from pathlib import Path
 
-try:
-    import nltk
-    import numpy as np
+__version__ = '1.0.0'
+
+# NLTK is imported and its data loaded on first use, never at import time.
+# HVAC_NLTK_DATA points at a vendored nltk_data directory; setting
+# HVAC_SCORER_OFFLINE=1 forbids downloads so missing data fails fast.
+_nltk_settings = {
+    'data_dir': os.environ.get('HVAC_NLTK_DATA') or None,
+    'offline': os.environ.get('HVAC_SCORER_OFFLINE', '').lower() in ('1', 'true', 'yes'),
+}
+
+
+class NLTKResourceError(RuntimeError):
+    """Raised when NLTK or one of its data packages is unavailable."""
+
+
+def configure_nltk(data_dir: Optional[str] = None, offline: Optional[bool] = None) -> None:
+    """
+    Configure where NLTK data is loaded from.
+    
+    Args:
+        data_dir: Vendored nltk_data directory searched first (and used as
+            the download target when online)
+        offline: Never download; raise NLTKResourceError for missing data
+    """
+    if data_dir is not None:
+        _nltk_settings['data_dir'] = data_dir
+    if offline is not None:
+        _nltk_settings['offline'] = offline
+    _nltk_tokenizers.cache_clear()
+    _nltk_stopwords.cache_clear()
+
+
+def _nltk():
+    """Import nltk and apply the configured data directory."""
+    try:
+        import nltk
+    except ImportError:
+        raise NLTKResourceError(
+            "Required packages not installed. Run: pip install nltk"
+        ) from None
+    data_dir = _nltk_settings['data_dir']
+    if data_dir and data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+    return nltk
+
+
+def _ensure_nltk_resource(resource: str, package: str) -> None:
+    """Make sure NLTK data ``resource`` exists, downloading ``package`` if allowed."""
+    nltk = _nltk()
+    try:
+        nltk.data.find(resource)
+        return
+    except LookupError:
+        pass
+    
+    data_dir = _nltk_settings['data_dir']
+    if _nltk_settings['offline']:
+        raise NLTKResourceError(
+            f"NLTK data '{package}' not found and offline mode is enabled. "
+            f"Vendor it with 'python -m nltk.downloader -d DIR {package}' "
+            f"and pass --nltk-data DIR (or set HVAC_NLTK_DATA=DIR)."
+        )
+    nltk.download(package, quiet=True, download_dir=data_dir)
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        raise NLTKResourceError(
+            f"NLTK data '{package}' is missing and could not be downloaded."
+        ) from None
+
+
+@functools.lru_cache(maxsize=None)
+def _nltk_tokenizers() -> Tuple[Callable, Callable]:
+    """Return NLTK's (sent_tokenize, word_tokenize) with punkt available."""
+    _nltk()
+    from nltk.tokenize import punkt
+    # NLTK 3.8.2+ reads the pickle-free 'punkt_tab' package instead of 'punkt'
+    package = 'punkt_tab' if hasattr(punkt, 'PunktTokenizer') else 'punkt'
+    _ensure_nltk_resource(f'tokenizers/{package}', package)
     from nltk.tokenize import sent_tokenize, word_tokenize
+    return sent_tokenize, word_tokenize
+
+
+@functools.lru_cache(maxsize=None)
+def _porter_stem() -> Callable[[str], str]:
+    """Return a memoized NLTK Porter stemmer (it needs no NLTK data)."""
+    _nltk()
+    from nltk.stem.porter import PorterStemmer
+    return functools.lru_cache(maxsize=1 << 16)(PorterStemmer().stem)
+
+
+@functools.lru_cache(maxsize=None)
+def _nltk_stopwords() -> frozenset:
+    """Return NLTK's English stopwords."""
+    _ensure_nltk_resource('corpora/stopwords', 'stopwords')
     from nltk.corpus import stopwords
-except ImportError:
-    print("Error: Required packages not installed.")
-    print("Run: pip install nltk numpy")
-    sys.exit(1)
+    return frozenset(stopwords.words('english'))
+
+
+def _trie_regex(words: Sequence[str]) -> str:
+    """Build a regex alternation shaped like a character trie of ``words``."""
+    trie: Dict[str, Dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [
+            re.escape(char) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional group: the longer keyword is tried first
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie) if trie else '(?!)'
+
+
+class KeywordMatches:
+    """Keyword hits produced by a single :class:`KeywordMatcher` scan."""
+
+    __slots__ = ('keyword_hits', 'sentence_masks', 'index')
+
+    def __init__(
+        self,
+        keyword_hits: List[int],
+        sentence_masks: List[int],
+        index: Optional['TokenIndex'] = None
+    ):
+        # keyword_hits[g]: bitmap of keyword indexes of group g found anywhere
+        # sentence_masks[s]: bitmap of groups with a keyword inside sentence s
+        # index: the document's TokenIndex, when matching used one
+        self.keyword_hits = keyword_hits
+        self.sentence_masks = sentence_masks
+        self.index = index
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+    def keywords_matched(self, group: int) -> int:
+        """Number of distinct keywords of ``group`` present in the text."""
+        return bin(self.keyword_hits[group]).count('1')
+
+    def relevant_sentences(self, group: int) -> int:
+        """Number of sentences containing at least one keyword of ``group``."""
+        bit = 1 << group
+        return sum(1 for mask in self.sentence_masks if mask & bit)
+
+
+class KeywordMatcher:
+    """
+    Multi-pattern keyword matcher compiled once from groups of keywords.
+
+    All keywords are folded into one trie-shaped regular expression, so a
+    single pass over the lowercased text finds the longest keyword starting
+    at every position. Shorter keywords that are prefixes of that match are
+    expanded from a precomputed table, which yields every (possibly
+    overlapping) occurrence - the same output as an Aho-Corasick automaton,
+    but scanned at C speed instead of a per-character Python loop.
+    """
+
+    def __init__(self, groups: Sequence[Sequence[str]]):
+        self.groups = tuple(tuple(keywords) for keywords in groups)
+
+        owners: Dict[str, List[Tuple[int, int]]] = {}
+        for group, keywords in enumerate(self.groups):
+            for index, keyword in enumerate(keywords):
+                if keyword:
+                    owners.setdefault(keyword, []).append((group, index))
+
+        # keyword -> every keyword that is a prefix of it, with its length
+        self._expansions = {
+            keyword: tuple(
+                (len(prefix), tuple(owners[prefix]))
+                for prefix in owners if keyword.startswith(prefix)
+            )
+            for keyword in owners
+        }
+        self._pattern = re.compile('(?=(' + _trie_regex(sorted(owners)) + '))')
+        self.max_keyword_length = max(map(len, owners), default=1)
+        # Lowercased ASCII bytes can be scanned when every keyword is ASCII
+        self.ascii_only = all(keyword.isascii() for keyword in owners)
+        self._bytes_scanner: Optional[Tuple[Any, Dict]] = None
+
+    @classmethod
+    def from_rubric(cls, rubric: Dict[str, Dict]) -> 'KeywordMatcher':
+        """Build a matcher with one group per rubric category, in order."""
+        return cls([config['keywords'] for config in rubric.values()])
+
+    def scan(
+        self,
+        text: str,
+        sentence_spans: Sequence[Tuple[int, int]]
+    ) -> KeywordMatches:
+        """
+        Scan lowercased ``text`` once.
+
+        Args:
+            text: Lowercased document text, or lowercased ASCII bytes
+                when ``ascii_only`` (offsets are then byte offsets)
+            sentence_spans: Sorted, non-overlapping (start, end) offsets of
+                the sentences within ``text`` (pairs or a SentenceSpans)
+
+        Returns:
+            KeywordMatches with per-group keyword bitmaps and per-sentence
+            group bitmaps
+        """
+        keyword_hits = [0] * len(self.groups)
+        sentence_masks = [0] * len(sentence_spans)
+        if isinstance(text, str):
+            pattern, expansions = self._pattern, self._expansions
+        else:
+            if self._bytes_scanner is None:
+                self._bytes_scanner = (
+                    re.compile(self._pattern.pattern.encode('ascii')),
+                    {keyword.encode('ascii'): owned
+                     for keyword, owned in self._expansions.items()}
+                )
+            pattern, expansions = self._bytes_scanner
+        starts, ends = _span_columns(sentence_spans)
+        sentence = 0
+        n_sentences = len(sentence_spans)
+
+        for match in pattern.finditer(text):
+            start = match.start()
+            while sentence < n_sentences and ends[sentence] <= start:
+                sentence += 1
+            inside = sentence < n_sentences and starts[sentence] <= start
+            for length, owned in expansions[match.group(1)]:
+                in_sentence = inside and start + length <= ends[sentence]
+                for group, index in owned:
+                    keyword_hits[group] |= 1 << index
+                    if in_sentence:
+                        sentence_masks[sentence] |= 1 << group
+
+        return KeywordMatches(keyword_hits, sentence_masks)
+
+
+class SentenceSpans:
+    """
+    Sentence (start, end) offsets stored as two ``array('Q')`` columns.
+    
+    Indexes and iterates like the list of pairs it replaces, at 16 bytes
+    per sentence instead of a tuple and two int objects.
+    """
+    
+    __slots__ = ('starts', 'ends')
+    
+    def __init__(self, spans: Iterable[Tuple[int, int]] = ()):
+        self.starts = array('Q')
+        self.ends = array('Q')
+        for start, end in spans:
+            self.starts.append(start)
+            self.ends.append(end)
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __getitem__(self, sentence: int) -> Tuple[int, int]:
+        return self.starts[sentence], self.ends[sentence]
     
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.starts, self.ends)
 
 
-class ProposalScorer:
+def _span_columns(spans: Sequence[Tuple[int, int]]) -> Tuple[Sequence[int], Sequence[int]]:
+    """Sentence starts and ends of ``spans`` (SentenceSpans or pairs) as columns."""
+    if isinstance(spans, SentenceSpans):
+        return spans.starts, spans.ends
+    return [start for start, _ in spans], [end for _, end in spans]
+
+
+class Vocabulary:
     """
-    Scores HVAC AI adoption proposals based on comprehensive rubric.
+    Interned word tokens shared by the documents of a process.
+    
+    Each distinct token gets a small integer id once, so documents keep
+    their tokens as an ``array('I')`` of ids rather than a string object
+    per occurrence. Whether a token counts towards the word count
+    (alphanumeric and not a stopword) and its normalized form (e.g. its
+    Porter stem) are worked out once per distinct token. Ids are never
+    reused, so a vocabulary grows with the distinct tokens seen; the
+    shared one is replaced by an empty one once it holds
+    ``SHARED_LIMIT`` tokens (documents keep the one they were
+    tokenized with).
     """
     
-    # Scoring categories and weights
-    RUBRIC = {
-        'business_case': {
-            'weight': 25,
-            'keywords': [
-                'roi', 'return on investment', 'cost savings', 'revenue',
-                'efficiency', 'productivity', 'competitive advantage',
-                'market opportunity', 'business value', 'impact'
-            ]
-        },
-        'technical_readiness': {
-            'weight': 20,
-            'keywords': [
-                'infrastructure', 'systems', 'technology', 'platform',
-                'integration', 'api', 'database', 'architecture',
-                'technical capability', 'expertise', 'resources'
-            ]
-        },
-        'data_foundation': {
-            'weight': 20,
-            'keywords': [
-                'data', 'dataset', 'historical records', 'analytics',
-                'data quality', 'data collection', 'measurements',
-                'metrics', 'reporting', 'information systems'
-            ]
-        },
-        'success_metrics': {
-            'weight': 15,
-            'keywords': [
-                'kpi', 'metric', 'measurement', 'baseline', 'target',
-                'goal', 'objective', 'performance indicator', 'tracking',
-                'evaluation', 'success criteria', 'benchmark'
-            ]
-        },
-        'risk_management': {
-            'weight': 10,
-            'keywords': [
-                'risk', 'mitigation', 'contingency', 'challenge',
-                'governance', 'compliance', 'security', 'privacy',
-                'backup plan', 'failsafe', 'risk assessment'
-            ]
-        },
-        'change_management': {
-            'weight': 10,
-            'keywords': [
-                'training', 'adoption', 'communication', 'stakeholder',
-                'buy-in', 'change management', 'user acceptance',
-                'engagement', 'support', 'transition', 'culture'
-            ]
-        }
-    }
+    SHARED_LIMIT = 1 << 18
     
-    def __init__(self, verbose: bool = False):
-        """Initialize the scorer."""
-        self.verbose = verbose
-        self.stop_words = set(stopwords.words('english'))
-        
-    def score_proposal(self, proposal_text: str) -> Dict:
+    def __init__(self):
+        self.words: List[str] = []
+        self._ids: Dict[str, int] = {}
+        # _counted[id]: 1 if the token counts towards the word count,
+        # judged against the _stop_words set
+        self._counted = bytearray()
+        self._stop_words: Optional[frozenset] = None
+        # normalizer -> normalized id of every id
+        self._normalized: Dict[Callable[[str], str], array] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.words)
+    
+    def id(self, word: str) -> Optional[int]:
+        """Id of ``word``, or None if it has not been seen."""
+        return self._ids.get(word)
+    
+    def encode(self, words: Sequence[str]) -> array:
+        """Ids of ``words``, interning unseen ones."""
+        ids = self._ids
+        try:
+            return array('I', map(ids.__getitem__, words))
+        except KeyError:
+            pass
+        with self._lock:
+            for word in dict.fromkeys(words):
+                if word not in ids:
+                    ids[word] = len(self.words)
+                    self.words.append(word)
+        return array('I', map(ids.__getitem__, words))
+    
+    def count(self, ids: Iterable[int]) -> int:
+        """Number of ``ids`` that are alphanumeric, non-stopword tokens."""
+        stop_words = _nltk_stopwords()
+        if stop_words is not self._stop_words:
+            # Stopwords were reloaded (see configure_nltk)
+            with self._lock:
+                self._counted = bytearray()
+                self._stop_words = stop_words
+        counted = self._counted
+        if len(counted) < len(self.words):
+            with self._lock:
+                counted.extend(
+                    word.isalnum() and word not in stop_words
+                    for word in self.words[len(counted):]
+                )
+        return sum(map(counted.__getitem__, ids))
+    
+    def normalized(self, ids: Iterable[int], normalize: Callable[[str], str]) -> array:
+        """Ids of the ``normalize``-d tokens of ``ids``, interning new forms."""
+        table = self._normalized.get(normalize)
+        if table is None:
+            table = self._normalized.setdefault(normalize, array('I'))
+        if len(table) < len(self.words):
+            with self._lock:
+                # Normalized forms are tokens too and get ids of their own
+                while len(table) < len(self.words):
+                    word = normalize(self.words[len(table)])
+                    if word not in self._ids:
+                        self._ids[word] = len(self.words)
+                        self.words.append(word)
+                    table.append(self._ids[word])
+        return array('I', map(table.__getitem__, ids))
+
+
+_vocabulary: Optional[Vocabulary] = None
+_vocabulary_lock = threading.Lock()
+
+
+def _shared_vocabulary() -> Vocabulary:
+    """Return the process-wide Vocabulary, renewed once it reaches its limit."""
+    global _vocabulary
+    vocabulary = _vocabulary
+    if vocabulary is None or len(vocabulary) >= Vocabulary.SHARED_LIMIT:
+        with _vocabulary_lock:
+            if _vocabulary is None or len(_vocabulary) >= Vocabulary.SHARED_LIMIT:
+                _vocabulary = Vocabulary()
+            vocabulary = _vocabulary
+    return vocabulary
+
+
+class Document:
+    """
+    A lowercased proposal tokenized into compact arrays.
+    
+    Sentence offsets are a :class:`SentenceSpans` and word tokens are
+    ids into the shared :class:`Vocabulary`, so keyword matching,
+    contradiction detection and the word count all read one structure
+    of a few bytes per token instead of a list of strings.
+    """
+    
+    __slots__ = ('spans', 'token_ids', 'sentence_starts', 'vocabulary')
+    
+    def __init__(
+        self,
+        spans: SentenceSpans,
+        token_ids: array,
+        sentence_starts: Optional[array] = None,
+        vocabulary: Optional[Vocabulary] = None
+    ):
+        # sentence_starts[s]: position of sentence s's first token, plus a
+        # final entry equal to len(token_ids); None unless tokenized by sentence
+        self.spans = spans
+        self.token_ids = token_ids
+        self.sentence_starts = sentence_starts
+        self.vocabulary = vocabulary or _shared_vocabulary()
+    
+    @classmethod
+    def tokenize(
+        cls,
+        text: str,
+        spans: Sequence[Tuple[int, int]],
+        tokenizer: 'Tokenizer',
+        by_sentence: bool = False,
+        block: int = 1 << 20
+    ) -> 'Document':
         """
-        Score a proposal and return detailed results.
+        Tokenize lowercased ``text`` into a Document.
         
         Args:
-            proposal_text: The proposal content to analyze
-            
-        Returns:
-            Dictionary with scores, grade, and recommendations
+            text: Lowercased document text
+            spans: Its sentence spans from ``tokenizer``
+            tokenizer: Tokenizer backend for the word tokens
+            by_sentence: Tokenize each sentence on its own and record
+                ``sentence_starts`` (needed for a TokenIndex)
+            block: Otherwise, tokenize runs of whole sentences of about
+                this many characters, so no full list of strings is built
         """
-        if not proposal_text or len(proposal_text.strip()) < 100:
-            raise ValueError("Proposal text is too short (minimum 100 characters)")
-        
-        # Preprocess text
-        sentences = sent_tokenize(proposal_text.lower())
-        words = word_tokenize(proposal_text.lower())
-        words = [w for w in words if w.isalnum() and w not in self.stop_words]
-        
-        # Score each category
-        category_scores = {}
-        category_details = {}
-        
-        for category, config in self.RUBRIC.items():
-            score, details = self._score_category(
-                proposal_text, sentences, words, category, config
-            )
-            category_scores[category] = score
-            category_details[category] = details
+        vocabulary = _shared_vocabulary()
+        words, encode = tokenizer.words, vocabulary.encode
+        token_ids = array('I')
+        sentence_starts = None
+        if by_sentence:
+            sentence_starts = array('I', [0])
+            batch: List[str] = []
+            for start, end in spans:
+                batch += words(text[start:end])
+                sentence_starts.append(len(token_ids) + len(batch))
+                if len(batch) >= 1 << 16:
+                    token_ids += encode(batch)
+                    batch = []
+            token_ids += encode(batch)
+        else:
+            # Word tokens never cross sentences (see Tokenizer)
+            region = 0
+            for _, end in spans:
+                if end - region >= block:
+                    token_ids += encode(words(text[region:end]))
+                    region = end
+            token_ids += encode(words(text[region:]))
+        return cls(SentenceSpans(spans), token_ids, sentence_starts, vocabulary)
+    
+    def words(self) -> Iterator[str]:
+        """The word tokens, in document order."""
+        return map(self.vocabulary.words.__getitem__, self.token_ids)
+    
+    def count_words(self) -> int:
+        """Number of alphanumeric, non-stopword tokens."""
+        return self.vocabulary.count(self.token_ids)
+
+
+class TokenIndex:
+    """
+    Inverted index of a document's word tokens.
+    
+    Maps each (normalized) token id to its positions in the token stream,
+    and positions to sentences through the document's sentence starts,
+    so single words and phrases resolve as lookups with word-boundary
+    semantics instead of substring scans.
+    """
+    
+    __slots__ = ('document', 'tokens', 'postings')
+    
+    def __init__(self, document: Document, normalize: Optional[Callable[[str], str]] = None):
+        """
+        Index the word tokens of a document tokenized by sentence.
         
-        # Calculate total score
-        total_score = sum(category_scores.values())
+        Args:
+            document: Document with ``sentence_starts``
+            normalize: Optional token normalizer, e.g. a stemmer
+        """
+        self.document = document
+        self.tokens = (document.token_ids if normalize is None
+                       else document.vocabulary.normalized(document.token_ids, normalize))
+        postings: Dict[int, array] = {}
+        for position, token in enumerate(self.tokens):
+            entry = postings.get(token)
+            if entry is None:
+                postings[token] = array('I', (position,))
+            else:
+                entry.append(position)
+        self.postings = postings
+    
+    def positions(self, token: str) -> Sequence[int]:
+        """Sorted positions of the normalized token ``token``."""
+        return self.postings.get(self.document.vocabulary.id(token), ())
+    
+    def sentence_of(self, position: int) -> int:
+        """Sentence of the token at ``position``."""
+        return bisect.bisect_right(self.document.sentence_starts, position) - 1
+    
+    def phrase_sentences(self, phrase: Sequence[str]) -> Set[int]:
+        """Sentences containing the normalized token sequence ``phrase``."""
+        first = self.positions(phrase[0])
+        if not first:
+            return set()
+        starts = self.document.sentence_starts
+        find = bisect.bisect_right
+        if len(phrase) == 1:
+            return {find(starts, position) - 1 for position in first}
         
-        # Determine grade
-        grade = self._calculate_grade(total_score)
+        vocabulary = self.document.vocabulary
+        rest = [vocabulary.id(token) for token in phrase[1:]]
+        if None in rest or any(token not in self.postings for token in rest):
+            return set()
+        tokens = self.tokens
+        rest = array('I', rest)
+        n = len(phrase)
+        sentences = set()
+        for position in first:
+            if tokens[position + 1:position + n] == rest:
+                sentence = find(starts, position) - 1
+                if position + n <= starts[sentence + 1]:
+                    sentences.add(sentence)
+        return sentences
+
+
+class IndexMatcher:
+    """
+    Whole-word keyword matcher backed by a per-document TokenIndex.
+    
+    Keywords are tokenized with the scorer's tokenizer, so 'api' no
+    longer matches inside 'capital' and multi-word keywords match as
+    adjacent tokens within a sentence. With ``stem``, keywords and text
+    are compared by Porter stem ('metrics' matches 'metric'). Produces
+    the same KeywordMatches as KeywordMatcher, so scoring is unchanged.
+    """
+    
+    # Matches never span sentences, so streaming needs no chunk overlap
+    max_keyword_length = 1
+    
+    def __init__(self, groups: Sequence[Sequence[str]], tokenizer: 'Tokenizer', stem: bool = False):
+        self.groups = tuple(tuple(keywords) for keywords in groups)
+        self.tokenizer = tokenizer
+        self.normalize = _porter_stem() if stem else None
         
-        # Identify gaps
-        gaps = self._identify_gaps(category_scores, category_details)
+        # phrase -> every (group, index) keyword that tokenizes to it
+        self._phrases: Dict[Tuple[str, ...], List[Tuple[int, int]]] = {}
+        for group, keywords in enumerate(self.groups):
+            for index, keyword in enumerate(keywords):
+                words = tokenizer.words(keyword)
+                if self.normalize:
+                    words = [self.normalize(word) for word in words]
+                if words:
+                    self._phrases.setdefault(tuple(words), []).append((group, index))
+    
+    def index(self, document: Document) -> TokenIndex:
+        """Build the TokenIndex of a document tokenized by sentence."""
+        return TokenIndex(document, self.normalize)
+    
+    def scan(
+        self,
+        text: str,
+        sentence_spans: Sequence[Tuple[int, int]]
+    ) -> KeywordMatches:
+        """Tokenize and index the sentences of ``text``, then match keywords."""
+        document = Document.tokenize(text, sentence_spans, self.tokenizer, by_sentence=True)
+        return self.scan_index(self.index(document), len(sentence_spans))
+    
+    def scan_index(self, index: TokenIndex, n_sentences: int) -> KeywordMatches:
+        """
+        Resolve every keyword against a document index.
         
-        # Generate recommendations
-        recommendations = self._generate_recommendations(gaps, category_scores)
+        Args:
+            index: TokenIndex of the document
+            n_sentences: Sentences in the document
+            
+        Returns:
+            KeywordMatches with per-group keyword bitmaps and per-sentence
+            group bitmaps
+        """
+        keyword_hits = [0] * len(self.groups)
+        sentence_masks = [0] * n_sentences
+        for phrase, owners in self._phrases.items():
+            sentences = index.phrase_sentences(phrase)
+            if not sentences:
+                continue
+            for group, keyword in owners:
+                keyword_hits[group] |= 1 << keyword
+                bit = 1 << group
+                for sentence in sentences:
+                    sentence_masks[sentence] |= bit
+        return KeywordMatches(keyword_hits, sentence_masks, index)
+
+
+# Keyword matching modes for ProposalScorer(match=...)
+MATCH_MODES = ('substring', 'word', 'stem')
+
+
+class ContradictionDetector:
+    """
+    Finds positive and negative claim cues per sentence.
+    
+    Cues are whole words ('will' does not fire on 'willing'), looked up
+    in the document's TokenIndex when matching built one and found with a
+    single word-boundary regex scan otherwise. A positive cue next to a
+    negation ('not ready', 'will not', NLTK's 'can not') counts as one
+    negative claim rather than a mixed signal.
+    """
+    
+    POSITIVE_CUES = {
+        'will': 1.0, 'can': 1.0, 'have': 0.5, 'has': 0.5, 'ready': 1.5,
+        'available': 1.5, 'established': 1.5, 'complete': 1.0, 'completed': 1.0,
+    }
+    NEGATIVE_CUES = {
+        'cannot': 1.5, 'not': 1.5, 'never': 1.5, 'no': 1.0, 'lack': 1.5,
+        'lacks': 1.5, 'lacking': 1.5, 'missing': 1.5, 'unavailable': 1.5,
+        'without': 1.0, 'need': 0.5, 'needs': 0.5, 'require': 0.5, 'requires': 0.5,
+    }
+    NEGATORS = ('not', 'no', 'never')
+    
+    def __init__(self, normalize: Optional[Callable[[str], str]] = None):
+        """
+        Args:
+            normalize: Token normalizer of the TokenIndex, e.g. a stemmer
+        """
+        normalize = normalize or (lambda word: word)
+        # token -> (positive weight, negative weight)
+        self._weights: Dict[str, Tuple[float, float]] = {}
+        for cue, weight in self.POSITIVE_CUES.items():
+            positive, negative = self._weights.get(normalize(cue), (0.0, 0.0))
+            self._weights[normalize(cue)] = (max(positive, weight), negative)
+        for cue, weight in self.NEGATIVE_CUES.items():
+            positive, negative = self._weights.get(normalize(cue), (0.0, 0.0))
+            self._weights[normalize(cue)] = (positive, max(negative, weight))
+        self._negators = {normalize(word) for word in self.NEGATORS}
+        self._not = normalize('not')
         
-        # Detect contradictions
-        contradictions = self._detect_contradictions(sentences)
+        cues = sorted(set(self.POSITIVE_CUES) | set(self.NEGATIVE_CUES), key=len, reverse=True)
+        self._pattern = re.compile(r'\b(?:' + '|'.join(map(re.escape, cues)) + r')\b')
+        self._bytes_pattern = re.compile(self._pattern.pattern.encode('ascii'))
+    
+    def signals(
+        self,
+        text: str,
+        sentence_spans: Sequence[Tuple[int, int]],
+        index: Optional[TokenIndex] = None
+    ) -> Dict[int, List[float]]:
+        """
+        Positive and negative claim strength of each sentence with a cue.
         
-        return {
-            'total_score': round(total_score, 1),
-            'grade': grade,
-            'percentile': self._score_to_percentile(total_score),
-            'category_scores': category_scores,
-            'category_details': category_details,
-            'gaps': gaps,
-            'recommendations': recommendations,
-            'contradictions': contradictions,
-            'word_count': len(words),
-            'sentence_count': len(sentences)
-        }
+        Args:
+            text: Lowercased document text (or lowercased ASCII bytes)
+            sentence_spans: Sentence offsets within ``text``
+            index: The document's TokenIndex over the same sentences, if any
+            
+        Returns:
+            Mapping of sentence number (0-based) to [positive, negative]
+        """
+        # (sentence, token, directly follows the previous cue)
+        occurrences: List[Tuple[int, str, bool]] = []
+        if index is not None:
+            positions = sorted(
+                position for token in self._weights for position in index.positions(token)
+            )
+            tokens, words = index.tokens, index.document.vocabulary.words
+            starts, find = index.document.sentence_starts, bisect.bisect_right
+            previous, previous_sentence = -2, -1
+            for position in positions:
+                sentence = find(starts, position) - 1
+                adjacent = position == previous + 1 and previous_sentence == sentence
+                occurrences.append((sentence, words[tokens[position]], adjacent))
+                previous, previous_sentence = position, sentence
+        else:
+            decode = not isinstance(text, str)
+            pattern = self._bytes_pattern if decode else self._pattern
+            starts, ends = _span_columns(sentence_spans)
+            sentence = 0
+            n_sentences = len(sentence_spans)
+            previous_end, previous_sentence = -1, -1
+            for match in pattern.finditer(text):
+                start, end = match.span()
+                while sentence < n_sentences and ends[sentence] <= start:
+                    sentence += 1
+                if sentence == n_sentences or starts[sentence] > start or end > ends[sentence]:
+                    continue
+                adjacent = (previous_sentence == sentence
+                            and text[previous_end:start].isspace())
+                token = match.group()
+                occurrences.append((sentence, token.decode('ascii') if decode else token, adjacent))
+                previous_end, previous_sentence = end, sentence
+        return self._score(occurrences)
     
-    def _score_category(
-        self, 
-        text: str, 
-        sentences: List[str], 
-        words: List[str],
-        category: str, 
-        config: Dict
-    ) -> Tuple[float, Dict]:
-        """Score a single category."""
-        max_score = config['weight']
-        keywords = config['keywords']
+    def _score(self, occurrences: List[Tuple[int, str, bool]]) -> Dict[int, List[float]]:
+        """Sum cue weights per sentence, folding negated positives into negatives."""
+        weights = self._weights
+        signals: Dict[int, List[float]] = {}
+        skip = False
+        for i, (sentence, token, _) in enumerate(occurrences):
+            if skip:
+                skip = False
+                continue
+            positive, negative = weights[token]
+            following = occurrences[i + 1] if i + 1 < len(occurrences) else None
+            next_positive = (following is not None and following[2]
+                             and weights[following[1]][1] == 0 and following[1])
+            signal = signals.setdefault(sentence, [0.0, 0.0])
+            if token in self._negators and next_positive:
+                # 'not ready': one negative claim
+                signal[1] += weights[next_positive][0]
+                skip = True
+            elif positive and not negative and following is not None and following[2] \
+                    and following[1] == self._not:
+                # 'will not': one negative claim
+                signal[1] += positive
+                skip = True
+            else:
+                signal[0] += positive
+                signal[1] += negative
+        return signals
+
+
+class ContradictionTracker:
+    """
+    Ranked contradictions over a stream of sentences, in bounded memory.
+    
+    A sentence with both positive and negative cues is a 'mixed_signals'
+    finding. Across sentences, the strongest purely positive and purely
+    negative claims about each rubric topic (category) are paired as a
+    'conflicting_claims' finding. Findings are ranked by cue strength,
+    halved for mixed sentences that touch no rubric topic.
+    """
+    
+    def __init__(self, categories: Sequence[str], group_offset: int = 0, limit: int = 5):
+        """
+        Args:
+            categories: Rubric category names, in group order
+            group_offset: First group of these categories in sentence masks
+            limit: Findings to report
+        """
+        self.categories = list(categories)
+        self.group_offset = group_offset
+        self.limit = limit
+        self._mixed: List[Tuple[float, int, str, int]] = []
+        # category -> (strength, sentence_num, text), strongest first-seen
+        self._positive: Dict[int, Tuple[float, int, str]] = {}
+        self._negative: Dict[int, Tuple[float, int, str]] = {}
+    
+    def update(
+        self,
+        text: str,
+        sentence_spans: Sequence[Tuple[int, int]],
+        signals: Dict[int, List[float]],
+        sentence_masks: Sequence[int],
+        offset: int = 0
+    ) -> None:
+        """
+        Add the signals of a run of sentences.
         
-        # Count keyword matches
-        matches = sum(1 for keyword in keywords if keyword in text.lower())
-        keyword_coverage = min(matches / len(keywords), 1.0)
+        Args:
+            text: Lowercased text the spans refer to (or UTF-8 bytes)
+            sentence_spans: Sentence offsets within ``text``
+            signals: Output of ContradictionDetector.signals
+            sentence_masks: Category bitmaps per sentence (KeywordMatches)
+            offset: Sentences preceding this run in the document
+        """
+        for sentence in sorted(signals):
+            start, end = sentence_spans[sentence]
+            positive, negative = signals[sentence]
+            claim = text[start:end]
+            if not isinstance(claim, str):
+                claim = _decode_lines(claim)
+            self.add(offset + sentence + 1, claim, positive, negative,
+                     sentence_masks[sentence] >> self.group_offset)
+    
+    def add(self, sentence_num: int, text: str, positive: float, negative: float, mask: int) -> None:
+        """Add one sentence's claim strengths and topic bitmap (1-based numbering)."""
+        mask &= (1 << len(self.categories)) - 1
+        if positive and negative:
+            strength = positive + negative
+            if not mask:
+                strength /= 2
+            topic = (mask & -mask).bit_length() - 1 if mask else -1
+            item = (strength, -sentence_num, text, topic)
+            if len(self._mixed) < self.limit:
+                heapq.heappush(self._mixed, item)
+            elif item[:2] > self._mixed[0][:2]:
+                heapq.heapreplace(self._mixed, item)
+            return
         
-        # Calculate sentence coverage
-        relevant_sentences = [
-            s for s in sentences 
-            if any(kw in s for kw in keywords)
+        best = self._positive if positive else self._negative
+        strength = positive or negative
+        while mask:
+            category = (mask & -mask).bit_length() - 1
+            mask &= mask - 1
+            if category not in best or strength > best[category][0]:
+                best[category] = (strength, sentence_num, text)
+    
+    def findings(self) -> List[Dict]:
+        """The top findings, strongest first (then by position)."""
+        findings = [
+            {
+                'sentence_num': -negative_num,
+                'text': _clip(text),
+                'type': 'mixed_signals',
+                'topic': self.categories[topic] if topic >= 0 else None,
+                'strength': round(strength, 2),
+            }
+            for strength, negative_num, text, topic in self._mixed
         ]
-        sentence_coverage = len(relevant_sentences) / len(sentences)
-        
-        # Calculate depth score (how much is discussed)
-        depth_score = min(len(relevant_sentences) / 3, 1.0)  # 3+ sentences = full depth
-        
-        # Combine factors
-        coverage_score = (keyword_coverage * 0.4 + 
-                         sentence_coverage * 0.3 + 
-                         depth_score * 0.3)
         
-        score = coverage_score * max_score
+        pairs = set()
+        for category in sorted(self._positive.keys() & self._negative.keys()):
+            positive, negative = self._positive[category], self._negative[category]
+            first, second = sorted((positive, negative), key=lambda claim: claim[1])
+            if (first[1], second[1]) in pairs:
+                continue
+            pairs.add((first[1], second[1]))
+            findings.append({
+                'sentence_num': first[1],
+                'text': _clip(first[2]),
+                'type': 'conflicting_claims',
+                'topic': self.categories[category],
+                'strength': round(positive[0] + negative[0], 2),
+                'related_sentence_num': second[1],
+                'related_text': _clip(second[2]),
+            })
         
-        details = {
-            'max_score': max_score,
-            'keywords_matched': matches,
-            'total_keywords': len(keywords),
-            'relevant_sentences': len(relevant_sentences),
-            'coverage': round(coverage_score * 100, 1)
-        }
+        findings.sort(key=lambda f: (-f['strength'], f['sentence_num'],
+                                     f.get('related_sentence_num', 0)))
+        return findings[:self.limit]
+
+
+def _clip(sentence: str, length: int = 100) -> str:
+    """Shorten a sentence for display in findings."""
+    return sentence[:length] + '...' if len(sentence) > length else sentence
+
+
+def _sentence_spans(text: str, sentences: Sequence[str]) -> List[Tuple[int, int]]:
+    """Locate tokenizer sentences, in order, as (start, end) offsets in ``text``."""
+    spans = []
+    cursor = 0
+    for sent in sentences:
+        start = text.find(sent, cursor)
+        if start < 0:
+            raise ValueError(f"Sentence not found in source text: {sent[:40]!r}")
+        cursor = start + len(sent)
+        spans.append((start, cursor))
+    return spans
+
+
+# A section heading is a Markdown '#' heading or a short line ending in a
+# colon ('Security & Privacy:'); bullets and 'Label: value' lines are not
+_SECTION_HEADING = re.compile(
+    r'^[ \t]*(?:#{1,6}[ \t]+(?P<title>[^\n]*?)[ \t#]*|(?P<label>\w[^\n:.!?]{0,59}):)[ \t]*$',
+    re.MULTILINE
+)
+
+
+def split_sections(text: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Split a proposal into sections at its headings.
+
+    Args:
+        text: Proposal text
+
+    Returns:
+        (heading, text) of each section in document order. A section's
+        text starts with its heading line; text before the first heading
+        is a section with heading None. Whitespace-only sections are
+        dropped.
+    """
+    bounds = [(None, 0)] + [
+        ((match.group('title') or match.group('label')).strip(), match.start())
+        for match in _SECTION_HEADING.finditer(text)
+    ]
+    ends = [start for _, start in bounds[1:]] + [len(text)]
+    sections = []
+    for (heading, start), end in zip(bounds, ends):
+        section = text[start:end]
+        if section and not section.isspace():
+            sections.append((heading, section))
+    return sections
+
+
+class Tokenizer:
+    """
+    Tokenizer backend interface for :class:`ProposalScorer`.
+    
+    Backends split lowercased text into sentence spans and word tokens;
+    the scorer keeps alphanumeric non-stopword tokens for its word count.
+    Word tokens never cross sentence boundaries, so tokenizing a run of
+    whole sentences yields the same words as tokenizing the full text.
+    Backends that set ``scans_bytes`` also accept lowercased ASCII bytes
+    (returning byte offsets and bytes tokens).
+    """
+    
+    name = ''
+    scans_bytes = False
+    
+    def load(self) -> None:
+        """Load any resources the backend needs before first use."""
+    
+    def sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Sorted (start, end) offsets of each sentence in lowercased ``text``."""
+        raise NotImplementedError
+    
+    def words(self, text: str) -> List[str]:
+        """Word tokens of lowercased ``text`` in document order."""
+        raise NotImplementedError
+    
+    def tokenize(self, text: str) -> Tuple[List[Tuple[int, int]], List[str]]:
+        """
+        Tokenize lowercased ``text``.
         
-        if self.verbose:
-            print(f"\n{category.replace('_', ' ').title()}:")
-            print(f"  Score: {score:.1f}/{max_score}")
-            print(f"  Coverage: {details['coverage']}%")
-            print(f"  Keywords matched: {matches}/{len(keywords)}")
+        Returns:
+            (sentence_spans, words)
+        """
+        return self.sentence_spans(text), self.words(text)
+
+
+class NLTKTokenizer(Tokenizer):
+    """Punkt sentence splitting and Treebank word tokenization from NLTK."""
+    
+    name = 'nltk'
+    
+    def load(self) -> None:
+        _nltk_tokenizers()[0]('warm up. punkt.')
+    
+    def sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        return _sentence_spans(text, _nltk_tokenizers()[0](text))
+    
+    def words(self, text: str) -> List[str]:
+        return _nltk_tokenizers()[1](text)
+
+
+class RegexTokenizer(Tokenizer):
+    """
+    Fast tokenizer built from two precompiled regular expressions.
+    
+    Sentences end at '.', '!' or '?' (plus closing quotes or brackets)
+    followed by whitespace. Words are runs of word characters that may be
+    joined by '.', ',', '/' or '-', so '8.2' and 'e-mail' stay single
+    tokens the way Treebank keeps them. No NLTK data is needed.
+    """
+    
+    name = 'regex'
+    scans_bytes = True
+    
+    WORD_PATTERN = re.compile(r'\w[\w.,/-]*\w|\w')
+    SENTENCE_END_PATTERN = re.compile(r'[.!?][\'")\]]*(?=\s|\Z)')
+    NON_SPACE_PATTERN = re.compile(r'\S')
+    # The same patterns for bytes; on ASCII text \w and \s agree with
+    # the str patterns except for \x1c-\x1f (see _bytes_scannable)
+    BYTES_WORD_PATTERN = re.compile(WORD_PATTERN.pattern.encode('ascii'))
+    BYTES_SENTENCE_END_PATTERN = re.compile(SENTENCE_END_PATTERN.pattern.encode('ascii'))
+    BYTES_NON_SPACE_PATTERN = re.compile(NON_SPACE_PATTERN.pattern.encode('ascii'))
+    
+    def sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        if isinstance(text, str):
+            ends, next_start = self.SENTENCE_END_PATTERN, self.NON_SPACE_PATTERN.search
+        else:
+            ends, next_start = self.BYTES_SENTENCE_END_PATTERN, self.BYTES_NON_SPACE_PATTERN.search
+        spans = []
+        pos = 0
+        for end in ends.finditer(text):
+            start = next_start(text, pos)
+            if start is not None and start.start() < end.start():
+                spans.append((start.start(), end.end()))
+            pos = end.end()
         
-        return score, details
+        start = next_start(text, pos)
+        if start is not None:
+            spans.append((start.start(), len(text.rstrip())))
+        return spans
     
-    def _calculate_grade(self, score: float) -> str:
-        """Convert numeric score to letter grade."""
-        if score >= 90:
-            return 'A'
-        elif score >= 80:
-            return 'B'
-        elif score >= 70:
-            return 'C'
-        elif score >= 60:
-            return 'D'
+    def words(self, text: str) -> List[str]:
+        if isinstance(text, str):
+            return self.WORD_PATTERN.findall(text)
+        return self.BYTES_WORD_PATTERN.findall(text)
+
+
+# Tokenizer backends selectable by name
+TOKENIZERS = {
+    NLTKTokenizer.name: NLTKTokenizer,
+    RegexTokenizer.name: RegexTokenizer,
+}
+
+
+class ResultCache:
+    """
+    Two-tier cache of scoring results keyed by content hash.
+    
+    Results live in an in-memory LRU and, when ``path`` is given, in a
+    SQLite database that keeps at most ``max_disk_entries`` rows, evicting
+    the least recently used. Entries are stored as JSON so every hit
+    returns a fresh copy.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 50_000
+    ):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory: 'OrderedDict[str, str]' = OrderedDict()
+        self._conn = None
+        self._disk_entries = 0
+    
+    def __getstate__(self) -> Dict:
+        # SQLite connections cannot be pickled; worker processes reopen it
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+    
+    def _db(self):
+        """Open the on-disk tier (a sqlite3 connection) on first use."""
+        if self._conn is None:
+            import sqlite3
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30)
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed REAL NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)'
+            )
+            self._conn.commit()
+            self._disk_entries = self._conn.execute(
+                'SELECT COUNT(*) FROM results'
+            ).fetchone()[0]
+        return self._conn
+    
+    def _remember(self, key: str, value: str) -> None:
+        """Insert into the memory tier, evicting the least recently used."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached result for ``key``, or None."""
+        value = self._memory.get(key)
+        if value is not None:
+            self._memory.move_to_end(key)
+        elif self.path:
+            db = self._db()
+            row = db.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                value = row[0]
+                db.execute('UPDATE results SET accessed = ? WHERE key = ?',
+                           (time.time(), key))
+                db.commit()
+                self._remember(key, value)
+        
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+    
+    def put(self, key: str, result: Dict) -> None:
+        """Store ``result`` under ``key`` in every tier."""
+        value = json.dumps(result)
+        self._remember(key, value)
+        if not self.path:
+            return
+        
+        db = self._db()
+        inserted = db.execute(
+            'INSERT OR IGNORE INTO results (key, value, accessed) VALUES (?, ?, ?)',
+            (key, value, time.time())
+        ).rowcount
+        if inserted:
+            self._disk_entries += 1
         else:
-            return 'F'
+            db.execute('UPDATE results SET value = ?, accessed = ? WHERE key = ?',
+                       (value, time.time(), key))
+        
+        surplus = self._disk_entries - self.max_disk_entries
+        if surplus > 0:
+            db.execute(
+                'DELETE FROM results WHERE key IN '
+                '(SELECT key FROM results ORDER BY accessed LIMIT ?)', (surplus,)
+            )
+            self._disk_entries -= surplus
+        db.commit()
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counts since this cache was created."""
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+class ReaderError(ValueError):
+    """Raised when a proposal document cannot be read or its format is unsupported."""
+
+
+class DocumentReader(NamedTuple):
+    """A registered reader: yields text chunks of a file in document order."""
+    read: Callable[[str], Iterator[str]]
+    cache_text: bool
+
+
+# Readers by lowercase file extension, filled by register_reader
+READERS: Dict[str, DocumentReader] = {}
+
+
+def register_reader(*extensions: str, cache_text: bool = True) -> Callable:
+    """
+    Register a function ``read(path) -> Iterator[str]`` for file extensions.
+    
+    Args:
+        extensions: Extensions including the dot, e.g. '.pdf'
+        cache_text: Keep the extracted text in a TextCache (off for
+            formats that are already plain text)
+    """
+    def decorator(read: Callable[[str], Iterator[str]]) -> Callable[[str], Iterator[str]]:
+        for extension in extensions:
+            READERS[extension.lower()] = DocumentReader(read, cache_text)
+        return read
+    return decorator
+
+
+def _import_reader_package(module: str, package: str):
+    """Import a document library, or raise ReaderError naming its package."""
+    import importlib
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ReaderError(
+            f"Reading this format needs {package}. Run: pip install {package}"
+        ) from None
+
+
+def _row_text(cells: Iterable[Any]) -> str:
+    """Join table cells into one line that reads as a sentence."""
+    text = ' '.join(str(cell).strip() for cell in cells if cell is not None and str(cell).strip())
+    if text and text[-1] not in '.!?':
+        text += '.'
+    return text
+
+
+@register_reader('.txt', cache_text=False)
+def _read_text(path: str) -> Iterator[str]:
+    """Plain UTF-8 text in 1 MiB chunks."""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter(lambda: f.read(1 << 20), '')
+
+
+@register_reader('.pdf')
+def _read_pdf(path: str) -> Iterator[str]:
+    """PDF text, one page at a time."""
+    PyPDF2 = _import_reader_package('PyPDF2', 'PyPDF2')
+    try:
+        reader = PyPDF2.PdfReader(path)
+        for page in reader.pages:
+            yield (page.extract_text() or '') + '\n\n'
+    except OSError:
+        raise
+    except Exception as e:
+        # Damaged files raise PyPdfError, but also KeyError, AttributeError,
+        # zlib.error and the like from deep inside page extraction
+        raise ReaderError(f"Cannot read PDF {path}: {e}") from e
+
+
+@register_reader('.docx')
+def _read_docx(path: str) -> Iterator[str]:
+    """DOCX paragraphs, then table rows."""
+    docx = _import_reader_package('docx', 'python-docx')
+    try:
+        document = docx.Document(path)
+        for paragraph in document.paragraphs:
+            if paragraph.text:
+                yield paragraph.text + '\n\n'
+        for table in document.tables:
+            for row in table.rows:
+                line = _row_text(cell.text for cell in row.cells)
+                if line:
+                    yield line + '\n'
+    except OSError:
+        raise
+    except Exception as e:
+        # python-docx raises zipfile/KeyError/PackageNotFoundError variants
+        raise ReaderError(f"Cannot read DOCX {path}: {e}") from e
+
+
+@register_reader('.xlsx')
+def _read_xlsx(path: str) -> Iterator[str]:
+    """XLSX cell values, one row at a time from every sheet."""
+    openpyxl = _import_reader_package('openpyxl', 'openpyxl')
+    try:
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                for row in sheet.iter_rows(values_only=True):
+                    line = _row_text(row)
+                    if line:
+                        yield line + '\n'
+        finally:
+            workbook.close()
+    except OSError:
+        raise
+    except Exception as e:
+        # Rows are parsed lazily, so damaged sheets fail mid-iteration
+        raise ReaderError(f"Cannot read XLSX {path}: {e}") from e
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's bytes, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Bytes that stop a text file from being scanned as bytes: anything
+# non-ASCII, and \x1c-\x1f, which str patterns treat as whitespace
+_NON_BYTES_SCANNABLE = re.compile(rb'[\x1c-\x1f\x80-\xff]+')
+# UTF-8 punctuation that scans the same as bytes as it does decoded: it
+# has no case and is neither a word nor a space character. Covers general
+# punctuation (U+2010-2027, U+2030-205E: dashes, curly quotes, bullets,
+# ellipsis), arrows (U+2190-21FF), a byte order mark and the Latin-1
+# signs \xa9 \xab \xae \xb0 \xbb
+_CASELESS_PUNCTUATION = re.compile(
+    rb'(?:\xe2\x80[\x90-\xa7\xb0-\xbf]|\xe2\x81[\x80-\x9e]'
+    rb'|\xe2\x86[\x90-\xbf]|\xe2\x87[\x80-\xbf]|\xef\xbb\xbf|\xc2[\xa9\xab\xae\xb0\xbb])+'
+)
+# A space, tab or newline ends a block without splitting a word, a UTF-8
+# sequence or a CRLF pair
+_BLOCK_END = re.compile(rb'[ \t\n]')
+_ASCII_SPACE = b' \t\n\r\x0b\x0c'
+
+
+def _bytes_scannable(data) -> bool:
+    """
+    Whether a UTF-8 buffer scores the same as lowercased bytes as it does
+    decoded: ASCII, apart from caseless punctuation such as curly quotes.
+    """
+    return all(
+        _CASELESS_PUNCTUATION.fullmatch(run.group())
+        for run in _NON_BYTES_SCANNABLE.finditer(data)
+    )
+
+
+def _decode_lines(data: bytes) -> str:
+    """Decode UTF-8 with universal newlines, as a text-mode read would."""
+    text = data.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _mapped_blocks(data, start: int, end: int, size: int = 1 << 20) -> Iterator[bytes]:
+    """
+    Copy ``data[start:end]`` out of a memory map in blocks of about ``size``.
+    
+    Blocks end after a space, tab or newline. Pages already copied are
+    dropped from the mapping where the platform allows, so resident
+    memory stays near ``size`` however large the file is.
+    """
+    import mmap
+    release = getattr(mmap, 'MADV_DONTNEED', None) if hasattr(data, 'madvise') else None
+    released = start - start % mmap.PAGESIZE
+    pos = start
+    while pos < end:
+        stop = pos + size
+        if stop >= end:
+            stop = end
+        else:
+            boundary = _BLOCK_END.search(data, stop, end)
+            stop = boundary.end() if boundary else end
+        yield data[pos:stop]
+        pos = stop
+        if release is not None:
+            page_end = pos - pos % mmap.PAGESIZE
+            if page_end > released:
+                data.madvise(release, released, page_end - released)
+                released = page_end
+
+
+class TextCache:
+    """
+    Extracted document text kept on disk, keyed by the source file's hash.
+    
+    Each entry is a UTF-8 file written while the text streams to the
+    scorer and renamed into place only once extraction completes, so a
+    failed or interrupted extraction never leaves a partial entry. At most
+    ``max_entries`` files are kept, evicting the least recently used.
+    Entries written are counted, and the directory is only scanned when
+    the count passes ``max_entries``; pruning then goes ``PRUNE_FRACTION``
+    below it, so scans happen once per that many writes, not on each.
+    """
+    
+    PRUNE_FRACTION = 0.1
+    
+    def __init__(self, directory: str, max_entries: int = 2000):
+        self.directory = directory
+        self.max_entries = max_entries
+        # Entries as of the last scan plus those written since (None: not scanned)
+        self._count: Optional[int] = None
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.txt')
+    
+    def get(self, key: str) -> Optional[str]:
+        """Path of the cached text for ``key``, or None."""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+    
+    @contextlib.contextmanager
+    def writer(self, key: str) -> Iterator[Any]:
+        """Text file to write the entry for ``key`` to, committed on success."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                yield f
+            os.replace(tmp, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+        if self._count is not None:
+            self._count += 1
+        if self._count is None or self._count > self.max_entries:
+            self._prune()
+    
+    def _prune(self) -> None:
+        """Remove the least recently used entries beyond the low-water mark."""
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith('.txt')]
+        self._count = len(entries)
+        if len(entries) <= self.max_entries:
+            return
+        keep = self.max_entries - int(self.max_entries * self.PRUNE_FRACTION)
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - keep]:
+            with contextlib.suppress(OSError):
+                os.unlink(entry.path)
+        self._count = keep
+
+
+def read_document(path: str, text_cache: Optional[TextCache] = None) -> Iterator[str]:
+    """
+    Stream the text of a proposal document through its registered reader.
+    
+    Args:
+        path: Document path; its extension selects the reader
+        text_cache: Optional TextCache; extracted text is served from it
+            when the file's content hash matches, and stored in it otherwise
+            
+    Yields:
+        Text chunks (pages, paragraphs, rows) in document order
+        
+    Raises:
+        ReaderError: If the format is unsupported or the file is unreadable
+    """
+    extension = os.path.splitext(path)[1].lower()
+    reader = READERS.get(extension)
+    if reader is None:
+        supported = ', '.join(sorted(READERS))
+        raise ReaderError(f"Unsupported file type '{extension}' (supported: {supported})")
+    if text_cache is None or not reader.cache_text:
+        yield from reader.read(path)
+        return
+    
+    key = f"{file_digest(path)}-{extension.lstrip('.')}"
+    cached = text_cache.get(key)
+    if cached is not None:
+        yield from _read_text(cached)
+        return
+    with text_cache.writer(key) as out:
+        for chunk in reader.read(path):
+            out.write(chunk)
+            yield chunk
+
+
+class StageTimer:
+    """
+    Wall-clock time and allocation peak per scoring stage.
+    
+    Stages are timed with ``with timer.stage(name):`` and must not nest;
+    a stage that runs more than once accumulates its time and keeps the
+    largest peak.
+    When ``trace_memory`` is set, tracemalloc is started (unless something
+    else is already tracing) and each stage records the peak memory
+    allocated above its starting point; per-stage peaks need Python 3.9+
+    (``tracemalloc.reset_peak``), older versions report the running peak.
+    """
+    
+    def __init__(self, trace_memory: bool = True):
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.trace_memory = trace_memory
+        self._tracemalloc = None
+        self._owns_trace = False
+        self._started = time.perf_counter()
+        if trace_memory:
+            import tracemalloc
+            self._tracemalloc = tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_trace = True
+    
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the body of a ``with`` block as stage ``name``."""
+        tracer = self._tracemalloc
+        if tracer is not None:
+            if hasattr(tracer, 'reset_peak'):
+                tracer.reset_peak()
+            base = tracer.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = self.stages.setdefault(name, {'seconds': 0.0})
+            record['seconds'] += time.perf_counter() - start
+            if tracer is not None:
+                peak = max(tracer.get_traced_memory()[1] - base, 0)
+                record['peak_bytes'] = max(record.get('peak_bytes', 0), peak)
+    
+    def stop(self) -> Dict:
+        """
+        Stop memory tracing (if this timer started it) and return the timings.
+        
+        Returns:
+            Dictionary with 'stages' (name -> seconds and peak_bytes, in
+            the order they ran), 'total_seconds' since the timer was
+            created and the largest 'peak_bytes' of any stage
+        """
+        if self._owns_trace:
+            self._tracemalloc.stop()
+            self._owns_trace = False
+        self._tracemalloc = None
+        timings = {
+            'stages': self.stages,
+            'total_seconds': time.perf_counter() - self._started,
+        }
+        if self.trace_memory:
+            timings['peak_bytes'] = max(
+                (record.get('peak_bytes', 0) for record in self.stages.values()), default=0
+            )
+        return timings
+
+
+# Shared no-op context for stages when profiling is off
+_NO_TIMING = contextlib.nullcontext()
+
+
+def _timed(timer: Optional[StageTimer], name: str):
+    """Context that times stage ``name`` on ``timer``, or does nothing."""
+    return _NO_TIMING if timer is None else timer.stage(name)
+
+
+def _read_chunks(source, chunk_size: int) -> Iterator[str]:
+    """
+    Read a text file object in chunks until it is exhausted.
+    
+    Raises:
+        TypeError: If it returns bytes (a binary file never returns '')
+    """
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+        if isinstance(chunk, bytes):
+            raise TypeError("score_stream needs a text file; open it in text mode")
+        yield chunk
+
+
+def _timed_chunks(chunks: Iterable, timer: Optional[StageTimer], name: str) -> Iterator:
+    """Yield ``chunks``, timing the production of each as stage ``name``."""
+    if timer is None:
+        yield from chunks
+        return
+    iterator = iter(chunks)
+    while True:
+        with timer.stage(name):
+            chunk = next(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class RubricError(ValueError):
+    """Raised when a rubric file or mapping cannot be loaded or is invalid."""
+
+
+class CompiledRubric:
+    """
+    Immutable, ready-to-score form of a rubric.
+    
+    Holds the validated categories (weight, keywords and recommendation
+    text, in order), the KeywordMatcher built from them and a content
+    fingerprint. Scorers swap whole CompiledRubric objects, so a rubric is
+    never seen half-updated.
+    
+    A rubric mapping is either ``{'name': ..., 'categories': {...}}`` or
+    a bare categories mapping shaped like ``ProposalScorer.RUBRIC``.
+    """
+    
+    __slots__ = ('name', 'categories', 'matcher', 'fingerprint', 'path', 'stamp')
+    
+    CATEGORY_KEYS = frozenset(('weight', 'keywords', 'recommendation', 'description'))
+    
+    def __init__(
+        self,
+        data: Dict,
+        path: Optional[str] = None,
+        stamp: Optional[Tuple[int, int]] = None
+    ):
+        """
+        Validate and compile a rubric mapping.
+        
+        Args:
+            data: Rubric mapping
+            path: File the rubric was loaded from, if any; its base name
+                is the rubric's name unless the mapping gives one
+            stamp: (mtime_ns, size) of ``path`` when it was read
+            
+        Raises:
+            RubricError: If the rubric is malformed
+        """
+        default_name = os.path.splitext(os.path.basename(path))[0] if path else 'default'
+        name, categories = self._validate(data, default_name)
+        canonical = json.dumps([name, categories], sort_keys=True)
+        
+        init = super().__setattr__
+        init('name', name)
+        init('categories', types.MappingProxyType({
+            category: types.MappingProxyType(config)
+            for category, config in categories.items()
+        }))
+        init('matcher', KeywordMatcher.from_rubric(categories))
+        init('fingerprint', hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16])
+        init('path', path)
+        init('stamp', stamp)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("CompiledRubric is immutable")
+    
+    def __reduce__(self):
+        # Worker processes recompile from the plain mapping
+        return (CompiledRubric, (self.to_dict(), self.path, self.stamp))
+    
+    def __repr__(self) -> str:
+        return f"CompiledRubric({self.name!r}, {len(self.categories)} categories)"
+    
+    @staticmethod
+    def _validate(data: Any, name: str) -> Tuple[str, Dict[str, Dict]]:
+        """Check a rubric mapping and return its name and normalized categories."""
+        if not isinstance(data, dict):
+            raise RubricError("Rubric must be a mapping")
+        if 'categories' in data:
+            name = str(data.get('name', name))
+            data = data['categories']
+        if not isinstance(data, dict) or not data:
+            raise RubricError("Rubric must define at least one category")
+        
+        categories = {}
+        for category, config in data.items():
+            if not isinstance(config, dict):
+                raise RubricError(f"Category {category!r} must be a mapping")
+            unknown = set(config) - CompiledRubric.CATEGORY_KEYS
+            if unknown:
+                raise RubricError(
+                    f"Category {category!r} has unknown keys: {', '.join(sorted(unknown))}"
+                )
+            weight = config.get('weight')
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+                raise RubricError(f"Category {category!r} needs a non-negative numeric weight")
+            keywords = config.get('keywords')
+            if (not isinstance(keywords, list) or not keywords
+                    or not all(isinstance(kw, str) and kw.strip() for kw in keywords)):
+                raise RubricError(f"Category {category!r} needs a non-empty list of keywords")
+            recommendation = config.get('recommendation', '')
+            if not isinstance(recommendation, str):
+                raise RubricError(f"Category {category!r} recommendation must be text")
+            categories[str(category)] = {
+                'weight': weight,
+                'keywords': [kw.strip().lower() for kw in keywords],
+                'recommendation': recommendation.strip(),
+            }
+        
+        total = sum(config['weight'] for config in categories.values())
+        if abs(total - 100) > 1e-6:
+            raise RubricError(f"Category weights must sum to 100, not {total:g}")
+        return name, categories
+    
+    def to_dict(self) -> Dict:
+        """Plain mapping of this rubric, loadable again by CompiledRubric."""
+        return {
+            'name': self.name,
+            'categories': {
+                category: {**config, 'keywords': list(config['keywords'])}
+                for category, config in self.categories.items()
+            },
+        }
+
+
+# Compiled rubric files by absolute path; an entry is reused while the
+# file's (mtime_ns, size) stamp is unchanged
+_rubric_cache: Dict[str, CompiledRubric] = {}
+
+
+def load_rubric(path: str) -> CompiledRubric:
+    """
+    Load and compile a YAML or JSON rubric file.
+    
+    The compiled rubric is cached by the file's modification time and
+    size, so repeated calls cost one ``stat`` until the file changes.
+    
+    Args:
+        path: Rubric file (.json, .yaml or .yml)
+        
+    Returns:
+        CompiledRubric
+        
+    Raises:
+        RubricError: If the file cannot be read, parsed or validated
+    """
+    path = os.path.abspath(path)
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        raise RubricError(f"Cannot read rubric {path}: {e}") from e
+    stamp = (st.st_mtime_ns, st.st_size)
+    
+    cached = _rubric_cache.get(path)
+    if cached is not None and cached.stamp == stamp:
+        return cached
+    
+    suffix = os.path.splitext(path)[1].lower()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if suffix == '.json':
+                data = json.load(f)
+            elif suffix in ('.yaml', '.yml'):
+                try:
+                    import yaml
+                except ImportError as e:
+                    raise RubricError("PyYAML is required for YAML rubrics: pip install pyyaml") from e
+                data = yaml.safe_load(f)
+            else:
+                raise RubricError(f"Unsupported rubric format: {path} (use .json, .yaml or .yml)")
+    except RubricError:
+        raise
+    except (OSError, ValueError) as e:
+        raise RubricError(f"Cannot parse rubric {path}: {e}") from e
+    except Exception as e:
+        # yaml.YAMLError, without importing yaml for JSON rubrics
+        raise RubricError(f"Cannot parse rubric {path}: {e}") from e
+    
+    compiled = CompiledRubric(data, path=path, stamp=stamp)
+    _rubric_cache[path] = compiled
+    return compiled
+
+
+class CorpusStore:
+    """
+    Append-only SQLite store of scored proposals for empirical percentiles.
+    
+    Each proposal's total and category scores are kept under the
+    fingerprint of the rubric they were scored with (changing weights or
+    keywords starts a new distribution), indexed by score. Lookups bisect
+    sorted arrays loaded from that index once and kept current as results
+    are added (each batch is sorted and merged in one pass), so ranking a
+    proposal costs O(log n); arrays are reloaded only when another
+    process has appended to the database, which lookups check at most
+    once per ``refresh_interval`` seconds.
+    """
+    
+    def __init__(self, path: str, min_size: int = 30, refresh_interval: float = 1.0):
+        """
+        Args:
+            path: SQLite database file (created on first use)
+            min_size: Proposals a rubric needs before percentiles are
+                reported for it
+            refresh_interval: Seconds between lookups' checks for rows
+                appended by other processes (0 checks on every lookup)
+        """
+        self.path = path
+        self.min_size = min_size
+        self.refresh_interval = refresh_interval
+        self._conn = None
+        # (rubric fingerprint, metric) -> sorted scores
+        self._sorted: Dict[Tuple[str, str], array] = {}
+        self._seen_id = 0
+        self._checked: Optional[float] = None
+    
+    def __getstate__(self) -> Dict:
+        # SQLite connections cannot be pickled; worker processes reopen it
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        state['_sorted'] = {}
+        state['_checked'] = None
+        return state
+    
+    def _db(self):
+        """Open the database (a sqlite3 connection) on first use."""
+        if self._conn is None:
+            import sqlite3
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            # Used by one thread at a time, but not always the one that
+            # opened it (BatchPipeline records from its write thread)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.executescript(
+                'CREATE TABLE IF NOT EXISTS proposals ('
+                'id INTEGER PRIMARY KEY, rubric TEXT NOT NULL, rubric_name TEXT NOT NULL, '
+                'key TEXT, grade TEXT NOT NULL, added REAL NOT NULL, UNIQUE (rubric, key));'
+                'CREATE TABLE IF NOT EXISTS scores ('
+                'proposal INTEGER NOT NULL, rubric TEXT NOT NULL, metric TEXT NOT NULL, '
+                'score REAL NOT NULL);'
+                'CREATE INDEX IF NOT EXISTS scores_metric ON scores (rubric, metric, score);'
+            )
+            self._conn.commit()
+        return self._conn
+    
+    def _last_id(self) -> int:
+        """Highest proposal id in the database."""
+        return self._db().execute('SELECT MAX(id) FROM proposals').fetchone()[0] or 0
+    
+    def _refresh(self, force: bool = False) -> None:
+        """
+        Drop loaded arrays if another writer has appended since.
+        
+        Args:
+            force: Check now even if the last check was less than
+                ``refresh_interval`` seconds ago
+        """
+        now = time.monotonic()
+        if (not force and self._checked is not None
+                and now - self._checked < self.refresh_interval):
+            return
+        self._checked = now
+        last = self._last_id()
+        if last != self._seen_id:
+            self._sorted.clear()
+            self._seen_id = last
+    
+    def add(self, result: Dict, rubric: CompiledRubric, key: Optional[str] = None) -> bool:
+        """
+        Append one scoring result.
+        
+        Returns:
+            False if a result with this ``key`` is already stored
+        """
+        return self.add_many([(key, result)], rubric) == 1
+    
+    def add_many(
+        self,
+        results: Iterable[Tuple[Optional[str], Dict]],
+        rubric: CompiledRubric
+    ) -> int:
+        """
+        Append scoring results in a single transaction.
+        
+        Args:
+            results: (key, result) pairs; a key (e.g. a file path or
+                cache key) is stored once per rubric, None always appends
+            rubric: Rubric the results were scored with
+            
+        Returns:
+            Number of results stored
+            
+        Raises:
+            RubricError: If a result's categories do not match ``rubric``
+        """
+        db = self._db()
+        self._refresh(force=True)
+        categories = list(rubric.categories)
+        added: Dict[str, List[float]] = {}
+        now = time.time()
+        with db:
+            for key, result in results:
+                if list(result['category_scores']) != categories:
+                    raise RubricError(
+                        f"Result categories do not match rubric {rubric.name!r}"
+                    )
+                cursor = db.execute(
+                    'INSERT OR IGNORE INTO proposals (rubric, rubric_name, key, grade, added) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (rubric.fingerprint, rubric.name, key, result['grade'], now)
+                )
+                if not cursor.rowcount:
+                    continue
+                scores = [('', result['total_score'])] + list(result['category_scores'].items())
+                db.executemany(
+                    'INSERT INTO scores (proposal, rubric, metric, score) VALUES (?, ?, ?, ?)',
+                    [(cursor.lastrowid, rubric.fingerprint, metric, score)
+                     for metric, score in scores]
+                )
+                for metric, score in scores:
+                    added.setdefault(metric, []).append(score)
+                self._seen_id = cursor.lastrowid
+        
+        for metric, scores in added.items():
+            values = self._sorted.get((rubric.fingerprint, metric))
+            if values is not None:
+                self._sorted[(rubric.fingerprint, metric)] = _merge_sorted(values, sorted(scores))
+        return len(added.get('', ()))
+    
+    def sorted_scores(self, rubric, metric: str = '') -> Sequence[float]:
+        """
+        Stored scores in ascending order.
+        
+        Args:
+            rubric: CompiledRubric or rubric fingerprint
+            metric: Category name, or '' for the total score
+        """
+        fingerprint = getattr(rubric, 'fingerprint', rubric)
+        values = self._sorted.get((fingerprint, metric))
+        if values is None:
+            rows = self._db().execute(
+                'SELECT score FROM scores WHERE rubric = ? AND metric = ? ORDER BY score',
+                (fingerprint, metric)
+            )
+            values = self._sorted[(fingerprint, metric)] = array('d', (row[0] for row in rows))
+        return values
+    
+    def percentile(self, score: float, rubric, metric: str = '') -> Optional[float]:
+        """
+        Percentile rank of ``score`` among stored scores (ties count half).
+        
+        Returns:
+            0-100, or None if the rubric has fewer than ``min_size`` results
+        """
+        self._refresh()
+        return self._percentile(score, rubric, metric)
+    
+    def _percentile(self, score: float, rubric, metric: str = '') -> Optional[float]:
+        values = self.sorted_scores(rubric, metric)
+        if len(values) < max(self.min_size, 1):
+            return None
+        below = bisect.bisect_left(values, score)
+        at_or_below = bisect.bisect_right(values, score, below)
+        return round(100 * (below + at_or_below) / 2 / len(values), 1)
+    
+    def rank(self, result: Dict, rubric: CompiledRubric) -> Optional[Dict]:
+        """
+        Empirical percentiles of a result's total and category scores.
+        
+        Returns:
+            Dictionary with 'percentile_rank', 'category_percentiles' and
+            'corpus_size', or None if the corpus is too small
+        """
+        self._refresh()
+        total = self._percentile(result['total_score'], rubric)
+        if total is None:
+            return None
+        return {
+            'percentile_rank': total,
+            'category_percentiles': {
+                category: self._percentile(score, rubric, category)
+                for category, score in result['category_scores'].items()
+            },
+            'corpus_size': len(self.sorted_scores(rubric)),
+        }
+    
+    def analyze(self) -> List[Dict]:
+        """
+        Score distributions per stored rubric.
+        
+        Returns:
+            One entry per rubric fingerprint, largest first, with its name,
+            proposal count, grade counts and :func:`_distribution` of the
+            total and of each category score
+        """
+        db = self._db()
+        self._refresh(force=True)
+        report = []
+        rubrics = db.execute(
+            'SELECT rubric, MAX(rubric_name), COUNT(*) FROM proposals '
+            'GROUP BY rubric ORDER BY COUNT(*) DESC, MAX(rubric_name)'
+        ).fetchall()
+        for fingerprint, name, count in rubrics:
+            grades = dict(db.execute(
+                'SELECT grade, COUNT(*) FROM proposals WHERE rubric = ? '
+                'GROUP BY grade ORDER BY grade', (fingerprint,)
+            ).fetchall())
+            # Categories in the order they were first stored
+            metrics = [row[0] for row in db.execute(
+                'SELECT metric FROM scores WHERE rubric = ? AND proposal = '
+                '(SELECT MIN(id) FROM proposals WHERE rubric = ?) ORDER BY rowid',
+                (fingerprint, fingerprint)
+            )]
+            report.append({
+                'rubric': name,
+                'fingerprint': fingerprint,
+                'proposals': count,
+                'grades': grades,
+                'total_score': _distribution(self.sorted_scores(fingerprint)),
+                'category_scores': {
+                    metric: _distribution(self.sorted_scores(fingerprint, metric))
+                    for metric in metrics if metric
+                },
+            })
+        return report
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _merge_sorted(values: array, scores: Sequence[float]) -> array:
+    """
+    Sorted ``values`` with sorted ``scores`` merged in.
+    
+    Runs of ``values`` between the scores are copied as slices, so this
+    costs one pass over ``values`` rather than a shift per score.
+    """
+    merged = array(values.typecode)
+    start = 0
+    for score in scores:
+        end = bisect.bisect_right(values, score, start)
+        merged += values[start:end]
+        merged.append(score)
+        start = end
+    merged += values[start:]
+    return merged
+
+
+def _quantile(values: Sequence[float], q: float) -> float:
+    """Quantile of sorted ``values``, interpolating between closest ranks."""
+    position = (len(values) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def _distribution(values: Sequence[float]) -> Dict[str, float]:
+    """Count, mean, spread and quantiles of sorted ``values``."""
+    if not values:
+        return {'count': 0}
+    n = len(values)
+    mean = sum(values) / n
+    stats = {
+        'count': n,
+        'mean': round(mean, 2),
+        'stdev': round((sum((v - mean) ** 2 for v in values) / n) ** 0.5, 2),
+        'min': values[0],
+    }
+    for name, q in (('p10', 0.1), ('p25', 0.25), ('p50', 0.5), ('p75', 0.75), ('p90', 0.9)):
+        stats[name] = round(_quantile(values, q), 2)
+    stats['max'] = values[-1]
+    return stats
+
+
+def _ordinal(n: int) -> str:
+    """English ordinal of ``n`` ('1st', '22nd', '73rd', '11th')."""
+    suffix = 'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f"{n}{suffix}"
+
+
+class DuplicateIndex:
+    """
+    On-disk MinHash/LSH index of earlier submissions for near-duplicate lookup.
+    
+    A proposal's signature is the minimum of ``num_perm`` hash functions
+    over its word shingles (runs of ``shingle_size`` alphanumeric tokens),
+    so the fraction of equal signature values estimates the Jaccard
+    similarity of two proposals' shingle sets. Signatures are split into
+    ``bands`` bands whose keys are indexed in SQLite; a lookup only reads
+    submissions that share a band with the query, which keeps it
+    sub-linear in archive size. With the defaults (128 hashes, 32 bands
+    of 4), pairs above about 0.5 similarity are found with high
+    probability.
+    """
+    
+    # Hash functions are (a * x + b) mod PRIME over 32-bit shingle hashes
+    PRIME = (1 << 32) + 15
+    
+    def __init__(
+        self,
+        path: str,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 3,
+        threshold: float = 0.5,
+        seed: int = 1
+    ):
+        """
+        Args:
+            path: SQLite database file (created on first use)
+            num_perm: Hash functions per signature
+            bands: LSH bands, 1 to 255 (band keys start with the band
+                number as one byte); must divide ``num_perm``
+            shingle_size: Tokens per shingle
+            threshold: Lowest estimated similarity reported as a duplicate
+            seed: Seed of the hash functions; part of the on-disk format
+        
+        Raises:
+            ValueError: If ``bands`` is out of range or does not divide
+                ``num_perm``
+        """
+        if not 1 <= bands <= 255:
+            raise ValueError(f"bands must be between 1 and 255, not {bands}")
+        if num_perm % bands:
+            raise ValueError(f"bands ({bands}) must divide num_perm ({num_perm})")
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.seed = seed
+        import random
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, 1 << 31) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, 1 << 32) for _ in range(num_perm)]
+        self._conn = None
+    
+    def __getstate__(self) -> Dict:
+        # SQLite connections cannot be pickled; worker processes reopen it
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+    
+    def _db(self):
+        """Open the database (a sqlite3 connection) on first use."""
+        if self._conn is None:
+            import sqlite3
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.executescript(
+                'CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);'
+                'CREATE TABLE IF NOT EXISTS signatures ('
+                'id INTEGER PRIMARY KEY, digest TEXT NOT NULL UNIQUE, source TEXT, '
+                'signature BLOB NOT NULL, added REAL NOT NULL);'
+                'CREATE TABLE IF NOT EXISTS bands (key BLOB NOT NULL, id INTEGER NOT NULL);'
+                'CREATE INDEX IF NOT EXISTS bands_key ON bands (key);'
+            )
+            params = json.dumps([self.num_perm, self.bands, self.shingle_size, self.seed])
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('params', ?)", (params,))
+            conn.commit()
+            stored = conn.execute("SELECT value FROM meta WHERE name = 'params'").fetchone()[0]
+            if stored != params:
+                conn.close()
+                raise ValueError(
+                    f"Duplicate index {self.path} was built with different "
+                    f"parameters (num_perm, bands, shingle_size, seed): {stored}"
+                )
+            self._conn = conn
+        return self._conn
+    
+    def signature(self, words: Sequence[str]) -> bytes:
+        """
+        MinHash signature of a token stream.
+        
+        Args:
+            words: Word tokens as produced by the scorer's tokenizer
+            
+        Returns:
+            ``num_perm`` little-endian uint32 values
+        """
+        import numpy as np
+        
+        tokens = [word for word in words if word.isalnum()]
+        k = self.shingle_size
+        shingles = {' '.join(tokens[i:i + k]) for i in range(max(len(tokens) - k + 1, 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        a = np.array(self._a, dtype=np.uint64)
+        b = np.array(self._b, dtype=np.uint64)
+        minimum = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        # Blocks of shingles bound the (shingles x num_perm) temporary
+        for start in range(0, len(hashes), 4096):
+            block = hashes[start:start + 4096, None]
+            np.minimum(minimum, ((block * a + b) % self.PRIME).min(axis=0), out=minimum)
+        return (minimum & 0xFFFFFFFF).astype('<u4').tobytes()
+    
+    def _band_keys(self, signature: bytes) -> List[bytes]:
+        """Index keys of a signature: band number plus the band's values."""
+        width = len(signature) // self.bands
+        return [
+            bytes((band,)) + signature[band * width:(band + 1) * width]
+            for band in range(self.bands)
+        ]
+    
+    def similarity(self, first: bytes, second: bytes) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        values = array('I', first), array('I', second)
+        return sum(x == y for x, y in zip(*values)) / self.num_perm
+    
+    def nearest(self, signature: bytes) -> Optional[Dict]:
+        """
+        Most similar earlier submission sharing an LSH band with ``signature``.
+        
+        Returns:
+            Dictionary with 'digest', 'source' and estimated 'similarity',
+            or None if no candidate reaches ``threshold``
+        """
+        keys = self._band_keys(signature)
+        rows = self._db().execute(
+            'SELECT digest, source, signature FROM signatures WHERE id IN '
+            f'(SELECT id FROM bands WHERE key IN ({",".join("?" * len(keys))}))',
+            keys
+        )
+        best = None
+        for digest, source, other in rows:
+            similarity = self.similarity(signature, other)
+            if similarity >= self.threshold and (best is None or similarity > best['similarity']):
+                best = {'digest': digest, 'source': source, 'similarity': similarity}
+        return best
+    
+    def add(self, digest: str, signature: bytes, source: Optional[str] = None) -> bool:
+        """
+        Index a submission under its text digest.
+        
+        Returns:
+            False if the digest was already indexed
+        """
+        db = self._db()
+        with db:
+            cursor = db.execute(
+                'INSERT OR IGNORE INTO signatures (digest, source, signature, added) '
+                'VALUES (?, ?, ?, ?)', (digest, source, signature, time.time())
+            )
+            if not cursor.rowcount:
+                return False
+            db.executemany(
+                'INSERT INTO bands (key, id) VALUES (?, ?)',
+                [(key, cursor.lastrowid) for key in self._band_keys(signature)]
+            )
+        return True
+    
+    def __len__(self) -> int:
+        return self._db().execute('SELECT COUNT(*) FROM signatures').fetchone()[0]
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+@functools.lru_cache(maxsize=32)
+def _merged_matcher(rubrics: Tuple[CompiledRubric, ...]) -> KeywordMatcher:
+    """One matcher over the categories of several rubrics, in order."""
+    return KeywordMatcher([
+        config['keywords'] for rubric in rubrics for config in rubric.categories.values()
+    ])
+
+
+class CategoryResult:
+    """Score and keyword match details of one rubric category."""
+    
+    __slots__ = (
+        'score', 'max_score', 'keywords_matched', 'total_keywords',
+        'relevant_sentences', 'coverage'
+    )
+    
+    def __init__(
+        self,
+        score: float,
+        max_score: float,
+        keywords_matched: int,
+        total_keywords: int,
+        relevant_sentences: int,
+        coverage: float
+    ):
+        self.score = score
+        self.max_score = max_score
+        self.keywords_matched = keywords_matched
+        self.total_keywords = total_keywords
+        self.relevant_sentences = relevant_sentences
+        self.coverage = coverage
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CategoryResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    def __repr__(self) -> str:
+        return f"CategoryResult(score={self.score:.1f}/{self.max_score}, coverage={self.coverage})"
+    
+    def details(self) -> Dict:
+        """The category's entry in a result's 'category_details'."""
+        return {
+            'max_score': self.max_score,
+            'keywords_matched': self.keywords_matched,
+            'total_keywords': self.total_keywords,
+            'relevant_sentences': self.relevant_sentences,
+            'coverage': self.coverage
+        }
+
+
+class ScoreResult:
+    """
+    Compact form of a ``score_proposal`` result for holding many at once.
+    
+    Category names and recommendation texts are shared between results
+    instead of repeated per result, per-category values live in
+    :class:`CategoryResult` slots, and gaps are derived from the category
+    scores rather than stored. :meth:`to_dict` rebuilds the exact dict
+    that :meth:`from_dict` was given.
+    """
+    
+    __slots__ = (
+        'names', 'categories', 'total_score', 'grade', 'percentile',
+        'recommendations', 'contradictions', 'word_count', 'sentence_count', 'extra'
+    )
+    
+    # Canonical category name tuples and recommendation strings, started
+    # over at SHARED_LIMIT entries so reloaded rubrics cannot pile up
+    _shared: Dict[Any, Any] = {}
+    SHARED_LIMIT = 1024
+    
+    # Keys of a result dict that are not derived from the slots
+    _CORE = (
+        'total_score', 'grade', 'percentile', 'category_scores', 'category_details',
+        'gaps', 'recommendations', 'contradictions', 'word_count', 'sentence_count'
+    )
+    
+    def __init__(
+        self,
+        names: Tuple[str, ...],
+        categories: Tuple[CategoryResult, ...],
+        total_score: float,
+        grade: str,
+        percentile: str,
+        recommendations: Tuple[str, ...] = (),
+        contradictions: Tuple[Dict, ...] = (),
+        word_count: int = 0,
+        sentence_count: int = 0,
+        extra: Optional[Dict] = None
+    ):
+        self.names = self._intern(names)
+        self.categories = categories
+        self.total_score = total_score
+        self.grade = grade
+        self.percentile = percentile
+        self.recommendations = tuple(self._intern(text) for text in recommendations)
+        self.contradictions = contradictions
+        self.word_count = word_count
+        self.sentence_count = sentence_count
+        self.extra = extra or None
+    
+    @classmethod
+    def _intern(cls, value):
+        """The shared copy of ``value``."""
+        shared = cls._shared
+        if value not in shared and len(shared) >= cls.SHARED_LIMIT:
+            # Results built so far keep their copies
+            shared = cls._shared = {}
+        return shared.setdefault(value, value)
+    
+    @classmethod
+    def from_dict(cls, result: Dict) -> 'ScoreResult':
+        """Build from a ``score_proposal`` result dictionary."""
+        details = result['category_details']
+        categories = tuple(
+            CategoryResult(score, **details[name])
+            for name, score in result['category_scores'].items()
+        )
+        extra = {key: value for key, value in result.items() if key not in cls._CORE}
+        return cls(
+            tuple(result['category_scores']),
+            categories,
+            result['total_score'],
+            result['grade'],
+            result['percentile'],
+            result['recommendations'],
+            tuple(result['contradictions']),
+            result['word_count'],
+            result['sentence_count'],
+            extra
+        )
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ScoreResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    def __repr__(self) -> str:
+        return f"ScoreResult(total_score={self.total_score}, grade={self.grade!r})"
+    
+    def gaps(self) -> List[Dict]:
+        """Categories below 70% of their maximum, largest gap first."""
+        gaps = [
+            {
+                'category': name.replace('_', ' ').title(),
+                'category_id': name,
+                'current_score': round(category.score, 1),
+                'max_score': category.max_score,
+                'gap': round(category.max_score - category.score, 1),
+                'coverage': category.coverage
+            }
+            for name, category in zip(self.names, self.categories)
+            if category.score < category.max_score * 0.7
+        ]
+        return sorted(gaps, key=lambda x: x['gap'], reverse=True)
+    
+    def to_dict(self) -> Dict:
+        """The result in ``score_proposal``'s dictionary shape."""
+        result = {
+            'total_score': self.total_score,
+            'grade': self.grade,
+            'percentile': self.percentile,
+            'category_scores': {
+                name: category.score for name, category in zip(self.names, self.categories)
+            },
+            'category_details': {
+                name: category.details() for name, category in zip(self.names, self.categories)
+            },
+            'gaps': self.gaps(),
+            'recommendations': list(self.recommendations),
+            'contradictions': [dict(item) for item in self.contradictions],
+            'word_count': self.word_count,
+            'sentence_count': self.sentence_count
+        }
+        if self.extra:
+            result.update(self.extra)
+        return result
+    
+    def columns(self) -> Tuple[str, ...]:
+        """Names of the :meth:`row` values."""
+        columns = ['total_score', 'grade', 'percentile', 'word_count', 'sentence_count']
+        for name in self.names:
+            columns.extend((f'{name}_score', f'{name}_coverage',
+                            f'{name}_keywords', f'{name}_sentences'))
+        return tuple(columns)
+    
+    def row(self) -> Tuple:
+        """Flat scalar values for tabular output (see :meth:`columns`)."""
+        row = [self.total_score, self.grade, self.percentile, self.word_count, self.sentence_count]
+        for category in self.categories:
+            row.extend((category.score, category.coverage,
+                        category.keywords_matched, category.relevant_sentences))
+        return tuple(row)
+
+
+# Template tags: {{name}}, {{name:format_spec}}, {{#name}}, {{^name}}, {{/name}}
+_TEMPLATE_TAG = re.compile(r'\{\{([#^/]?)\s*(\w+)(?::([^}]*))?\s*\}\}')
+
+
+class ReportTemplate:
+    """
+    A report template compiled once into literal and field operations.
+    
+    ``{{name}}`` or ``{{name:spec}}`` inserts a value, formatted with an
+    optional format spec and then escaped for the output format.
+    ``{{#name}}...{{/name}}`` repeats its body for each item of a list,
+    or renders it once for any other true value; names inside resolve in
+    the item first, then in the enclosing scopes. ``{{^name}}...{{/name}}``
+    renders its body when the value is missing, empty or false.
+    """
+    
+    def __init__(self, source: str, escape: Callable[[str], str] = str):
+        """
+        Args:
+            source: Template text
+            escape: Applied to every inserted value
+        
+        Raises:
+            ValueError: If sections are not properly nested
+        """
+        self.escape = escape
+        self._nodes = self._parse(source)
+    
+    @staticmethod
+    def _parse(source: str) -> List:
+        """Parse into a tree of literals, ('field', name, spec) and
+        ('section', name, inverted, children) nodes."""
+        root: List = []
+        stack = [(None, root)]
+        position = 0
+        for tag in _TEMPLATE_TAG.finditer(source):
+            nodes = stack[-1][1]
+            if tag.start() > position:
+                nodes.append(source[position:tag.start()])
+            position = tag.end()
+            kind, name, spec = tag.groups()
+            if not kind:
+                nodes.append(('field', name, spec or ''))
+            elif kind == '/':
+                if stack[-1][0] != name:
+                    raise ValueError(f"Unexpected {{{{/{name}}}}} in report template")
+                stack.pop()
+            else:
+                children: List = []
+                nodes.append(('section', name, kind == '^', children))
+                stack.append((name, children))
+        if len(stack) > 1:
+            raise ValueError(f"Unclosed {{{{#{stack[-1][0]}}}}} in report template")
+        if position < len(source):
+            root.append(source[position:])
+        return root
+    
+    def render(self, context: Dict, out) -> None:
+        """Write the template rendered with ``context`` to ``out``."""
+        self._render(self._nodes, [context], out.write)
+    
+    def _render(self, nodes: List, scopes: List, write: Callable[[str], Any]) -> None:
+        for node in nodes:
+            if isinstance(node, str):
+                write(node)
+                continue
+            value = self._lookup(scopes, node[1])
+            if node[0] == 'field':
+                if value is None:
+                    raise KeyError(f"Report template field not found: {node[1]}")
+                write(self.escape(format(value, node[2])))
+            elif node[2]:
+                if not value:
+                    self._render(node[3], scopes, write)
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    scopes.append(item)
+                    self._render(node[3], scopes, write)
+                    scopes.pop()
+            elif value:
+                scopes.append(value)
+                self._render(node[3], scopes, write)
+                scopes.pop()
+    
+    @staticmethod
+    def _lookup(scopes: List, name: str) -> Any:
+        """Value of ``name`` in the innermost scope that has it, or None."""
+        for scope in reversed(scopes):
+            if isinstance(scope, dict) and name in scope:
+                return scope[name]
+        return None
+
+
+def _markdown_escape(text: str) -> str:
+    """Escape characters with Markdown meaning inside a line or table cell."""
+    return re.sub(r'([\\`*_\[\]|<>])', r'\\\1', text)
+
+
+def _html_escape(text: str) -> str:
+    """Escape text for HTML element content and attribute values."""
+    import html
+    return html.escape(text)
+
+
+_RULE = '=' * 60
+
+TEXT_REPORT = (
+    "{{#rubric}}Rubric: {{rubric}}\n{{/rubric}}"
+    + _RULE + "\n"
+    "HVAC AI ADOPTION PROPOSAL SCORE\n"
+    + _RULE + "\n"
+    "\n"
+    "Overall Score: {{total_score}}/100 (Grade: {{grade}})\n"
+    "Percentile: {{percentile}}\n"
+    "\n"
+    "Proposal Stats:\n"
+    "  - {{word_count}} words\n"
+    "  - {{sentence_count}} sentences\n"
+    "\n"
+    + f"{'Category':<25} {'Score':<10} Coverage\n"
+    + "-" * 60 +
+    "{{#categories}}\n{{name:<25}} {{score:.1f}}/{{max_score:<5}} {{coverage}}%{{/categories}}"
+    "{{#has_sections}}\n\n" + _RULE + "\nSECTION SCORES\n" + _RULE + "\n"
+    + f"{'Section':<36} {'Score':>7} {'Sentences':>10}\n"
+    + "-" * 60 +
+    "{{#sections}}\n{{heading:<36}} {{total_score:>7.1f}} {{sentence_count:>10}}{{/sections}}"
+    "{{/has_sections}}"
+    "{{#has_gaps}}\n\n" + _RULE + "\nGAPS IDENTIFIED\n" + _RULE +
+    "{{#gaps}}\n\n{{category}}:\n"
+    "  Current: {{current_score}}/{{max_score}}\n"
+    "  Gap: {{gap}} points\n"
+    "  Coverage: {{coverage}}%{{/gaps}}{{/has_gaps}}"
+    "{{#has_recommendations}}\n\n" + _RULE + "\nRECOMMENDATIONS\n" + _RULE +
+    "{{#recommendations}}\n\n{{number}}. {{text}}{{/recommendations}}{{/has_recommendations}}"
+    "{{#has_contradictions}}\n\n" + _RULE + "\nPOTENTIAL CONTRADICTIONS\n" + _RULE +
+    "{{#contradictions}}\n\nSentence {{sentence_num}}:\n  {{text}}"
+    "{{#related_sentence_num}}\n  conflicts with sentence {{related_sentence_num}}:\n"
+    "  {{related_text}}{{/related_sentence_num}}{{/contradictions}}{{/has_contradictions}}"
+    "\n\n" + _RULE + "\nSCORING INTERPRETATION\n" + _RULE + "\n"
+    "\n"
+    "Grade {{grade}} - {{interpretation}}\n"
+    "\n"
+    "\n"
+    "⚠️  Minimum 75/100 recommended for pilot success\n"
+    + _RULE
+)
+
+MARKDOWN_REPORT = (
+    "# HVAC AI Adoption Proposal Score{{#rubric}} ({{rubric}}){{/rubric}}\n"
+    "\n"
+    "**Overall score:** {{total_score}}/100 (Grade {{grade}})  \n"
+    "**Percentile:** {{percentile}}  \n"
+    "**Length:** {{word_count}} words, {{sentence_count}} sentences\n"
+    "\n"
+    "| Category | Score | Coverage |\n"
+    "|---|---:|---:|\n"
+    "{{#categories}}| {{name}} | {{score:.1f}}/{{max_score}} | {{coverage}}% |\n{{/categories}}"
+    "{{#has_sections}}\n## Section Scores\n\n"
+    "| Section | Score | Sentences |\n"
+    "|---|---:|---:|\n"
+    "{{#sections}}| {{heading}} | {{total_score:.1f}} | {{sentence_count}} |\n{{/sections}}"
+    "{{/has_sections}}"
+    "{{#has_gaps}}\n## Gaps Identified\n\n"
+    "| Category | Current | Gap | Coverage |\n"
+    "|---|---:|---:|---:|\n"
+    "{{#gaps}}| {{category}} | {{current_score}}/{{max_score}} | {{gap}} | {{coverage}}% |\n"
+    "{{/gaps}}{{/has_gaps}}"
+    "{{#has_recommendations}}\n## Recommendations\n\n"
+    "{{#recommendations}}{{number}}. {{text}}\n{{/recommendations}}{{/has_recommendations}}"
+    "{{#has_contradictions}}\n## Potential Contradictions\n\n"
+    "{{#contradictions}}- **Sentence {{sentence_num}}:** {{text}}"
+    "{{#related_sentence_num}}  \n  conflicts with **sentence {{related_sentence_num}}:** "
+    "{{related_text}}{{/related_sentence_num}}\n{{/contradictions}}{{/has_contradictions}}"
+    "\n## Scoring Interpretation\n"
+    "\n"
+    "**Grade {{grade}}** - {{interpretation}}\n"
+    "\n"
+    "> ⚠️ Minimum 75/100 recommended for pilot success\n"
+)
+
+HTML_REPORT = (
+    "<!DOCTYPE html>\n"
+    "<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+    "<title>Proposal Score {{total_score}}/100{{#rubric}} - {{rubric}}{{/rubric}}</title>\n"
+    "<style>\n"
+    "body{font-family:system-ui,sans-serif;max-width:50rem;margin:2rem auto;color:#222}\n"
+    "table{border-collapse:collapse;width:100%}th,td{padding:.3rem .6rem;"
+    "border-bottom:1px solid #ddd;text-align:left}td.n{text-align:right}\n"
+    ".grade{font-size:1.4rem;font-weight:bold}.note{color:#8a5a00}\n"
+    "</style>\n</head>\n<body>\n"
+    "<h1>HVAC AI Adoption Proposal Score</h1>\n"
+    "{{#rubric}}<p>Rubric: {{rubric}}</p>\n{{/rubric}}"
+    "<p class=\"grade\">{{total_score}}/100 &middot; Grade {{grade}}</p>\n"
+    "<p>Percentile: {{percentile}}<br>{{word_count}} words, {{sentence_count}} sentences</p>\n"
+    "<table>\n<tr><th>Category</th><th>Score</th><th>Coverage</th></tr>\n"
+    "{{#categories}}<tr><td>{{name}}</td><td class=\"n\">{{score:.1f}}/{{max_score}}</td>"
+    "<td class=\"n\">{{coverage}}%</td></tr>\n{{/categories}}"
+    "</table>\n"
+    "{{#has_sections}}<h2>Section Scores</h2>\n<table>\n"
+    "<tr><th>Section</th><th>Score</th><th>Sentences</th></tr>\n"
+    "{{#sections}}<tr><td>{{heading}}</td><td class=\"n\">{{total_score:.1f}}</td>"
+    "<td class=\"n\">{{sentence_count}}</td></tr>\n{{/sections}}"
+    "</table>\n{{/has_sections}}"
+    "{{#has_gaps}}<h2>Gaps Identified</h2>\n<table>\n"
+    "<tr><th>Category</th><th>Current</th><th>Gap</th><th>Coverage</th></tr>\n"
+    "{{#gaps}}<tr><td>{{category}}</td><td class=\"n\">{{current_score}}/{{max_score}}</td>"
+    "<td class=\"n\">{{gap}}</td><td class=\"n\">{{coverage}}%</td></tr>\n{{/gaps}}"
+    "</table>\n{{/has_gaps}}"
+    "{{#has_recommendations}}<h2>Recommendations</h2>\n<ol>\n"
+    "{{#recommendations}}<li>{{text}}</li>\n{{/recommendations}}</ol>\n{{/has_recommendations}}"
+    "{{#has_contradictions}}<h2>Potential Contradictions</h2>\n<ul>\n"
+    "{{#contradictions}}<li><strong>Sentence {{sentence_num}}:</strong> {{text}}"
+    "{{#related_sentence_num}}<br>conflicts with <strong>sentence {{related_sentence_num}}:"
+    "</strong> {{related_text}}{{/related_sentence_num}}</li>\n{{/contradictions}}"
+    "</ul>\n{{/has_contradictions}}"
+    "<h2>Scoring Interpretation</h2>\n"
+    "<p><strong>Grade {{grade}}</strong> - {{interpretation}}</p>\n"
+    "<p class=\"note\">⚠️ Minimum 75/100 recommended for pilot success</p>\n"
+    "</body>\n</html>\n"
+)
+
+
+class ReportFormat(NamedTuple):
+    """A report output format: template source, value escaping, file extension."""
+    template: str
+    escape: Callable[[str], str]
+    extension: str
+
+
+# Report formats for format_report/render_report and --report-format
+REPORT_FORMATS: Dict[str, ReportFormat] = {
+    'text': ReportFormat(TEXT_REPORT, str, '.txt'),
+    'markdown': ReportFormat(MARKDOWN_REPORT, _markdown_escape, '.md'),
+    'html': ReportFormat(HTML_REPORT, _html_escape, '.html'),
+}
+
+GRADE_INTERPRETATIONS = {
+    'A': "Excellent! Ready for implementation.",
+    'B': "Good. Minor improvements recommended.",
+    'C': "Acceptable. Address key gaps before proceeding.",
+    'D': "Needs work. Significant improvements required.",
+    'F': "Insufficient. Major revision needed.",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def report_template(name: str) -> ReportTemplate:
+    """
+    The compiled template of a report format, compiled once per process.
+    
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if name not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {name}")
+    report_format = REPORT_FORMATS[name]
+    return ReportTemplate(report_format.template, report_format.escape)
+
+
+def _report_context(results: Dict, rubric: Optional[str] = None) -> Dict:
+    """Values the report templates render, from a scoring result."""
+    return {
+        'rubric': rubric,
+        'total_score': results['total_score'],
+        'grade': results['grade'],
+        'percentile': results['percentile'],
+        'word_count': results['word_count'],
+        'sentence_count': results['sentence_count'],
+        'categories': [
+            {
+                'name': category.replace('_', ' ').title(),
+                'score': score,
+                'max_score': results['category_details'][category]['max_score'],
+                'coverage': results['category_details'][category]['coverage'],
+            }
+            for category, score in results['category_scores'].items()
+        ],
+        'has_sections': bool(results.get('sections')),
+        'sections': [
+            {**section, 'heading': section['heading'] or '(untitled)'}
+            for section in results.get('sections', ())
+        ],
+        'has_gaps': bool(results['gaps']),
+        'gaps': results['gaps'],
+        'has_recommendations': bool(results['recommendations']),
+        'recommendations': [
+            {'number': number, 'text': text}
+            for number, text in enumerate(results['recommendations'], 1)
+        ],
+        'has_contradictions': bool(results['contradictions']),
+        'contradictions': results['contradictions'],
+        'interpretation': GRADE_INTERPRETATIONS.get(results['grade'], GRADE_INTERPRETATIONS['F']),
+    }
+
+
+class ProposalScorer:
+    """
+    Scores HVAC AI adoption proposals based on comprehensive rubric.
+    
+    The built-in rubric is :attr:`RUBRIC`; pass ``rubric`` to score
+    against a YAML/JSON rubric file or mapping instead. The compiled
+    rubric in use is :attr:`rubric`.
+    """
+    
+    # Scoring categories and weights
+    RUBRIC = {
+        'business_case': {
+            'weight': 25,
+            'keywords': [
+                'roi', 'return on investment', 'cost savings', 'revenue',
+                'efficiency', 'productivity', 'competitive advantage',
+                'market opportunity', 'business value', 'impact'
+            ],
+            'recommendation': (
+                "Add quantifiable business outcomes with specific ROI projections. "
+                "Include baseline metrics and target improvements."
+            )
+        },
+        'technical_readiness': {
+            'weight': 20,
+            'keywords': [
+                'infrastructure', 'systems', 'technology', 'platform',
+                'integration', 'api', 'database', 'architecture',
+                'technical capability', 'expertise', 'resources'
+            ],
+            'recommendation': (
+                "Detail your existing technical infrastructure and integration plans. "
+                "Address system compatibility and technical resource availability."
+            )
+        },
+        'data_foundation': {
+            'weight': 20,
+            'keywords': [
+                'data', 'dataset', 'historical records', 'analytics',
+                'data quality', 'data collection', 'measurements',
+                'metrics', 'reporting', 'information systems'
+            ],
+            'recommendation': (
+                "Document your current data landscape including quality, volume, and accessibility. "
+                "Outline data collection and preparation strategies."
+            )
+        },
+        'success_metrics': {
+            'weight': 15,
+            'keywords': [
+                'kpi', 'metric', 'measurement', 'baseline', 'target',
+                'goal', 'objective', 'performance indicator', 'tracking',
+                'evaluation', 'success criteria', 'benchmark'
+            ],
+            'recommendation': (
+                "Define specific, measurable KPIs with baseline and target values. "
+                "Include measurement methodology and reporting frequency."
+            )
+        },
+        'risk_management': {
+            'weight': 10,
+            'keywords': [
+                'risk', 'mitigation', 'contingency', 'challenge',
+                'governance', 'compliance', 'security', 'privacy',
+                'backup plan', 'failsafe', 'risk assessment'
+            ],
+            'recommendation': (
+                "Identify potential risks and develop mitigation strategies. "
+                "Address data privacy, security, and compliance requirements."
+            )
+        },
+        'change_management': {
+            'weight': 10,
+            'keywords': [
+                'training', 'adoption', 'communication', 'stakeholder',
+                'buy-in', 'change management', 'user acceptance',
+                'engagement', 'support', 'transition', 'culture'
+            ],
+            'recommendation': (
+                "Create a stakeholder engagement plan with training strategy. "
+                "Address adoption challenges and communication approaches."
+            )
+        }
+    }
+    
+    # Grade and percentile bands as sorted lower bounds, for vectorized
+    # scoring; they mirror _calculate_grade and _score_to_percentile
+    GRADE_THRESHOLDS = (60, 70, 80, 90)
+    GRADES = ('F', 'D', 'C', 'B', 'A')
+    PERCENTILES = (
+        'Below 40th', '40th-60th (Middle)', '60th-80th (Top 40%)',
+        '80th-95th (Top 20%)', '95th+ (Top 10%)'
+    )
+    
+    # RUBRIC compiled by default_rubric()
+    _default_rubric: Optional[CompiledRubric] = None
+    
+    def __init__(
+        self,
+        verbose: bool = False,
+        tokenizer='nltk',
+        cache: Optional[ResultCache] = None,
+        profile: bool = False,
+        on_timings: Optional[Callable[[Dict], None]] = None,
+        rubric=None,
+        rubric_check_interval: Optional[float] = None,
+        match: str = 'substring',
+        text_cache: Optional[TextCache] = None,
+        corpus: Optional[CorpusStore] = None,
+        dedup: Optional[DuplicateIndex] = None,
+        reuse_duplicates: Optional[float] = None,
+        sections: bool = False,
+        section_cache: Optional[ResultCache] = None
+    ):
+        """
+        Initialize the scorer.
+        
+        Args:
+            verbose: Print a per-category breakdown while scoring
+            tokenizer: Tokenizer backend name from TOKENIZERS, or a
+                Tokenizer instance
+            cache: Optional ResultCache for results of unchanged proposals
+            profile: Time each scoring stage and record allocation peaks
+                in a 'timings' entry of the results
+            on_timings: Optional callback receiving each timings block
+                (implies ``profile``), e.g. to forward it to an APM
+            rubric: Rubric file path, rubric mapping or CompiledRubric
+                (default: the built-in RUBRIC)
+            rubric_check_interval: When the rubric came from a file, check
+                it for changes at most this often (seconds) while scoring
+                and swap in the recompiled rubric; None never checks
+            match: Keyword matching mode from MATCH_MODES: 'substring'
+                (keywords match anywhere, even inside words), 'word'
+                (whole words and phrases, via a per-document token index)
+                or 'stem' (whole words compared by Porter stem)
+            text_cache: Optional TextCache for text extracted by
+                :meth:`score_document`
+            corpus: Optional CorpusStore of earlier results; once it holds
+                enough proposals for the rubric, percentiles are empirical
+                ranks within it instead of fixed score bands
+            dedup: Optional DuplicateIndex; :meth:`score_proposal` then
+                reports the nearest earlier submission and indexes the text
+            reuse_duplicates: With ``dedup`` and ``cache``, return the
+                cached result of an earlier submission at least this
+                similar (0-1) instead of scoring
+            sections: Split proposals at their headings (see
+                :func:`split_sections`), count matches per section and
+                combine the counts; results gain a 'sections' entry with
+                each section's own scores. A heading always starts a new
+                sentence, so counts can differ from whole-text scoring.
+            section_cache: ResultCache of per-section counts keyed by the
+                section's text, so sections a templated proposal shares
+                with earlier ones are not scored again (default with
+                ``sections``: an in-memory cache)
+        
+        Raises:
+            RubricError: If ``rubric`` cannot be loaded
+            ValueError: If ``match`` is not a known mode
+        """
+        self.verbose = verbose
+        self.cache = cache
+        self.text_cache = text_cache
+        self.corpus = corpus
+        self.dedup = dedup
+        self.reuse_duplicates = reuse_duplicates
+        self.sections = sections
+        if sections and section_cache is None:
+            section_cache = ResultCache(max_memory_entries=4096)
+        self.section_cache = section_cache
+        self.profile = profile or on_timings is not None
+        self.on_timings = on_timings
+        if isinstance(tokenizer, str):
+            if tokenizer not in TOKENIZERS:
+                raise ValueError(f"Unknown tokenizer: {tokenizer}")
+            tokenizer = TOKENIZERS[tokenizer]()
+        self.tokenizer = tokenizer
+        self._stop_words: Optional[Set[str]] = None
+        if match not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode: {match}")
+        self.match = match
+        self._index_matchers: Dict[Tuple[CompiledRubric, ...], IndexMatcher] = {}
+        self._contradiction_detector: Optional[ContradictionDetector] = None
+        self.rubric_check_interval = rubric_check_interval
+        self.rubric_error: Optional[str] = None
+        self._rubric_checked = time.monotonic()
+        self._fingerprint: Optional[Tuple[CompiledRubric, str]] = None
+        self.rubric = self.compile_rubric(rubric)
+    
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state['_fingerprint'] = None
+        state['_index_matchers'] = {}
+        state['_contradiction_detector'] = None
+        return state
+    
+    @classmethod
+    def default_rubric(cls) -> CompiledRubric:
+        """The built-in RUBRIC, compiled once per class."""
+        compiled = cls.__dict__.get('_default_rubric')
+        if compiled is None:
+            compiled = CompiledRubric(cls.RUBRIC)
+            cls._default_rubric = compiled
+        return compiled
+    
+    @classmethod
+    def compile_rubric(cls, rubric=None) -> CompiledRubric:
+        """
+        Resolve a rubric argument to a CompiledRubric.
+        
+        Args:
+            rubric: Rubric file path, rubric mapping, CompiledRubric, or
+                None for the built-in RUBRIC
+            
+        Raises:
+            RubricError: If the rubric cannot be loaded
+        """
+        if rubric is None:
+            return cls.default_rubric()
+        if isinstance(rubric, CompiledRubric):
+            return rubric
+        if isinstance(rubric, (str, Path)):
+            return load_rubric(str(rubric))
+        return CompiledRubric(rubric)
+    
+    def _named_rubrics(self, rubrics) -> Dict[str, CompiledRubric]:
+        """
+        Compile the ``rubrics`` argument of score_proposal, keyed by name.
+        
+        Args:
+            rubrics: Mapping of name to rubric, or a sequence of rubrics
+                named after their ``name``
+            
+        Raises:
+            RubricError: If a rubric cannot be loaded or names repeat
+        """
+        if isinstance(rubrics, dict):
+            return {str(name): self.compile_rubric(rubric) for name, rubric in rubrics.items()}
+        
+        named: Dict[str, CompiledRubric] = {}
+        for rubric in rubrics:
+            compiled = self.compile_rubric(rubric)
+            if compiled.name in named:
+                raise RubricError(f"Duplicate rubric name: {compiled.name}")
+            named[compiled.name] = compiled
+        if not named:
+            raise RubricError("No rubrics given")
+        return named
+    
+    @property
+    def rubric(self) -> CompiledRubric:
+        """The CompiledRubric in use; assigning swaps it atomically."""
+        return self._rubric
+    
+    @rubric.setter
+    def rubric(self, rubric: CompiledRubric) -> None:
+        # Scoring reads self._rubric once per call, so one assignment is
+        # the whole swap
+        self._rubric = rubric
+    
+    @property
+    def matcher(self):
+        """Keyword matcher of the current rubric for this match mode."""
+        return self._matcher((self._rubric,))
+    
+    @property
+    def contradiction_detector(self) -> ContradictionDetector:
+        """Claim cue detector matching this scorer's match mode."""
+        if self._contradiction_detector is None:
+            self._contradiction_detector = ContradictionDetector(
+                _porter_stem() if self.match == 'stem' else None
+            )
+        return self._contradiction_detector
+    
+    def _matcher(self, rubrics: Tuple[CompiledRubric, ...]):
+        """
+        Matcher over the categories of ``rubrics``, in order.
+        
+        Returns:
+            The rubrics' (merged) KeywordMatcher in 'substring' mode,
+            otherwise an IndexMatcher compiled once per rubric combination
+        """
+        if self.match == 'substring':
+            return rubrics[0].matcher if len(rubrics) == 1 else _merged_matcher(rubrics)
+        
+        matcher = self._index_matchers.get(rubrics)
+        if matcher is None:
+            if len(self._index_matchers) >= 32:
+                self._index_matchers.clear()
+            matcher = IndexMatcher(
+                [config['keywords'] for rubric in rubrics for config in rubric.categories.values()],
+                self.tokenizer,
+                stem=self.match == 'stem'
+            )
+            self._index_matchers[rubrics] = matcher
+        return matcher
+    
+    def reload_rubric(self) -> bool:
+        """
+        Swap in the rubric file's latest version if it has changed.
+        
+        Returns:
+            True if a new rubric was swapped in
+            
+        Raises:
+            RubricError: If the changed file is invalid; the current
+                rubric stays in use
+        """
+        path = self._rubric.path
+        if path is None:
+            return False
+        rubric = load_rubric(path)
+        if rubric.fingerprint == self._rubric.fingerprint:
+            return False
+        self.rubric = rubric
+        return True
+    
+    def _check_rubric(self) -> None:
+        """Reload the rubric file when rubric_check_interval has elapsed."""
+        now = time.monotonic()
+        if now - self._rubric_checked < self.rubric_check_interval:
+            return
+        self._rubric_checked = now
+        try:
+            self.reload_rubric()
+        except RubricError as e:
+            if str(e) != self.rubric_error:
+                print(f"Warning: keeping previous rubric: {e}", file=sys.stderr)
+            self.rubric_error = str(e)
+        else:
+            self.rubric_error = None
+        
+    @property
+    def stop_words(self) -> Set[str]:
+        """English stopwords, loaded from NLTK on first use."""
+        if self._stop_words is None:
+            self._stop_words = set(_nltk_stopwords())
+        return self._stop_words
+    
+    def load_resources(self) -> None:
+        """
+        Load NLTK tokenizer and stopword data now instead of on first score.
+        
+        Raises:
+            NLTKResourceError: If data is missing and cannot be downloaded
+        """
+        self.stop_words
+        self.tokenizer.load()
+        
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the rubric, tokenizer and scorer version used in cache keys."""
+        rubric = self._rubric
+        if self._fingerprint is None or self._fingerprint[0] is not rubric:
+            self._fingerprint = (rubric, self._rubric_fingerprint(rubric))
+        return self._fingerprint[1]
+    
+    def _rubric_fingerprint(self, rubric: CompiledRubric) -> str:
+        """Fingerprint of this scorer configuration with ``rubric``."""
+        config = [rubric.fingerprint, self.tokenizer.name, self.match, __version__]
+        if self.sections:
+            # Sentences end at headings, so counts differ from whole-text scoring
+            config.append('sections')
+        return hashlib.sha256(json.dumps(config).encode('utf-8')).hexdigest()[:16]
+    
+    def cache_key(self, proposal_text: str, rubric: Optional[CompiledRubric] = None) -> str:
+        """
+        Content address of a proposal for this scorer configuration.
+        
+        The text is normalized the way scoring sees it (lowercased, outer
+        whitespace stripped), so resubmissions with only those differences
+        share a key.
+        
+        Args:
+            proposal_text: The proposal content
+            rubric: Rubric to key for (default: the scorer's rubric)
+        """
+        fingerprint = self.fingerprint if rubric is None else self._rubric_fingerprint(rubric)
+        return f"{fingerprint}:{self._text_digest(proposal_text)}"
+    
+    @staticmethod
+    def _text_digest(proposal_text: str) -> str:
+        """Hash of the normalized proposal text used in cache keys."""
+        return ProposalScorer._lowered_digest(proposal_text.lower())
+    
+    @staticmethod
+    def _lowered_digest(text: str) -> str:
+        """:meth:`_text_digest` of text that is already lowercased."""
+        return hashlib.sha256(text.strip().encode('utf-8')).hexdigest()
+    
+    def score_proposal(
+        self,
+        proposal_text: str,
+        use_cache: bool = True,
+        rubrics=None,
+        source: Optional[str] = None
+    ) -> Dict:
+        """
+        Score a proposal and return detailed results.
+        
+        Args:
+            proposal_text: The proposal content to analyze
+            use_cache: Consult and fill the scorer's cache, if it has one
+            rubrics: Optional rubrics to score against instead of the
+                scorer's own: a mapping of name to rubric (path, mapping or
+                CompiledRubric) or a sequence of rubrics named after their
+                ``name``. The text is tokenized and scanned once for all
+                of them.
+            source: Label of this submission (e.g. its file path) kept in
+                the duplicate index
+            
+        Returns:
+            Dictionary with scores, grade, and recommendations, or with
+            ``rubrics``, a dictionary of such results keyed by rubric name.
+            With a cache, a 'cache' entry reports whether this was a hit
+            along with running hit/miss counts. With profiling, a
+            'timings' entry holds per-stage seconds and allocation peaks.
+            With a duplicate index, a 'duplicate' entry describes the
+            nearest earlier submission ('source', 'digest', estimated
+            'similarity' and whether its result was 'reused').
+            
+        Raises:
+            ValueError: If the text is too short
+            RubricError: If one of ``rubrics`` cannot be loaded
+        """
+        if not proposal_text or len(proposal_text.strip()) < 100:
+            raise ValueError("Proposal text is too short (minimum 100 characters)")
+        if self.rubric_check_interval is not None:
+            self._check_rubric()
+        
+        if rubrics is None:
+            named = None
+            targets = [self._rubric]
+        else:
+            named = self._named_rubrics(rubrics)
+            targets = list(named.values())
+        
+        timer = StageTimer() if self.profile else None
+        try:
+            text = document = duplicate = results = None
+            if self.dedup is not None:
+                # The duplicate check and scoring share one tokenization
+                text = self._lower(proposal_text, timer)
+                document = self._tokenize(text, timer)
+                with _timed(timer, 'dedup'):
+                    duplicate, results = self._check_duplicate(
+                        text, document.words(), targets, use_cache, source
+                    )
+            
+            if results is not None:
+                # A near-duplicate's results, read from the cache
+                stats = self.cache.stats()
+                for result in results:
+                    result['cache'] = {'hit': True, **stats}
+                    self._print_cached(result)
+            elif self.cache is None or not use_cache:
+                if self.sections:
+                    results = self._score_sections(proposal_text, targets, timer)
+                else:
+                    results = self._score_rubrics(
+                        text or self._lower(proposal_text, timer), targets, timer, document
+                    )
+            else:
+                # The cache key and scoring share one lowercased copy
+                text = text or self._lower(proposal_text, timer)
+                with _timed(timer, 'cache_lookup'):
+                    digest = self._lowered_digest(text)
+                    keys = [f"{self._rubric_fingerprint(rubric)}:{digest}" for rubric in targets]
+                    results = [self.cache.get(key) for key in keys]
+                missing = [i for i, result in enumerate(results) if result is None]
+                if missing:
+                    missing_targets = [targets[i] for i in missing]
+                    if self.sections:
+                        scored = self._score_sections(proposal_text, missing_targets, timer)
+                    else:
+                        scored = self._score_rubrics(text, missing_targets, timer, document)
+                    with _timed(timer, 'cache_store'):
+                        for i, result in zip(missing, scored):
+                            results[i] = result
+                            self.cache.put(keys[i], result)
+                stats = self.cache.stats()
+                for i, result in enumerate(results):
+                    result['cache'] = {'hit': i not in missing, **stats}
+                    if i not in missing:
+                        # Percentiles move with the corpus, not the text
+                        self._apply_percentile(result, targets[i])
+                        self._print_cached(result)
+        finally:
+            timings = timer.stop() if timer is not None else None
+        
+        if duplicate is not None:
+            for result in results:
+                result['duplicate'] = dict(duplicate)
+        if timings is not None:
+            for result in results:
+                result['timings'] = timings
+            if self.on_timings is not None:
+                self.on_timings(timings)
+        if named is None:
+            return results[0]
+        return dict(zip(named, results))
+    
+    def _check_duplicate(
+        self,
+        text: str,
+        words: Iterable[str],
+        targets: Sequence[CompiledRubric],
+        use_cache: bool,
+        source: Optional[str]
+    ) -> Tuple[Optional[Dict], Optional[List[Dict]]]:
+        """
+        Look up and index a submission (its lowercased ``text`` and word
+        tokens) in the duplicate index.
+        
+        Returns:
+            The nearest earlier submission (or None) and, when its cached
+            results can be reused, those results (otherwise None)
+        """
+        digest = self._lowered_digest(text)
+        signature = self.dedup.signature(words)
+        duplicate = self.dedup.nearest(signature)
+        self.dedup.add(digest, signature, source)
+        if duplicate is None:
+            return None, None
+        
+        duplicate['reused'] = False
+        if (self.reuse_duplicates is not None and self.cache is not None and use_cache
+                and duplicate['digest'] != digest
+                and duplicate['similarity'] >= self.reuse_duplicates):
+            results = [
+                self.cache.get(f"{self._rubric_fingerprint(rubric)}:{duplicate['digest']}")
+                for rubric in targets
+            ]
+            if all(result is not None for result in results):
+                duplicate['reused'] = True
+                for rubric, result in zip(targets, results):
+                    self._apply_percentile(result, rubric)
+                return duplicate, results
+        return duplicate, None
+    
+    def _tokenize(self, text: str, timer: Optional[StageTimer] = None) -> Document:
+        """
+        Tokenize lowercased text into a :class:`Document`.
+        
+        In word/stem mode words are tokenized per sentence, so the same
+        token ids feed both the word count and the keyword index.
+        """
+        with _timed(timer, 'sentence_tokenize'):
+            spans = self.tokenizer.sentence_spans(text)
+        with _timed(timer, 'word_tokenize'):
+            return Document.tokenize(
+                text, spans, self.tokenizer, by_sentence=self.match != 'substring'
+            )
+    
+    @staticmethod
+    def _lower(text: str, timer: Optional[StageTimer] = None) -> str:
+        """Lowercase ``text``, timed as the 'lowercase' stage."""
+        with _timed(timer, 'lowercase'):
+            return text.lower()
+    
+    def _score_text(self, text: str, timer: Optional[StageTimer] = None) -> Dict:
+        """Score lowercased proposal text."""
+        return self._score_rubrics(text, [self._rubric], timer)[0]
+    
+    def _score_rubrics(
+        self,
+        text: str,
+        rubrics: Sequence[CompiledRubric],
+        timer: Optional[StageTimer] = None,
+        document: Optional[Document] = None
+    ) -> List[Dict]:
+        """
+        Score lowercased proposal text against each of ``rubrics``.
+        
+        Tokenization, word counting and contradiction detection run once,
+        and keywords of every rubric are matched in a single scan.
+        ``document`` is the text's :meth:`_tokenize` output, if already known.
+        """
+        document, matches, word_count, signals = self._scan(text, rubrics, timer, document)
+        spans = document.spans
+        
+        results = []
+        offset = 0
+        for rubric in rubrics:
+            groups = range(offset, offset + len(rubric.categories))
+            with _timed(timer, 'detect_contradictions'):
+                contradictions = self._detect_contradictions(
+                    text, spans, matches, rubric, offset, signals
+                )
+            offset += len(rubric.categories)
+            results.append(self._build_results(
+                [matches.keywords_matched(i) for i in groups],
+                [matches.relevant_sentences(i) for i in groups],
+                len(spans),
+                word_count,
+                contradictions,
+                timer,
+                rubric
+            ))
+        return results
+    
+    def _scan(
+        self,
+        text: str,
+        rubrics: Sequence[CompiledRubric],
+        timer: Optional[StageTimer] = None,
+        document: Optional[Document] = None
+    ) -> Tuple[Document, KeywordMatches, int, Dict[int, List[float]]]:
+        """
+        Tokenize lowercased text and match it against ``rubrics``.
+        
+        Returns:
+            (document, keyword matches of every rubric, word count,
+            ContradictionDetector.signals)
+        """
+        matcher = self._matcher(tuple(rubrics))
+        index = None
+        
+        # Preprocess text
+        document = document or self._tokenize(text, timer)
+        spans = document.spans
+        if document.sentence_starts is not None:
+            with _timed(timer, 'build_index'):
+                index = matcher.index(document)
+        with _timed(timer, 'stopword_filter'):
+            word_count = document.count_words()
+        
+        # Match every rubric keyword in one pass over the text
+        with _timed(timer, 'keyword_match'):
+            if index is None:
+                matches = matcher.scan(text, spans)
+            else:
+                matches = matcher.scan_index(index, len(spans))
+        
+        with _timed(timer, 'claim_cues'):
+            signals = self.contradiction_detector.signals(text, spans, matches.index)
+        return document, matches, word_count, signals
+    
+    def _score_sections(
+        self,
+        proposal_text: str,
+        rubrics: Sequence[CompiledRubric],
+        timer: Optional[StageTimer] = None
+    ) -> List[Dict]:
+        """
+        Score a proposal section by section against each of ``rubrics``.
+        
+        Per-section counts come from the section cache when the same
+        section text has been scored before, so a proposal built from a
+        template only pays for the sections that changed. Keyword bitmaps
+        are OR-ed and sentence, word and relevant-sentence counts summed
+        across sections, then scored as one proposal.
+        """
+        with _timed(timer, 'split_sections'):
+            sections = split_sections(proposal_text)
+        keyword_hits = [[0] * len(rubric.categories) for rubric in rubrics]
+        relevant = [[0] * len(rubric.categories) for rubric in rubrics]
+        trackers = [ContradictionTracker(list(rubric.categories)) for rubric in rubrics]
+        summaries: List[List[Dict]] = [[] for _ in rubrics]
+        sentences = words = 0
+        
+        for heading, section in sections:
+            records = self._section_records(self._lower(section, timer), rubrics, timer)
+            for i, (rubric, record) in enumerate(zip(rubrics, records)):
+                for category, hits in enumerate(record['keyword_hits']):
+                    keyword_hits[i][category] |= hits
+                    relevant[i][category] += record['relevant'][category]
+                for sentence, claim, positive, negative, mask in record['claims']:
+                    trackers[i].add(sentences + sentence + 1, claim, positive, negative, mask)
+                summaries[i].append(self._section_summary(heading, record, rubric))
+            # Counts that do not depend on the rubric are the same in every record
+            sentences += records[0]['sentences']
+            words += records[0]['words']
+        
+        results = []
+        for i, rubric in enumerate(rubrics):
+            result = self._build_results(
+                [bin(hits).count('1') for hits in keyword_hits[i]],
+                relevant[i],
+                sentences,
+                words,
+                trackers[i].findings(),
+                timer,
+                rubric
+            )
+            result['sections'] = summaries[i]
+            results.append(result)
+        return results
+    
+    def _section_records(
+        self,
+        text: str,
+        rubrics: Sequence[CompiledRubric],
+        timer: Optional[StageTimer] = None
+    ) -> List[Dict]:
+        """Counts of one lowercased section per rubric, through the section cache."""
+        digest = self._lowered_digest(text)
+        keys = [f"{self._rubric_fingerprint(rubric)}:section:{digest}" for rubric in rubrics]
+        with _timed(timer, 'section_lookup'):
+            records = [self.section_cache.get(key) for key in keys]
+        missing = [i for i, record in enumerate(records) if record is None]
+        if missing:
+            scored = self._count_section(text, [rubrics[i] for i in missing], timer)
+            with _timed(timer, 'section_store'):
+                for i, record in zip(missing, scored):
+                    records[i] = record
+                    self.section_cache.put(keys[i], record)
+        return records
+    
+    def _count_section(
+        self,
+        text: str,
+        rubrics: Sequence[CompiledRubric],
+        timer: Optional[StageTimer] = None
+    ) -> List[Dict]:
+        """
+        Match counts of one lowercased section per rubric.
+        
+        Returns:
+            Per rubric, a JSON-serializable record: 'keyword_hits' (keyword
+            bitmap per category), 'relevant' (sentences per category),
+            'sentences', 'words' and 'claims', the [sentence, text,
+            positive, negative, category bitmap] of each sentence with
+            claim cues (0-based sentence numbers within the section)
+        """
+        document, matches, word_count, signals = self._scan(text, rubrics, timer)
+        spans = document.spans
+        records = []
+        offset = 0
+        for rubric in rubrics:
+            groups = range(offset, offset + len(rubric.categories))
+            claims = []
+            for sentence in sorted(signals):
+                start, end = spans[sentence]
+                positive, negative = signals[sentence]
+                mask = (matches.sentence_masks[sentence] >> offset) & ((1 << len(groups)) - 1)
+                # _clip() only shows the first 100 characters (plus '...')
+                claims.append([sentence, text[start:min(end, start + 101)], positive, negative, mask])
+            records.append({
+                'keyword_hits': [matches.keyword_hits[i] for i in groups],
+                'relevant': [matches.relevant_sentences(i) for i in groups],
+                'sentences': len(spans),
+                'words': word_count,
+                'claims': claims,
+            })
+            offset += len(rubric.categories)
+        return records
+    
+    def _section_summary(self, heading: Optional[str], record: Dict, rubric: CompiledRubric) -> Dict:
+        """A section's own scores, as if it were the whole proposal."""
+        category_scores = {}
+        for index, (category, config) in enumerate(rubric.categories.items()):
+            coverage = self._coverage_score(
+                bin(record['keyword_hits'][index]).count('1'), len(config['keywords']),
+                record['relevant'][index], record['sentences']
+            )
+            category_scores[category] = coverage * config['weight']
+        return {
+            'heading': heading,
+            'total_score': round(sum(category_scores.values()), 1),
+            'category_scores': {
+                category: round(score, 1) for category, score in category_scores.items()
+            },
+            'word_count': record['words'],
+            'sentence_count': record['sentences'],
+        }
+    
+    def score_stream(
+        self,
+        source,
+        chunk_size: int = 1 << 20,
+        max_sentence_chars: Optional[int] = None
+    ) -> Dict:
+        """
+        Score a proposal read incrementally instead of loaded whole.
+        
+        Chunks are lowercased and tokenized one at a time. The trailing,
+        possibly unfinished sentence of each chunk is carried into the next
+        one, and per-category counters are kept as the scan advances, so
+        peak memory depends on ``chunk_size`` rather than document size.
+        The result matches ``score_proposal`` on the same text unless a
+        single sentence grows past ``max_sentence_chars``, in which case it
+        is counted as several sentences split at whitespace. Streams are
+        not split into sections. With profiling, reading is timed as the
+        'read' stage alongside the scoring stages.
+        
+        Args:
+            source: Text file object, or an iterable of text chunks
+            chunk_size: Characters read per chunk from a file object
+            max_sentence_chars: Longest carried sentence before it is split
+                at whitespace (default: 4 * chunk_size, at least 4 MiB)
+            
+        Returns:
+            Dictionary with scores, grade, and recommendations
+        
+        Raises:
+            TypeError: If ``source`` is a binary file object
+        """
+        if self.rubric_check_interval is not None:
+            self._check_rubric()
+        if hasattr(source, 'read'):
+            chunks = _read_chunks(source, chunk_size)
+        else:
+            chunks = iter(source)
+        
+        timer = StageTimer() if self.profile else None
+        try:
+            results = self._score_chunks(
+                _timed_chunks(chunks, timer, 'read'),
+                max_sentence_chars or max(4 * chunk_size, 1 << 22),
+                timer
+            )
+        finally:
+            timings = timer.stop() if timer is not None else None
+        
+        if timings is not None:
+            results['timings'] = timings
+            if self.on_timings is not None:
+                self.on_timings(timings)
+        return results
+    
+    def _score_chunks(
+        self,
+        chunks: Iterable,
+        max_carry: int,
+        timer: Optional[StageTimer] = None
+    ) -> Dict:
+        """
+        Score a proposal from successive chunks; see :meth:`score_stream`.
+        
+        Chunks are str, or ASCII bytes (see :func:`_bytes_scannable`)
+        when the tokenizer ``scans_bytes``; the minimum-length check then
+        counts bytes. A carried sentence longer than ``max_carry`` is
+        split at whitespace.
+        """
+        rubric = self._rubric
+        matcher = self._matcher((rubric,))
+        overlap = matcher.max_keyword_length - 1
+        
+        keyword_hits = [0] * len(rubric.categories)
+        relevant = [0] * len(rubric.categories)
+        counts = {'sentences': 0, 'words': 0}
+        detector = self.contradiction_detector
+        tracker = ContradictionTracker(list(rubric.categories))
+        stop_words = None
+        
+        def consume(buffer, spans: List[Tuple[int, int]], cut: int):
+            """Count the whole sentences before ``cut``; return the carry."""
+            region = buffer if cut == len(buffer) else buffer[:cut + overlap]
+            with _timed(timer, 'keyword_match'):
+                matches = matcher.scan(region, spans)
+                for i in range(len(rubric.categories)):
+                    keyword_hits[i] |= matches.keyword_hits[i]
+                    relevant[i] += matches.relevant_sentences(i)
+            
+            with _timed(timer, 'claim_cues'):
+                signals = detector.signals(region, spans, matches.index)
+            with _timed(timer, 'detect_contradictions'):
+                tracker.update(buffer, spans, signals, matches.sentence_masks, counts['sentences'])
+            counts['sentences'] += len(spans)
+            with _timed(timer, 'word_tokenize'):
+                words = self.tokenizer.words(buffer[:cut])
+            with _timed(timer, 'stopword_filter'):
+                counts['words'] += self._count_words(words, stop_words)
+            return buffer[cut:]
+        
+        carry = None
+        total = leading = trailing = 0
+        started = False
+        for chunk in chunks:
+            if carry is None:
+                # An empty str or bytes, like the chunks
+                carry = chunk[:0]
+                if isinstance(chunk, bytes):
+                    stop_words = {word.encode('utf-8') for word in self.stop_words}
+            
+            # Track len(text.strip()) for the minimum-length check
+            total += len(chunk)
+            if not started:
+                stripped = chunk.lstrip()
+                leading += len(chunk) - len(stripped)
+                started = bool(stripped)
+            stripped = chunk.rstrip()
+            trailing = len(chunk) - len(stripped) if stripped else trailing + len(chunk)
+            
+            with _timed(timer, 'lowercase'):
+                buffer = carry + chunk.lower()
+            with _timed(timer, 'sentence_tokenize'):
+                spans = self.tokenizer.sentence_spans(buffer)
+            if not spans:
+                carry = carry[:0]
+                continue
+            
+            # The last sentence may continue in the next chunk
+            complete, cut = spans[:-1], spans[-1][0]
+            if len(buffer) - cut > max_carry:
+                space, newline = (' ', '\n') if isinstance(buffer, str) else (b' ', b'\n')
+                split = max(buffer.rfind(space, cut), buffer.rfind(newline, cut))
+                if split > cut:
+                    complete.append((cut, split))
+                    cut = split + 1
+            carry = consume(buffer, complete, cut)
+        
+        if total - leading - trailing < 100:
+            raise ValueError("Proposal text is too short (minimum 100 characters)")
+        with _timed(timer, 'sentence_tokenize'):
+            spans = self.tokenizer.sentence_spans(carry)
+        consume(carry, spans, len(carry))
+        
+        return self._build_results(
+            [bin(hits).count('1') for hits in keyword_hits],
+            relevant,
+            counts['sentences'],
+            counts['words'],
+            tracker.findings(),
+            timer,
+            rubric
+        )
+    
+    def score_document(self, path: str, use_cache: bool = True) -> Dict:
+        """
+        Score a PDF, DOCX, XLSX or text file without converting it first.
+        
+        The registered reader's pages, paragraphs or rows are streamed
+        into the chunk scorer behind :meth:`score_stream`, through the
+        scorer's text_cache if set. Results are cached under a hash of the
+        file's bytes, so an unchanged document is neither extracted nor
+        scored again, and profiling times extraction as 'read_document'.
+        With ``sections`` or a duplicate index, the text is joined and
+        scored by :meth:`score_proposal` instead, which splits it at
+        headings and compares it with earlier submissions.
+        
+        Args:
+            path: Proposal document
+            use_cache: Consult and fill the scorer's cache, if it has one
+            
+        Returns:
+            Dictionary with scores, grade, and recommendations
+            
+        Raises:
+            ReaderError: If the format is unsupported or the file unreadable
+            ValueError: If the extracted text is too short
+        """
+        if self.sections or self.dedup is not None:
+            text = ''.join(read_document(path, self.text_cache))
+            return self.score_proposal(text, use_cache, source=path)
+        if self.rubric_check_interval is not None:
+            self._check_rubric()
+        
+        timer = StageTimer() if self.profile else None
+        try:
+            key = None
+            if self.cache is not None and use_cache:
+                with _timed(timer, 'cache_lookup'):
+                    # Text digests are bare hex, so the extension keeps keys apart
+                    extension = os.path.splitext(path)[1].lower().lstrip('.')
+                    key = f"{self._rubric_fingerprint(self._rubric)}:{file_digest(path)}-{extension}"
+            results = self._score_keyed(key, lambda: self._score_chunks(
+                _timed_chunks(read_document(path, self.text_cache), timer, 'read_document'),
+                1 << 22, timer
+            ), timer)
+        finally:
+            timings = timer.stop() if timer is not None else None
+        
+        if timings is not None:
+            results['timings'] = timings
+            if self.on_timings is not None:
+                self.on_timings(timings)
+        return results
+    
+    def score_file(
+        self,
+        path: str,
+        use_cache: bool = True,
+        rubrics=None,
+        mapped: bool = True
+    ) -> Dict:
+        """
+        Score a plain-text (UTF-8) proposal file.
+        
+        With the regex tokenizer and substring matching, the file is
+        memory-mapped and scanned as bytes: blocks of about 1 MiB are
+        lowercased and matched in turn, and the cache key is hashed from
+        the same blocks, so the file is never held whole as a str or as
+        a lowercased copy. This needs ASCII text. CRLF line ends and
+        caseless punctuation such as curly quotes are allowed. Any other
+        file, a duplicate index, section scoring, ``rubrics`` or
+        ``mapped=False`` reads the file into a str for
+        :meth:`score_proposal`. Results are the same either way.
+        
+        Args:
+            path: Proposal file
+            use_cache: Consult and fill the scorer's cache, if it has one
+            rubrics: As for :meth:`score_proposal`
+            mapped: Allow the memory-mapped path (a file truncated while
+                mapped raises SIGBUS, so long-lived callers scoring files
+                that may still be written can opt out)
+        
+        Returns:
+            Dictionary with scores, grade, and recommendations
+        
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the text is too short or not UTF-8
+        """
+        if self.rubric_check_interval is not None:
+            self._check_rubric()
+        if (mapped and rubrics is None and self.tokenizer.scans_bytes
+                and self.match == 'substring' and self.dedup is None
+                and not self.sections and self.matcher.ascii_only):
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    import mmap
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        results = self._score_mapped(data, use_cache)
+                    if results is not None:
+                        return results
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        return self.score_proposal(text, use_cache, rubrics, source=path)
+    
+    def _score_mapped(self, data, use_cache: bool) -> Optional[Dict]:
+        """
+        Score a memory-mapped text file as bytes.
+        
+        Returns:
+            The results, or None if the file has content that only the
+            str path handles (see :func:`_bytes_scannable`)
+        """
+        first = RegexTokenizer.BYTES_NON_SPACE_PATTERN.search(data)
+        if first is None:
+            return None
+        start, end = first.start(), len(data)
+        while data[end - 1] in _ASCII_SPACE:
+            end -= 1
+        
+        rubric = self._rubric
+        timer = StageTimer() if self.profile else None
+        try:
+            digest = hashlib.sha256() if self.cache is not None and use_cache else None
+            with _timed(timer, 'scan_check'):
+                for block in _mapped_blocks(data, start, end):
+                    if not _bytes_scannable(block):
+                        return None
+                    if digest is not None:
+                        # Hashes the same bytes as _text_digest of the decoded text
+                        block = block.lower()
+                        if b'\r' in block:
+                            block = block.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+                        digest.update(block)
+            # Three bytes per character at most, so only short files need decoding
+            if end - start < 300 and len(_decode_lines(data[start:end])) < 100:
+                raise ValueError("Proposal text is too short (minimum 100 characters)")
+            
+            key = None
+            if digest is not None:
+                key = f"{self._rubric_fingerprint(rubric)}:{digest.hexdigest()}"
+            # A sentence may span blocks, so carried sentences are never split
+            results = self._score_keyed(key, lambda: self._score_chunks(
+                _mapped_blocks(data, start, end), len(data), timer
+            ), timer)
+        finally:
+            timings = timer.stop() if timer is not None else None
+        
+        if timings is not None:
+            results['timings'] = timings
+            if self.on_timings is not None:
+                self.on_timings(timings)
+        return results
+    
+    def _score_keyed(
+        self,
+        key: Optional[str],
+        score: Callable[[], Dict],
+        timer: Optional[StageTimer] = None
+    ) -> Dict:
+        """
+        The cached results for ``key``, or ``score()`` stored under it.
+        
+        A None ``key`` bypasses the cache. Results carry the 'cache'
+        block of :meth:`score_proposal` whenever the cache was used.
+        """
+        rubric = self._rubric
+        results = None
+        if key is not None:
+            with _timed(timer, 'cache_lookup'):
+                results = self.cache.get(key)
+        hit = results is not None
+        if hit:
+            self._apply_percentile(results, rubric)
+            self._print_cached(results)
+        else:
+            results = score()
+            if key is not None:
+                with _timed(timer, 'cache_store'):
+                    self.cache.put(key, results)
+        if key is not None:
+            results['cache'] = {'hit': hit, **self.cache.stats()}
+        return results
+    
+    def _count_words(self, words: Sequence[str], stop_words: Optional[Set] = None) -> int:
+        """
+        Count alphanumeric, non-stopword tokens: str tokens through the
+        shared Vocabulary, bytes tokens against bytes ``stop_words``.
+        """
+        if stop_words is None:
+            vocabulary = _shared_vocabulary()
+            return vocabulary.count(vocabulary.encode(words))
+        return sum(1 for w in words if w.isalnum() and w not in stop_words)
+    
+    def _build_results(
+        self,
+        keywords_matched: Sequence[int],
+        relevant_sentences: Sequence[int],
+        sentence_count: int,
+        word_count: int,
+        contradictions: List[Dict],
+        timer: Optional[StageTimer] = None,
+        rubric: Optional[CompiledRubric] = None
+    ) -> Dict:
+        """
+        Assemble the result dictionary from per-category match counts.
+        
+        Args:
+            keywords_matched: Distinct keywords found, per rubric category
+            relevant_sentences: Sentences with a keyword, per rubric category
+            sentence_count: Sentences in the proposal
+            word_count: Alphanumeric non-stopword tokens in the proposal
+            contradictions: Output of _detect_contradictions
+            timer: Optional StageTimer for per-stage profiling
+            rubric: Rubric the counts were matched with (default: current)
+        """
+        rubric = rubric or self._rubric
+        
+        # Score each category
+        category_scores = {}
+        category_details = {}
+        
+        for index, (category, config) in enumerate(rubric.categories.items()):
+            with _timed(timer, f'score_category:{category}'):
+                score, details = self._score_category(
+                    category, config,
+                    keywords_matched[index],
+                    relevant_sentences[index],
+                    sentence_count
+                )
+            category_scores[category] = score
+            category_details[category] = details
+        
+        # Calculate total score
+        total_score = sum(category_scores.values())
+        
+        # Determine grade
+        grade = self._calculate_grade(total_score)
+        
+        # Identify gaps
+        with _timed(timer, 'identify_gaps'):
+            gaps = self._identify_gaps(category_scores, category_details, rubric)
+        
+        # Generate recommendations
+        with _timed(timer, 'recommendations'):
+            recommendations = self._generate_recommendations(gaps, category_scores, rubric)
+        
+        results = {
+            'total_score': round(total_score, 1),
+            'grade': grade,
+            'percentile': self._score_to_percentile(total_score),
+            'category_scores': category_scores,
+            'category_details': category_details,
+            'gaps': gaps,
+            'recommendations': recommendations,
+            'contradictions': contradictions,
+            'word_count': word_count,
+            'sentence_count': sentence_count
+        }
+        if self.corpus is not None:
+            with _timed(timer, 'corpus_percentile'):
+                self._apply_percentile(results, rubric)
+        return results
+    
+    def score_many(
+        self,
+        proposals: Iterable[str],
+        workers: int = 1,
+        ordered: bool = True
+    ) -> Iterator[Tuple[int, Dict]]:
+        """
+        Score many proposals, optionally across a process pool.
+        
+        Each worker process receives a copy of this scorer once, so NLTK
+        resources are loaded once per worker rather than once per proposal.
+        
+        Args:
+            proposals: Proposal texts to score
+            workers: Number of worker processes (1 scores in this process)
+            ordered: Yield results in input order instead of completion order
+            
+        Yields:
+            (index, result) pairs, where index is the position in
+            ``proposals``. Proposals that fail validation yield
+            ``{'error': message}`` as their result.
+        """
+        yield from _run_pool(
+            _score_text, enumerate(proposals), self, workers, ordered
+        )
+    
+    def match_matrix(self, proposals: Iterable[str]):
+        """
+        Tokenize and match proposals into arrays for :meth:`score_matrix`.
+        
+        Args:
+            proposals: Proposal texts
+            
+        Returns:
+            (hits, relevant, sentence_counts): a bool array of shape
+            (proposals, categories, max keywords) marking keywords found,
+            an int array (proposals, categories) of relevant sentence
+            counts, and an int array (proposals,) of sentence counts.
+            Keyword slots beyond a category's keyword list stay False.
+        """
+        import numpy as np
+        
+        rubric = self._rubric
+        matcher = self._matcher((rubric,))
+        width = max(len(config['keywords']) for config in rubric.categories.values())
+        # Keyword bitmaps are split into 64-bit words, lowest keywords first
+        words = -(-width // 64)
+        mask = (1 << 64) - 1
+        bits = np.uint64(1) << np.arange(64, dtype=np.uint64)
+        bitmaps, relevant, sentence_counts = [], [], []
+        for proposal_text in proposals:
+            text = proposal_text.lower()
+            spans = self.tokenizer.sentence_spans(text)
+            matches = matcher.scan(text, spans)
+            bitmaps.append([
+                [(hits >> (64 * word)) & mask for word in range(words)]
+                for hits in matches.keyword_hits
+            ])
+            relevant.append([matches.relevant_sentences(i) for i in range(len(rubric.categories))])
+            sentence_counts.append(len(spans))
+        
+        bitmaps = np.array(bitmaps, dtype=np.uint64).reshape(
+            len(sentence_counts), len(rubric.categories), words, 1
+        )
+        hits = ((bitmaps & bits) != 0).reshape(len(sentence_counts), len(rubric.categories), -1)
+        return (hits[:, :, :width], np.array(relevant, dtype=np.int64),
+                np.array(sentence_counts, dtype=np.int64))
+    
+    def score_matrix(
+        self,
+        hits,
+        relevant,
+        sentence_counts,
+        weights: Optional[Dict[str, float]] = None
+    ) -> Dict:
+        """
+        Score many pre-matched proposals with array operations.
+        
+        Vectorized equivalent of :meth:`_score_category`,
+        :meth:`_calculate_grade` and :meth:`_score_to_percentile`, so an
+        archive matched once with :meth:`match_matrix` can be rescored
+        under new category weights in a handful of NumPy calls.
+        
+        Args:
+            hits: Bool array (proposals, categories, keywords) of matches
+            relevant: Array (proposals, categories) of relevant sentences
+            sentence_counts: Array (proposals,) of sentence counts
+            weights: Optional per-category weight overrides
+            
+        Returns:
+            Dictionary of arrays: 'category_scores' and 'coverage'
+            (proposals, categories), 'total_score', 'grade' and
+            'percentile' (proposals,)
+        """
+        import numpy as np
+        
+        weights = weights or {}
+        categories = self._rubric.categories
+        max_scores = np.array([
+            weights.get(category, config['weight'])
+            for category, config in categories.items()
+        ], dtype=float)
+        n_keywords = np.array([len(config['keywords']) for config in categories.values()])
+        relevant = np.asarray(relevant)
+        
+        keyword_coverage = np.minimum(np.asarray(hits).sum(axis=2) / n_keywords, 1.0)
+        sentence_coverage = relevant / np.asarray(sentence_counts)[:, None]
+        depth_score = np.minimum(relevant / 3, 1.0)
+        coverage_score = (keyword_coverage * 0.4 +
+                          sentence_coverage * 0.3 +
+                          depth_score * 0.3)
+        category_scores = coverage_score * max_scores
+        
+        # Sum columns in category order so totals equal the scalar path
+        total_score = np.zeros(len(category_scores))
+        for column in category_scores.T:
+            total_score = total_score + column
+        
+        band = np.searchsorted(self.GRADE_THRESHOLDS, total_score, side='right')
+        return {
+            'category_scores': category_scores,
+            'coverage': np.round(coverage_score * 100, 1),
+            'total_score': total_score,
+            'grade': np.array(self.GRADES)[band],
+            'percentile': np.array(self.PERCENTILES)[band],
+        }
+    
+    def _score_category(
+        self, 
+        category: str, 
+        config: Dict,
+        matches: int,
+        relevant_sentences: int,
+        total_sentences: int
+    ) -> Tuple[float, Dict]:
+        """
+        Score a single category from its keyword match counts.
+        
+        Args:
+            category: Rubric category name
+            config: Rubric entry with 'weight' and 'keywords'
+            matches: Distinct keywords found anywhere in the text
+            relevant_sentences: Sentences containing at least one keyword
+            total_sentences: Sentences in the proposal
+        """
+        max_score = config['weight']
+        keywords = config['keywords']
+        coverage_score = self._coverage_score(
+            matches, len(keywords), relevant_sentences, total_sentences
+        )
+        score = coverage_score * max_score
+        
+        details = {
+            'max_score': max_score,
+            'keywords_matched': matches,
+            'total_keywords': len(keywords),
+            'relevant_sentences': relevant_sentences,
+            'coverage': round(coverage_score * 100, 1)
+        }
+        
+        if self.verbose:
+            self._print_category(category, score, details)
+        
+        return score, details
+    
+    @staticmethod
+    def _print_category(category: str, score: float, details: Dict) -> None:
+        """Print one category's --verbose breakdown."""
+        print(f"\n{category.replace('_', ' ').title()}:")
+        print(f"  Score: {score:.1f}/{details['max_score']}")
+        print(f"  Coverage: {details['coverage']}%")
+        print(f"  Keywords matched: {details['keywords_matched']}/{details['total_keywords']}")
+    
+    def _print_cached(self, results: Dict) -> None:
+        """Print the --verbose breakdown of results read from the cache."""
+        if self.verbose:
+            for category, details in results['category_details'].items():
+                self._print_category(category, results['category_scores'][category], details)
+    
+    @staticmethod
+    def _coverage_score(
+        matches: int,
+        total_keywords: int,
+        relevant_sentences: int,
+        total_sentences: int
+    ) -> float:
+        """Coverage (0-1) of a category; see :meth:`_score_category`."""
+        # Keyword coverage
+        keyword_coverage = min(matches / total_keywords, 1.0)
+        
+        # Calculate sentence coverage
+        sentence_coverage = relevant_sentences / total_sentences
+        
+        # Calculate depth score (how much is discussed)
+        depth_score = min(relevant_sentences / 3, 1.0)  # 3+ sentences = full depth
+        
+        # Combine factors
+        return (keyword_coverage * 0.4 + 
+                sentence_coverage * 0.3 + 
+                depth_score * 0.3)
+    
+    def _calculate_grade(self, score: float) -> str:
+        """Convert numeric score to letter grade."""
+        if score >= 90:
+            return 'A'
+        elif score >= 80:
+            return 'B'
+        elif score >= 70:
+            return 'C'
+        elif score >= 60:
+            return 'D'
+        else:
+            return 'F'
+    
+    def _score_to_percentile(self, score: float) -> str:
+        """Convert score to a fixed percentile band (used without a corpus)."""
+        if score >= 90:
+            return '95th+ (Top 10%)'
+        elif score >= 80:
+            return '80th-95th (Top 20%)'
+        elif score >= 70:
+            return '60th-80th (Top 40%)'
+        elif score >= 60:
+            return '40th-60th (Middle)'
+        else:
+            return 'Below 40th'
+    
+    def _apply_percentile(self, results: Dict, rubric: CompiledRubric) -> None:
+        """
+        Rank ``results`` within the scorer's corpus, if it is large enough.
+        
+        Sets 'percentile' to the empirical rank and adds 'percentile_rank'
+        and 'category_percentiles' (0-100) and 'corpus_size'; otherwise
+        the fixed score bands of :meth:`_score_to_percentile` apply.
+        """
+        ranks = self.corpus.rank(results, rubric) if self.corpus is not None else None
+        if ranks is None:
+            if 'percentile_rank' in results:
+                for key in ('percentile_rank', 'category_percentiles', 'corpus_size'):
+                    results.pop(key, None)
+                results['percentile'] = self._score_to_percentile(results['total_score'])
+            return
+        results['percentile'] = (
+            f"{_ordinal(round(ranks['percentile_rank']))} "
+            f"(of {ranks['corpus_size']:,} scored proposals)"
+        )
+        results.update(ranks)
+    
+    def _identify_gaps(
+        self, 
+        category_scores: Dict[str, float],
+        category_details: Dict[str, Dict],
+        rubric: Optional[CompiledRubric] = None
+    ) -> List[Dict]:
+        """Identify missing or weak elements."""
+        categories = (rubric or self._rubric).categories
+        gaps = []
+        
+        for category, score in category_scores.items():
+            max_score = categories[category]['weight']
+            if score < max_score * 0.7:  # Less than 70% of max
+                coverage = category_details[category]['coverage']
+                gaps.append({
+                    'category': category.replace('_', ' ').title(),
+                    'category_id': category,
+                    'current_score': round(score, 1),
+                    'max_score': max_score,
+                    'gap': round(max_score - score, 1),
+                    'coverage': coverage
+                })
+        
+        return sorted(gaps, key=lambda x: x['gap'], reverse=True)
+    
+    def _generate_recommendations(
+        self, 
+        gaps: List[Dict],
+        category_scores: Dict[str, float],
+        rubric: Optional[CompiledRubric] = None
+    ) -> List[str]:
+        """Generate actionable recommendations from the rubric's text."""
+        categories = (rubric or self._rubric).categories
+        recommendations = []
+        
+        for gap in gaps[:3]:  # Top 3 gaps
+            recommendation = categories[gap['category_id']]['recommendation']
+            if recommendation:
+                recommendations.append(recommendation)
+        
+        # Add general recommendations based on overall score
+        total = sum(category_scores.values())
+        if total < 75:
+            recommendations.insert(0,
+                "🎯 Priority: Reach 75+ score threshold for pilot success. "
+                "Focus on the largest gaps first."
+            )
+        
+        return recommendations
+    
+    def _detect_contradictions(
+        self,
+        text: str,
+        spans: Sequence[Tuple[int, int]],
+        matches: KeywordMatches,
+        rubric: Optional[CompiledRubric] = None,
+        group_offset: int = 0,
+        signals: Optional[Dict[int, List[float]]] = None
+    ) -> List[Dict]:
+        """
+        Detect and rank potential contradictions in the proposal.
+        
+        Reuses the keyword scan: sentence topics come from its category
+        bitmaps and, in word/stem mode, claim cues from its token index.
+        
+        Args:
+            text: Lowercased proposal text
+            spans: Sentence offsets within ``text``
+            matches: KeywordMatches of ``text`` for these spans
+            rubric: Rubric whose categories are the topics (default: current)
+            group_offset: First group of ``rubric`` in ``matches``
+            signals: Precomputed ContradictionDetector.signals, if any
+            
+        Returns:
+            Up to 5 findings, strongest first: 'mixed_signals' within a
+            sentence, or 'conflicting_claims' about one topic across two
+            sentences (with 'related_sentence_num' and 'related_text')
+        """
+        if signals is None:
+            signals = self.contradiction_detector.signals(text, spans, matches.index)
+        tracker = ContradictionTracker(list((rubric or self._rubric).categories), group_offset)
+        tracker.update(text, spans, signals, matches.sentence_masks)
+        return tracker.findings()
+    
+    def format_report(
+        self,
+        results: Dict,
+        report_format: str = 'text',
+        rubric: Optional[str] = None
+    ) -> str:
+        """
+        Format results as a readable report.
+        
+        Args:
+            results: Output of :meth:`score_proposal`
+            report_format: Name from REPORT_FORMATS: 'text', 'markdown'
+                or 'html'
+            rubric: Rubric name to show in the report, if any
+        
+        Returns:
+            The report; see :meth:`render_report` to write it to a file
+        """
+        out = io.StringIO()
+        self.render_report(results, out, report_format, rubric)
+        return out.getvalue()
+    
+    def render_report(
+        self,
+        results: Dict,
+        out,
+        report_format: str = 'text',
+        rubric: Optional[str] = None
+    ) -> None:
+        """
+        Render a report straight to a text file handle.
+        
+        The format's template is compiled once per process and written
+        out piece by piece, so no report string is built in memory. With
+        profiling, the time taken is added as a 'format_report' stage to
+        the results' 'timings', the block already passed to ``on_timings``
+        when they were scored; results scored without timings pass the
+        new block instead, so the callback fires once per proposal.
+        
+        Raises:
+            ValueError: If the report format is unknown
+        """
+        template = report_template(report_format)
+        if not self.profile:
+            template.render(_report_context(results, rubric), out)
+            return
+        
+        timer = StageTimer()
+        try:
+            with timer.stage('format_report'):
+                template.render(_report_context(results, rubric), out)
+        finally:
+            timings = timer.stop()
+        
+        if 'timings' in results:
+            results['timings']['stages'].update(timings['stages'])
+        elif self.on_timings is not None:
+            self.on_timings(timings)
+    
+    def format_timings(self, timings: Dict) -> str:
+        """Format a 'timings' block as a per-stage table."""
+        total = timings['total_seconds']
+        lines = [
+            "=" * 60,
+            "STAGE TIMINGS",
+            "=" * 60,
+            f"{'Stage':<36} {'ms':>9} {'%':>5} {'Peak KiB':>8}",
+            "-" * 60,
+        ]
+        for name, record in timings['stages'].items():
+            share = record['seconds'] / total * 100 if total else 0.0
+            peak = record.get('peak_bytes')
+            peak = f"{peak / 1024:>8.1f}" if peak is not None else f"{'-':>8}"
+            lines.append(f"{name:<36} {record['seconds'] * 1000:>9.3f} {share:>5.1f} {peak}")
+        lines.append("-" * 60)
+        lines.append(f"{'Total':<36} {total * 1000:>9.3f}")
+        return '\n'.join(lines)
+
+
+class IncrementalScorer:
+    """
+    Stateful scorer for a proposal that is edited in place.
+    
+    Keeps per-sentence keyword bitmaps, word counts and claim signals,
+    plus running per-category totals. An edit re-tokenizes and
+    re-matches only the sentences it touches and one neighbour on each
+    side (so merged or split sentences are picked up), then adjusts the
+    totals, so rescoring cost scales with the edit rather than the
+    document. Results match ``score_proposal`` on the edited text.
+    
+    Offsets refer to the lowercased text exposed as :attr:`text`.
+    """
+    
+    def __init__(self, text: str = '', scorer: Optional[ProposalScorer] = None):
+        self.scorer = scorer or ProposalScorer()
+        # Per-sentence bitmaps are tied to the rubric they were matched with
+        self.rubric = self.scorer.rubric
+        self._matcher = self.scorer._matcher((self.rubric,))
+        self._text = ''
+        self._spans: List[Tuple[int, int]] = []
+        self._records: List[Tuple[Tuple[int, ...], int, Optional[List[float]]]] = []
+        self._keyword_counts = [
+            [0] * len(config['keywords']) for config in self.rubric.categories.values()
+        ]
+        self._relevant = [0] * len(self.rubric.categories)
+        self._word_count = 0
+        self.replace(0, 0, text)
+    
+    @property
+    def text(self) -> str:
+        """Current (lowercased) document text."""
+        return self._text
+    
+    def append_paragraph(self, paragraph: str) -> None:
+        """Append ``paragraph`` as a new paragraph at the end of the document."""
+        separator = '\n\n' if self._text.strip() else ''
+        self.replace(len(self._text), len(self._text), separator + paragraph)
+    
+    def replace(self, start: int, end: int, new_text: str) -> None:
+        """
+        Replace ``text[start:end]`` with ``new_text``.
+        
+        Raises:
+            ValueError: If the span is outside the document
+        """
+        if not 0 <= start <= end <= len(self._text):
+            raise ValueError(f"Edit span {start}:{end} is outside the document")
+        
+        # Sentences touched by the edit, plus one neighbour on each side
+        spans = self._spans
+        first = max(bisect.bisect_right(spans, (start, float('inf'))) - 2, 0)
+        last = min(bisect.bisect_right(spans, (end, float('inf'))), len(spans) - 1)
+        region_start = spans[first][0] if first > 0 else 0
+        region_end = spans[last][1] if last < len(spans) - 1 else len(self._text)
+        
+        new_text = new_text.lower()
+        delta = len(new_text) - (end - start)
+        self._text = self._text[:start] + new_text + self._text[end:]
+        region_end += delta
+        
+        local = self.scorer.tokenizer.sentence_spans(self._text[region_start:region_end])
+        new_spans = [(region_start + a, region_start + b) for a, b in local]
+        new_records = [self._analyze(self._text[a:b]) for a, b in new_spans]
+        
+        for record in self._records[first:last + 1]:
+            self._apply(record, -1)
+        for record in new_records:
+            self._apply(record, 1)
+        
+        self._records[first:last + 1] = new_records
+        self._spans = (
+            spans[:first] + new_spans
+            + [(a + delta, b + delta) for a, b in spans[last + 1:]]
+        )
+    
+    def result(self) -> Dict:
+        """
+        Score the current text.
+        
+        Returns:
+            The same dictionary as ``ProposalScorer.score_proposal``
+        
+        Raises:
+            ValueError: If the text is shorter than 100 characters
+        """
+        if len(self._text.strip()) < 100:
+            raise ValueError("Proposal text is too short (minimum 100 characters)")
+        
+        tracker = ContradictionTracker(list(self.rubric.categories))
+        for index, (hits, _, signal) in enumerate(self._records):
+            if signal:
+                start, end = self._spans[index]
+                mask = 0
+                for category, bitmap in enumerate(hits):
+                    if bitmap:
+                        mask |= 1 << category
+                tracker.add(index + 1, self._text[start:end], signal[0], signal[1], mask)
+        
+        return self.scorer._build_results(
+            [sum(1 for count in counts if count) for counts in self._keyword_counts],
+            list(self._relevant),
+            len(self._spans),
+            self._word_count,
+            tracker.findings(),
+            rubric=self.rubric
+        )
+    
+    def _analyze(self, sentence: str) -> Tuple[Tuple[int, ...], int, Optional[List[float]]]:
+        """Keyword bitmaps per category, word count and claim signal, if any."""
+        scorer = self.scorer
+        spans = ((0, len(sentence)),)
+        matches = self._matcher.scan(sentence, spans)
+        words = scorer._count_words(scorer.tokenizer.words(sentence))
+        signal = scorer.contradiction_detector.signals(sentence, spans, matches.index).get(0)
+        return tuple(matches.keyword_hits), words, signal
+    
+    def _apply(self, record: Tuple[Tuple[int, ...], int, Optional[List[float]]], sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one sentence from the totals."""
+        hits, words, _ = record
+        for category, bitmap in enumerate(hits):
+            if not bitmap:
+                continue
+            self._relevant[category] += sign
+            counts = self._keyword_counts[category]
+            while bitmap:
+                low = bitmap & -bitmap
+                counts[low.bit_length() - 1] += sign
+                bitmap ^= low
+        self._word_count += sign * words
+
+
+def compare_tokenizers(
+    texts: Iterable[str],
+    baseline: str = 'nltk',
+    candidate: str = 'regex'
+) -> List[Dict]:
+    """
+    Report score drift of one tokenizer backend against another.
+    
+    Args:
+        texts: Proposal texts to score with both backends
+        baseline: Reference tokenizer name
+        candidate: Tokenizer name compared against the baseline
+        
+    Returns:
+        One entry per text with both total scores, the drift (candidate
+        minus baseline) of the total and each category score, word and
+        sentence counts, and tokenization time per backend
+    """
+    scorers = {name: ProposalScorer(tokenizer=name) for name in (baseline, candidate)}
+    report = []
+    
+    for index, text in enumerate(texts):
+        results, seconds = {}, {}
+        for name, scorer in scorers.items():
+            lowered = text.lower()
+            start = time.perf_counter()
+            scorer.tokenizer.tokenize(lowered)
+            seconds[name] = round(time.perf_counter() - start, 6)
+            results[name] = scorer.score_proposal(text)
+        
+        base, cand = results[baseline], results[candidate]
+        report.append({
+            'index': index,
+            'total_score': {baseline: base['total_score'], candidate: cand['total_score']},
+            'total_drift': round(cand['total_score'] - base['total_score'], 1),
+            'category_drift': {
+                category: round(cand['category_scores'][category] - score, 2)
+                for category, score in base['category_scores'].items()
+            },
+            'word_count': {baseline: base['word_count'], candidate: cand['word_count']},
+            'sentence_count': {
+                baseline: base['sentence_count'], candidate: cand['sentence_count']
+            },
+            'tokenize_seconds': seconds,
+        })
+    
+    return report
+
+
+# Scorer owned by each worker process of a batch pool
+_WORKER_SCORER: Optional[ProposalScorer] = None
+
+
+def _init_worker(scorer: ProposalScorer, nltk_settings: Dict) -> None:
+    """Install the worker's scorer and load NLTK resources once."""
+    global _WORKER_SCORER
+    configure_nltk(**nltk_settings)
+    scorer.load_resources()
+    _WORKER_SCORER = scorer
+
+
+def _score_text(
+    item: Tuple[Any, str],
+    scorer: Optional[ProposalScorer] = None
+) -> Tuple[Any, Dict]:
+    """Score one (key, text) item with ``scorer`` or the worker's scorer."""
+    key, text = item
+    scorer = _WORKER_SCORER if scorer is None else scorer
+    try:
+        source = key if isinstance(key, str) else None
+        return key, scorer.score_proposal(text, source=source)
+    except ValueError as e:
+        return key, {'error': str(e)}
+
+
+def _score_path(scorer: ProposalScorer, path: str, mapped: bool = True) -> Dict:
+    """Read (or extract) and score one proposal file, or return {'error': ...}."""
+    try:
+        if os.path.splitext(path)[1].lower() in READERS.keys() - {'.txt'}:
+            return scorer.score_document(path)
+        return scorer.score_file(path, mapped=mapped)
+    except (OSError, ValueError) as e:
+        return {'error': str(e)}
+
+
+def _score_file(
+    path: str,
+    report: Optional[Tuple[str, str, str]] = None,
+    scorer: Optional[ProposalScorer] = None
+) -> Tuple[str, Dict]:
+    """
+    Read (or extract) and score one proposal file.
+    
+    Args:
+        path: Proposal file
+        report: Optional (report_dir, report_format, root): also render
+            the report to ``report_dir`` as ``path`` relative to ``root``
+            plus the format's extension, and add its path to the result
+            as 'report'
+        scorer: Scorer to use instead of the worker's scorer
+    """
+    scorer = _WORKER_SCORER if scorer is None else scorer
+    result = _score_path(scorer, path)
+    if report is not None and 'error' not in result:
+        _write_report(scorer, path, result, report)
+    return path, result
+
+
+def _score_read(
+    item: Tuple[str, str],
+    report: Optional[Tuple[str, str, str]] = None,
+    scorer: Optional[ProposalScorer] = None
+) -> Tuple[str, Dict]:
+    """
+    Score one (path, text) item read by a :class:`BatchPipeline`.
+    
+    Args:
+        item: Proposal file and its text
+        report: As for :func:`_score_file`
+        scorer: Scorer to use instead of the worker's scorer
+    """
+    scorer = _WORKER_SCORER if scorer is None else scorer
+    path, result = _score_text(item, scorer)
+    if report is not None and 'error' not in result:
+        _write_report(scorer, path, result, report)
+    return path, result
+
+
+def _write_report(
+    scorer: ProposalScorer,
+    path: str,
+    result: Dict,
+    report: Tuple[str, str, str]
+) -> None:
+    """
+    Render the report of ``path`` below report_dir and note it in ``result``.
+    
+    The report is named after the whole file name (``a.txt`` ->
+    ``a.txt.html``), so proposals differing only in extension never
+    share a report.
+    """
+    report_dir, report_format, root = report
+    target = os.path.join(
+        report_dir,
+        os.path.relpath(path, root) + REPORT_FORMATS[report_format].extension
+    )
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'w', encoding='utf-8') as f:
+            scorer.render_report(result, f, report_format)
+    except OSError as e:
+        result['report_error'] = str(e)
+    else:
+        result['report'] = target
+
+
+def _read_proposal(path: str, text_cache: Optional[TextCache] = None) -> str:
+    """Read a plain-text proposal, or extract the text of a PDF, DOCX or XLSX."""
+    if os.path.splitext(path)[1].lower() in READERS.keys() - {'.txt'}:
+        return ''.join(read_document(path, text_cache))
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _run_pool(
+    func: Callable,
+    items: Iterable,
+    scorer: ProposalScorer,
+    workers: int,
+    ordered: bool
+) -> Iterator:
+    """
+    Map ``func`` over ``items`` with a pool of scorer worker processes.
+    
+    ``func`` takes an item and an optional ``scorer`` keyword (the
+    worker's scorer when omitted) and returns (key, result). At most
+    ``workers * 4`` items are in flight, so lazily generated inputs are
+    never fully materialized. An item whose call raises yields
+    (key, {'error': ...}) instead of ending the run, where key is the
+    item itself or, for a tuple, its first element. A crashed worker
+    process breaks the pool: its items in flight fail that way, and
+    submitting more raises BrokenProcessPool.
+    """
+    if workers <= 1:
+        # Scored here, so the scorer is passed in rather than installed
+        scorer.load_resources()
+        func = functools.partial(func, scorer=scorer)
+        for item in items:
+            try:
+                result = func(item)
+            except Exception as e:
+                result = _item_error(item, e)
+            yield result
+        return
+    
+    # Imported here: multiprocessing alone would double CLI import time
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    
+    items = iter(items)
+    max_pending = workers * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(scorer, dict(_nltk_settings))) as pool:
+        # Futures in submission order, with the item each one scores
+        pending: Dict[Any, Any] = {}
+        for item in items:
+            pending[pool.submit(func, item)] = item
+            if len(pending) >= max_pending:
+                break
+        
+        while pending:
+            if ordered:
+                done = [next(iter(pending))]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = _item_error(item, e)
+                yield result
+                item = next(items, None)
+                if item is not None:
+                    pending[pool.submit(func, item)] = item
+
+
+def _item_error(item: Any, error: Exception) -> Tuple[Any, Dict]:
+    """The (key, {'error': ...}) record of a pool item whose call raised."""
+    key = item[0] if isinstance(item, tuple) else item
+    return key, {'error': f"{type(error).__name__}: {error}"}
+
+
+def collect_batch_files(source: str) -> List[str]:
+    """
+    Expand a ``--batch`` argument into a sorted list of proposal files.
+    
+    Args:
+        source: A directory (every file below it with a registered reader
+            extension, e.g. .txt, .pdf, .docx, .xlsx) or a glob pattern
+    """
+    if os.path.isdir(source):
+        return sorted(
+            str(p) for p in Path(source).rglob('*')
+            if p.suffix.lower() in READERS and p.is_file()
+        )
+    return sorted(p for p in glob.glob(source, recursive=True) if os.path.isfile(p))
+
+
+class OutputError(ValueError):
+    """Raised when a bulk output format is unknown or its library is missing."""
+
+
+class ResultWriter:
+    """
+    Writes batch results to an open file, one :meth:`write` per result.
+    
+    ``binary`` writers need ``out`` opened in binary mode; ``buffered``
+    writers hold every row until :meth:`close`.
+    """
+    
+    name = ''
+    binary = False
+    buffered = False
+    
+    def __init__(self, out):
+        self.out = out
+    
+    def write(self, path: str, result: Dict) -> None:
+        """Write the result (or ``{'error': ...}``) for one file."""
+        raise NotImplementedError
+    
+    def write_many(self, results: Sequence[Tuple[str, Dict]]) -> None:
+        """Write several (path, result) pairs, flushing once where possible."""
+        for path, result in results:
+            self.write(path, result)
+    
+    def close(self) -> None:
+        """Write anything still buffered; ``out`` itself is left open."""
+
+
+class NDJSONWriter(ResultWriter):
+    """One compact JSON object per line, in today's result shape."""
+    
+    name = 'ndjson'
+    
+    def write(self, path: str, result: Dict) -> None:
+        self.out.write(json.dumps({'file': path, **result}, separators=(',', ':')) + '\n')
+        self.out.flush()
+    
+    def write_many(self, results: Sequence[Tuple[str, Dict]]) -> None:
+        self.out.write(''.join(
+            json.dumps({'file': path, **result}, separators=(',', ':')) + '\n'
+            for path, result in results
+        ))
+        self.out.flush()
+
+
+class TabularWriter(ResultWriter):
+    """
+    One flat row per file: 'file', 'error', then :meth:`ScoreResult.columns`
+    of the first scored result. Error rows seen before it are held back
+    until the header is known.
+    """
+    
+    def __init__(self, out):
+        super().__init__(out)
+        self.columns: Optional[Tuple[str, ...]] = None
+        self._held: List[Tuple] = []
+    
+    def write(self, path: str, result: Dict) -> None:
+        if 'error' in result:
+            row = (path, result['error'])
+            if self.columns is None:
+                self._held.append(row)
+            else:
+                self.write_row(row + (None,) * (len(self.columns) - 2))
+            return
+        
+        compact = ScoreResult.from_dict(result)
+        if self.columns is None:
+            self.columns = ('file', 'error') + compact.columns()
+            self.write_header(self.columns)
+            for row in self._held:
+                self.write_row(row + (None,) * (len(self.columns) - 2))
+            self._held.clear()
+        self.write_row((path, None) + compact.row())
+    
+    def close(self) -> None:
+        if self.columns is None:
+            self.columns = ('file', 'error')
+            self.write_header(self.columns)
+            for row in self._held:
+                self.write_row(row)
+    
+    def write_header(self, columns: Tuple[str, ...]) -> None:
+        raise NotImplementedError
+    
+    def write_row(self, row: Tuple) -> None:
+        raise NotImplementedError
+
+
+class CSVWriter(TabularWriter):
+    """CSV with a header row."""
+    
+    name = 'csv'
+    
+    def __init__(self, out):
+        import csv
+        super().__init__(out)
+        self._csv = csv.writer(out)
+    
+    def write_header(self, columns: Tuple[str, ...]) -> None:
+        self._csv.writerow(columns)
+    
+    def write_row(self, row: Tuple) -> None:
+        self._csv.writerow(row)
+        self.out.flush()
+
+
+class MsgpackWriter(TabularWriter):
+    """A MessagePack stream: the column names, then one array per file."""
+    
+    name = 'msgpack'
+    binary = True
+    
+    def __init__(self, out):
+        super().__init__(out)
+        self._packer = _import_output_package('msgpack', 'msgpack').Packer()
+    
+    def write_header(self, columns: Tuple[str, ...]) -> None:
+        self.out.write(self._packer.pack(list(columns)))
+    
+    def write_row(self, row: Tuple) -> None:
+        self.out.write(self._packer.pack(list(row)))
+        self.out.flush()
+
+
+class ParquetWriter(TabularWriter):
+    """
+    A Parquet file written through pandas (needs pyarrow or fastparquet).
+    
+    Parquet is written whole, so rows are buffered (as tuples) until
+    :meth:`close`.
+    """
+    
+    name = 'parquet'
+    binary = True
+    buffered = True
+    
+    def __init__(self, out):
+        super().__init__(out)
+        self._pandas = _import_output_package('pandas', 'pandas')
+        try:
+            _import_output_package('pyarrow', 'pyarrow')
+        except OutputError:
+            _import_output_package('fastparquet', 'pyarrow')
+        self._rows: List[Tuple] = []
+    
+    def write_header(self, columns: Tuple[str, ...]) -> None:
+        pass
+    
+    def write_row(self, row: Tuple) -> None:
+        self._rows.append(row)
+    
+    def close(self) -> None:
+        super().close()
+        frame = self._pandas.DataFrame.from_records(self._rows, columns=list(self.columns))
+        frame.to_parquet(self.out, index=False)
+        self._rows = []
+
+
+# Bulk output formats selectable by name
+OUTPUT_FORMATS = {
+    writer.name: writer for writer in (NDJSONWriter, CSVWriter, MsgpackWriter, ParquetWriter)
+}
+
+
+def _import_output_package(module: str, package: str):
+    """Import an output library, or raise OutputError naming its package."""
+    import importlib
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise OutputError(
+            f"This output format needs {package}. Run: pip install {package}"
+        ) from None
+
+
+def run_batch(
+    scorer: ProposalScorer,
+    paths: Sequence[str],
+    out,
+    workers: int = 1,
+    ordered: bool = False,
+    record: Optional[CorpusStore] = None,
+    output_format: str = 'ndjson',
+    report_dir: Optional[str] = None,
+    report_format: str = 'text'
+) -> int:
+    """
+    Score ``paths`` and stream one record per file to ``out``.
+    
+    Args:
+        record: Optional CorpusStore to append the results to, keyed by
+            absolute path and written in transactions of 1000
+        output_format: Name from OUTPUT_FORMATS: 'ndjson' (one JSON line
+            per file, the default), or flat rows as 'csv', 'msgpack' or
+            'parquet' (``out`` opened in binary mode for the latter two)
+        report_dir: Optional directory for one report per file, rendered
+            in the worker processes alongside scoring; the tree of
+            ``paths`` below their common directory is mirrored, each
+            report named after its file plus the format's extension
+            (``a.txt`` -> ``a.txt.html``)
+        report_format: Name from REPORT_FORMATS for ``report_dir``
+    
+    Returns:
+        Number of files that could not be scored
+    
+    Raises:
+        OutputError: If the format is unknown or its library is missing
+        ValueError: If the report format is unknown
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise OutputError(f"Unknown output format: {output_format}")
+    func = _score_file
+    if report_dir is not None:
+        report_template(report_format)
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths] or ['.'])
+        func = functools.partial(_score_file, report=(report_dir, report_format, root))
+    writer = OUTPUT_FORMATS[output_format](out)
+    errors = 0
+    pending: List[Tuple[str, Dict]] = []
+    try:
+        for path, result in _run_pool(func, paths, scorer, workers, ordered):
+            if 'error' in result:
+                errors += 1
+            elif record is not None:
+                pending.append((os.path.abspath(path), result))
+                if len(pending) >= 1000:
+                    record.add_many(pending, scorer.rubric)
+                    pending.clear()
+            writer.write(path, result)
+    finally:
+        # Buffering writers (CSV before its header, Parquet) flush here
+        writer.close()
+    if pending:
+        record.add_many(pending, scorer.rubric)
+    return errors
+
+
+class BatchPipeline:
+    """
+    Batch scoring as an asyncio pipeline: read -> score -> write.
+    
+    ``readers`` threads read proposal files and extract document text,
+    ``workers`` processes score the texts and one thread writes the
+    results in batches of up to ``write_batch``. The stages are joined by
+    bounded queues, so a slow stage makes the ones before it wait instead
+    of piling up texts or results: at most ``queue_size`` texts wait to be
+    scored and ``result_queue_size`` results wait to be written, however
+    many files there are.
+    
+    Results are written in completion order. Documents are scored from
+    their joined text with :meth:`ProposalScorer.score_proposal`. Files
+    that fail at any stage become error records. Buffered output formats
+    (Parquet) would hold every row until the end, so they are rejected.
+    """
+    
+    STAGES = ('read', 'score', 'write')
+    QUEUES = ('texts', 'results')
+    
+    def __init__(
+        self,
+        scorer: ProposalScorer,
+        out,
+        readers: int = 4,
+        workers: int = 1,
+        queue_size: int = 64,
+        result_queue_size: int = 256,
+        write_batch: int = 64,
+        record: Optional[CorpusStore] = None,
+        output_format: str = 'ndjson',
+        report_dir: Optional[str] = None,
+        report_format: str = 'text'
+    ):
+        """
+        Args:
+            scorer: Scorer copied to each worker process; its text_cache
+                (if any) is used by the reader threads
+            out: Open file the results are written to, as in :func:`run_batch`
+            readers: Threads reading and extracting files
+            workers: Scoring worker processes
+            queue_size: Texts read but not yet scoring
+            result_queue_size: Results scored but not yet written
+            write_batch: Most results written (and flushed) at once
+            record: Optional CorpusStore, appended to once per written batch
+                from the write thread
+            output_format: Name from OUTPUT_FORMATS
+            report_dir: Optional directory for one report per file,
+                rendered by the workers
+            report_format: Name from REPORT_FORMATS for ``report_dir``
+        
+        Raises:
+            OutputError: If the format is unknown, buffers every row, or
+                its library is missing
+            ValueError: If a size or count is below 1, or the report
+                format is unknown
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise OutputError(f"Unknown output format: {output_format}")
+        if OUTPUT_FORMATS[output_format].buffered:
+            raise OutputError(
+                f"{output_format} output is written whole at the end, so the pipeline "
+                f"cannot stream it; use ndjson, csv or msgpack"
+            )
+        for name, value in (('readers', readers), ('workers', workers),
+                            ('queue_size', queue_size),
+                            ('result_queue_size', result_queue_size),
+                            ('write_batch', write_batch)):
+            if value < 1:
+                raise ValueError(f"{name} must be at least 1")
+        if report_dir is not None:
+            report_template(report_format)
+        
+        self.scorer = scorer
+        self.readers = readers
+        self.workers = workers
+        self.queue_size = queue_size
+        self.result_queue_size = result_queue_size
+        self.write_batch = write_batch
+        self.record = record
+        self.report_dir = report_dir
+        self.report_format = report_format
+        self.writer = OUTPUT_FORMATS[output_format](out)
+        self.errors = 0
+        self.seconds = 0.0
+        # stage -> items, busy seconds, first start and last finish
+        self._stages = {stage: {'items': 0, 'busy': 0.0, 'first': None, 'last': None}
+                        for stage in self.STAGES}
+        self._batches = 0
+        # queue -> samples, summed and highest depth, taken after each put
+        self._depths = {queue: [0, 0, 0] for queue in self.QUEUES}
+    
+    async def run(self, paths: Sequence[str]) -> int:
+        """
+        Score ``paths`` and write one record per file.
+        
+        Returns:
+            Number of files that could not be read or scored
+        """
+        import asyncio
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        
+        func = _score_read
+        if self.report_dir is not None:
+            root = os.path.commonpath(
+                [os.path.dirname(os.path.abspath(p)) for p in paths] or ['.']
+            )
+            func = functools.partial(
+                _score_read, report=(self.report_dir, self.report_format, root)
+            )
+        
+        loop = asyncio.get_running_loop()
+        pending: asyncio.Queue = asyncio.Queue(self.readers)
+        texts: asyncio.Queue = asyncio.Queue(self.queue_size)
+        results: asyncio.Queue = asyncio.Queue(self.result_queue_size)
+        read_pool = ThreadPoolExecutor(self.readers)
+        score_pool = ProcessPoolExecutor(
+            self.workers, initializer=_init_worker,
+            initargs=(self.scorer, dict(_nltk_settings))
+        )
+        # A single thread writes, so records stay whole
+        write_pool = ThreadPoolExecutor(1)
+        
+        async def timed(stage: str, items: int, pool, call, *args):
+            start = time.perf_counter()
+            try:
+                return await loop.run_in_executor(pool, call, *args)
+            finally:
+                end = time.perf_counter()
+                stats = self._stages[stage]
+                stats['items'] += items
+                stats['busy'] += end - start
+                if stats['first'] is None:
+                    stats['first'] = start
+                stats['last'] = end
+        
+        async def put(queue: str, target: asyncio.Queue, item) -> None:
+            await target.put(item)
+            depth = self._depths[queue]
+            size = target.qsize()
+            depth[0] += 1
+            depth[1] += size
+            depth[2] = max(depth[2], size)
+        
+        async def feed() -> None:
+            for path in paths:
+                await pending.put(path)
+            for _ in range(self.readers):
+                await pending.put(None)
+        
+        async def read() -> None:
+            while True:
+                path = await pending.get()
+                if path is None:
+                    return
+                try:
+                    text = await timed('read', 1, read_pool, _read_proposal,
+                                       path, self.scorer.text_cache)
+                except (OSError, ValueError) as e:
+                    await put('results', results, (path, {'error': str(e)}))
+                except Exception as e:  # an unexpected reader failure loses one file
+                    await put('results', results, _item_error(path, e))
+                else:
+                    await put('texts', texts, (path, text))
+        
+        async def score() -> None:
+            while True:
+                item = await texts.get()
+                if item is None:
+                    return
+                try:
+                    scored = await timed('score', 1, score_pool, func, item)
+                except Exception as e:
+                    scored = _item_error(item, e)
+                # The text is not held while waiting for the write stage
+                del item
+                await put('results', results, scored)
+        
+        async def write() -> None:
+            done = False
+            while not done:
+                batch = [await results.get()]
+                while len(batch) < self.write_batch and not results.empty():
+                    batch.append(results.get_nowait())
+                if batch[-1] is None:
+                    batch.pop()
+                    done = True
+                if batch:
+                    await timed('write', len(batch), write_pool, self._write, batch)
+                    self._batches += 1
+            await loop.run_in_executor(write_pool, self.writer.close)
+        
+        async def then_close(stage, target: asyncio.Queue, count: int) -> None:
+            await stage
+            for _ in range(count):
+                await target.put(None)
+        
+        start = time.perf_counter()
+        tasks = [asyncio.ensure_future(task) for task in (
+            feed(),
+            then_close(asyncio.gather(*(read() for _ in range(self.readers))),
+                       texts, self.workers),
+            then_close(asyncio.gather(*(score() for _ in range(self.workers))),
+                       results, 1),
+            write(),
+        )]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            read_pool.shutdown(wait=False)
+            score_pool.shutdown(wait=True)
+            write_pool.shutdown(wait=True)
+            self.seconds = time.perf_counter() - start
+        return self.errors
+    
+    def _write(self, batch: List[Tuple[str, Dict]]) -> None:
+        """Write and record one batch of results (in the write thread)."""
+        scored = []
+        for path, result in batch:
+            if 'error' in result:
+                self.errors += 1
+            elif self.record is not None:
+                scored.append((os.path.abspath(path), result))
+        self.writer.write_many(batch)
+        if scored:
+            self.record.add_many(scored, self.scorer.rubric)
+    
+    def stats(self) -> Dict:
+        """
+        Per-stage throughput and per-queue depth of the last :meth:`run`.
+        
+        Returns:
+            {'seconds': ..., 'files': ..., 'errors': ...,
+             'stages': {stage: {'concurrency', 'items', 'busy_seconds',
+                                'items_per_second', 'utilization'}},
+             'queues': {queue: {'size', 'max_depth', 'mean_depth'}}}
+            where items_per_second is measured from the stage's first
+            start to its last finish, and utilization is the share of
+            that time its workers were busy
+        """
+        concurrency = {'read': self.readers, 'score': self.workers, 'write': 1}
+        stages = {}
+        for stage, counts in self._stages.items():
+            active = (counts['last'] - counts['first']) if counts['first'] is not None else 0.0
+            stages[stage] = {
+                'concurrency': concurrency[stage],
+                'items': counts['items'],
+                'busy_seconds': round(counts['busy'], 3),
+                'items_per_second': round(counts['items'] / active, 1) if active else 0.0,
+                'utilization': round(counts['busy'] / (active * concurrency[stage]), 2)
+                               if active else 0.0,
+            }
+        stages['write']['batches'] = self._batches
+        
+        sizes = {'texts': self.queue_size, 'results': self.result_queue_size}
+        queues = {
+            queue: {
+                'size': sizes[queue],
+                'max_depth': highest,
+                'mean_depth': round(total / samples, 1) if samples else 0.0,
+            }
+            for queue, (samples, total, highest) in self._depths.items()
+        }
+        return {
+            'seconds': round(self.seconds, 3),
+            'files': self._stages['write']['items'],
+            'errors': self.errors,
+            'stages': stages,
+            'queues': queues,
+        }
+    
+    def format_stats(self) -> str:
+        """Render :meth:`stats` as a short table."""
+        stats = self.stats()
+        lines = [f"Pipeline: {stats['files']} files in {stats['seconds']:.2f} s"]
+        for stage, entry in stats['stages'].items():
+            lines.append(
+                f"  {stage:<6} x{entry['concurrency']:<3} {entry['items']:>8} items "
+                f"{entry['items_per_second']:>9.1f}/s  busy {entry['utilization']:>4.0%}"
+            )
+        for queue, entry in stats['queues'].items():
+            lines.append(
+                f"  queue {queue:<8} size {entry['size']:>5}  "
+                f"depth max {entry['max_depth']:>5}  mean {entry['mean_depth']:>7.1f}"
+            )
+        return '\n'.join(lines)
+
+
+class WatchManifest:
+    """
+    What each file of a watched directory looked like when last scored.
+    
+    One SQLite row per file: its size, mtime, content hash and result (as
+    JSON). The (size, mtime, hash) of every file is kept in memory, so a
+    poll compares stats without touching the database, and a restarted
+    watcher skips everything that has not changed since it stopped.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._entries: Optional[Dict[str, Tuple[int, int, str]]] = None
+    
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+    
+    def _db(self):
+        """Open the manifest database on first use."""
+        if self._conn is None:
+            import sqlite3
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30)
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS files ('
+                'path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, '
+                'digest TEXT NOT NULL, result TEXT NOT NULL, scored REAL NOT NULL)'
+            )
+            self._conn.commit()
+        return self._conn
+    
+    def entries(self) -> Dict[str, Tuple[int, int, str]]:
+        """(size, mtime_ns, digest) by path."""
+        if self._entries is None:
+            self._entries = {
+                path: (size, mtime_ns, digest) for path, size, mtime_ns, digest
+                in self._db().execute('SELECT path, size, mtime_ns, digest FROM files')
+            }
+        return self._entries
+    
+    def result(self, path: str) -> Optional[Dict]:
+        """The last result recorded for ``path``, or None."""
+        row = self._db().execute('SELECT result FROM files WHERE path = ?', (path,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def put(self, path: str, size: int, mtime_ns: int, digest: str, result: Dict) -> None:
+        """Record a freshly scored file."""
+        db = self._db()
+        db.execute(
+            'INSERT OR REPLACE INTO files (path, size, mtime_ns, digest, result, scored) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (path, size, mtime_ns, digest, json.dumps(result), time.time())
+        )
+        db.commit()
+        self.entries()[path] = (size, mtime_ns, digest)
+    
+    def touch(self, path: str, size: int, mtime_ns: int) -> None:
+        """Record new stats for a file whose content has not changed."""
+        db = self._db()
+        db.execute('UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?',
+                   (size, mtime_ns, path))
+        db.commit()
+        self.entries()[path] = (size, mtime_ns, self.entries()[path][2])
+    
+    def remove(self, path: str) -> None:
+        """Forget a file that has been deleted."""
+        db = self._db()
+        db.execute('DELETE FROM files WHERE path = ?', (path,))
+        db.commit()
+        self.entries().pop(path, None)
+    
+    def __len__(self) -> int:
+        return len(self.entries())
+    
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class _Inotify:
+    """
+    Linux inotify through ctypes: wakes a waiting watcher when anything
+    in a watched directory is created, written, moved or deleted.
+    """
+    
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    # | IN_CREATE | IN_DELETE
+    MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200
+    
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._watched: Set[str] = set()
+    
+    def watch(self, directory: str) -> None:
+        """Watch ``directory`` (not its subdirectories) if not already watched."""
+        if directory not in self._watched:
+            if self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK) >= 0:
+                self._watched.add(directory)
+    
+    def forget(self, directories: Set[str]) -> None:
+        """Drop directories that no longer exist (the kernel removed their watches)."""
+        self._watched &= directories
+    
+    def wait(self, timeout: float) -> bool:
+        """Block until an event arrives (True) or ``timeout`` seconds pass (False)."""
+        import select
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return False
+        try:
+            while os.read(self.fd, 1 << 16):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+    
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class ProposalWatcher:
+    """
+    Keeps the proposals in a directory scored as they are added and edited.
+    
+    Each :meth:`poll` stats every proposal file (any registered reader
+    extension) below ``directory`` and compares it with the manifest. A
+    new or changed file is scored with the one warm scorer once its size
+    and mtime have held still for ``debounce`` seconds, so a burst of
+    saves is scored once; a file whose bytes hash the same as before (a
+    touch, or a save without edits) is not rescored. Results are written
+    as ``<file>.score.json`` next to each proposal or, with ``log``,
+    appended to one NDJSON file that rolls over to ``<log>.1`` at
+    ``max_log_bytes``. Deleted files drop out of the manifest and their
+    sidecar is removed (or a ``{"deleted": true}`` line is logged).
+    
+    :meth:`run` polls every ``interval`` seconds. On Linux it blocks on
+    inotify between polls instead, so an idle directory costs no CPU and
+    the full walk only runs after a change or every ``rescan`` seconds.
+    """
     
-    def _score_to_percentile(self, score: float) -> str:
-        """Convert score to percentile range."""
-        if score >= 90:
-            return '95th+ (Top 10%)'
-        elif score >= 80:
-            return '80th-95th (Top 20%)'
-        elif score >= 70:
-            return '60th-80th (Top 40%)'
-        elif score >= 60:
-            return '40th-60th (Middle)'
-        else:
-            return 'Below 40th'
+    SIDECAR_SUFFIX = '.score.json'
     
-    def _identify_gaps(
-        self, 
-        category_scores: Dict[str, float],
-        category_details: Dict[str, Dict]
-    ) -> List[Dict]:
-        """Identify missing or weak elements."""
-        gaps = []
+    def __init__(
+        self,
+        scorer: ProposalScorer,
+        directory: str,
+        manifest: WatchManifest,
+        log: Optional[str] = None,
+        interval: float = 2.0,
+        debounce: float = 1.0,
+        rescan: float = 60.0,
+        max_log_bytes: int = 64 << 20
+    ):
+        self.scorer = scorer
+        self.directory = os.path.abspath(directory)
+        self.manifest = manifest
+        self.log = log
+        self.interval = interval
+        self.debounce = debounce
+        self.rescan = rescan
+        self.max_log_bytes = max_log_bytes
+        self.scored = 0
+        self.errors = 0
+        # Changed files not yet scored: path -> ((size, mtime_ns), first seen)
+        self._pending: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        self._notify: Optional[_Inotify] = None
+        self._log_file = None
+        self._writer: Optional[NDJSONWriter] = None
+    
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """(size, mtime_ns) of every proposal file below the directory."""
+        found = {}
+        directories = set()
+        for root, dirs, files in os.walk(self.directory):
+            # Hidden directories and editor/Office lock files are skipped
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            directories.add(root)
+            if self._notify is not None:
+                self._notify.watch(root)
+            for name in files:
+                if name.startswith(('.', '~$')) or os.path.splitext(name)[1].lower() not in READERS:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found[path] = (stat.st_size, stat.st_mtime_ns)
+        if self._notify is not None:
+            self._notify.forget(directories)
+        return found
+    
+    def poll(self) -> List[Tuple[str, Dict]]:
+        """
+        Score whatever has settled since the last poll.
         
-        for category, score in category_scores.items():
-            max_score = self.RUBRIC[category]['weight']
-            if score < max_score * 0.7:  # Less than 70% of max
-                coverage = category_details[category]['coverage']
-                gaps.append({
-                    'category': category.replace('_', ' ').title(),
-                    'current_score': round(score, 1),
-                    'max_score': max_score,
-                    'gap': round(max_score - score, 1),
-                    'coverage': coverage
-                })
+        Returns:
+            (path, record) for each file scored or deleted, as written
+        """
+        now = time.monotonic()
+        found = self._scan()
+        known = self.manifest.entries()
+        records = []
         
-        return sorted(gaps, key=lambda x: x['gap'], reverse=True)
-    
-    def _generate_recommendations(
-        self, 
-        gaps: List[Dict],
-        category_scores: Dict[str, float]
-    ) -> List[str]:
-        """Generate actionable recommendations."""
-        recommendations = []
+        for path in sorted(known.keys() - found.keys()):
+            self.manifest.remove(path)
+            records.append(self._emit(path, None))
+        for path in list(self._pending):
+            if path not in found:
+                del self._pending[path]
         
-        for gap in gaps[:3]:  # Top 3 gaps
-            category = gap['category'].lower().replace(' ', '_')
+        for path, stat in sorted(found.items()):
+            entry = known.get(path)
+            if entry is not None and entry[:2] == stat:
+                self._pending.pop(path, None)
+                continue
+            seen = self._pending.get(path)
+            if seen is None or seen[0] != stat:
+                seen = self._pending[path] = (stat, now)
+            if now - seen[1] < self.debounce:
+                continue
+            del self._pending[path]
             
-            if category == 'business_case':
-                recommendations.append(
-                    "Add quantifiable business outcomes with specific ROI projections. "
-                    "Include baseline metrics and target improvements."
-                )
-            elif category == 'technical_readiness':
-                recommendations.append(
-                    "Detail your existing technical infrastructure and integration plans. "
-                    "Address system compatibility and technical resource availability."
-                )
-            elif category == 'data_foundation':
-                recommendations.append(
-                    "Document your current data landscape including quality, volume, and accessibility. "
-                    "Outline data collection and preparation strategies."
-                )
-            elif category == 'success_metrics':
-                recommendations.append(
-                    "Define specific, measurable KPIs with baseline and target values. "
-                    "Include measurement methodology and reporting frequency."
-                )
-            elif category == 'risk_management':
-                recommendations.append(
-                    "Identify potential risks and develop mitigation strategies. "
-                    "Address data privacy, security, and compliance requirements."
-                )
-            elif category == 'change_management':
-                recommendations.append(
-                    "Create a stakeholder engagement plan with training strategy. "
-                    "Address adoption challenges and communication approaches."
-                )
+            try:
+                digest = file_digest(path)
+            except OSError:
+                continue
+            if entry is not None and entry[2] == digest:
+                self.manifest.touch(path, *stat)
+                continue
+            # Not memory-mapped: a file truncated mid-scan would raise SIGBUS
+            result = _score_path(self.scorer, path, mapped=False)
+            self.manifest.put(path, *stat, digest, result)
+            if 'error' in result:
+                self.errors += 1
+            else:
+                self.scored += 1
+            records.append(self._emit(path, result))
+        return records
+    
+    def _emit(self, path: str, result: Optional[Dict]) -> Tuple[str, Dict]:
+        """Write one result (None for a deleted file) to its sidecar or the log."""
+        record = {'deleted': True} if result is None else result
+        if self.log is not None:
+            if self._writer is None:
+                self._log_file = open(self.log, 'a', encoding='utf-8')
+                self._writer = NDJSONWriter(self._log_file)
+            self._writer.write(path, record)
+            if self._log_file.tell() >= self.max_log_bytes:
+                self._log_file.close()
+                os.replace(self.log, self.log + '.1')
+                self._log_file = None
+                self._writer = None
+            return path, record
         
-        # Add general recommendations based on overall score
-        total = sum(category_scores.values())
-        if total < 75:
-            recommendations.insert(0,
-                "🎯 Priority: Reach 75+ score threshold for pilot success. "
-                "Focus on the largest gaps first."
+        sidecar = path + self.SIDECAR_SUFFIX
+        if result is None:
+            try:
+                os.remove(sidecar)
+            except FileNotFoundError:
+                pass
+        else:
+            # Written whole, then renamed, so readers never see half a file
+            with open(sidecar + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2)
+            os.replace(sidecar + '.tmp', sidecar)
+        return path, record
+    
+    def run(self, polls: Optional[int] = None) -> None:
+        """
+        Poll until interrupted, or ``polls`` times.
+        
+        Uses inotify where the platform has it, falling back to sleeping
+        ``interval`` seconds between polls.
+        """
+        if sys.platform.startswith('linux'):
+            try:
+                self._notify = _Inotify()
+            except (OSError, AttributeError):
+                self._notify = None
+        count = 0
+        try:
+            while polls is None or count < polls:
+                self.poll()
+                count += 1
+                if polls is not None and count >= polls:
+                    break
+                if self._pending:
+                    timeout = self.debounce
+                elif self._notify is not None:
+                    timeout = self.rescan
+                else:
+                    timeout = self.interval
+                if self._notify is not None:
+                    self._notify.wait(timeout)
+                else:
+                    time.sleep(timeout)
+        finally:
+            if self._notify is not None:
+                self._notify.close()
+                self._notify = None
+    
+    def close(self) -> None:
+        """Close the log and the manifest."""
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+            self._writer = None
+        self.manifest.close()
+
+
+def watch_manifest_path(cache_dir: str, directory: str) -> str:
+    """Default manifest location for ``directory``: one file per directory in the cache dir."""
+    key = hashlib.sha256(os.path.abspath(directory).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(os.path.expanduser(cache_dir), f'watch-{key}.sqlite3')
+
+
+def _warm_worker() -> int:
+    """No-op task used to start a pool worker (and run its initializer)."""
+    return os.getpid()
+
+
+class ScoringServer:
+    """
+    Local HTTP/JSON scoring service that keeps scorers warm.
+    
+    Endpoints:
+        POST /score         {"text": "..."} -> score_proposal() result
+        POST /score/batch   {"texts": [...]} -> {"results": [...]}
+        GET  /metrics       Counters in Prometheus text format
+        GET  /health        {"status": "ok"}
+    
+    Scoring runs in a pool of worker processes (a single thread when
+    ``workers`` is 1), each holding one ready ProposalScorer. At most
+    ``max_concurrency`` proposals are admitted at once, each text of a
+    batch counting as one; requests that would exceed it get 503 so
+    clients can back off, and batches larger than it get 413.
+    """
+    
+    MAX_BODY_BYTES = 50 * 1024 * 1024
+    
+    def __init__(self, scorer: ProposalScorer, workers: int = 1, max_concurrency: int = 16):
+        self.scorer = scorer
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.requests: Counter = Counter()
+        self.counters: Counter = Counter()
+        self.started_at = time.time()
+        self._executor = None
+        self._score_func = _score_text
+        self._slots = None
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 8765):
+        """Start the worker pool and listen; returns the asyncio server."""
+        import asyncio
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(
+                self.workers, initializer=_init_worker,
+                initargs=(self.scorer, dict(_nltk_settings))
             )
+            warm, self._score_func = _warm_worker, _score_text
+        else:
+            # Scored in this process, so the scorer is passed in rather than installed
+            self._executor = ThreadPoolExecutor(1)
+            warm = self.scorer.load_resources
+            self._score_func = functools.partial(_score_text, scorer=self.scorer)
         
-        return recommendations
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, warm)
+            for _ in range(self.workers)
+        ))
+        return await asyncio.start_server(self._handle, host, port)
+    
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    async def serve_forever(self, host: str = '127.0.0.1', port: int = 8765) -> None:
+        """Serve until cancelled."""
+        server = await self.start(host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Serving on http://{address[0]}:{address[1]}", file=sys.stderr)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
     
-    def _detect_contradictions(self, sentences: List[str]) -> List[Dict]:
-        """Detect potential contradictions in the proposal."""
-        contradictions = []
+    async def _handle(self, reader, writer) -> None:
+        """Serve one HTTP request per connection."""
+        start = time.perf_counter()
+        path = '-'
+        try:
+            method, path, body = await self._read_request(reader)
+            status, payload = await self._route(method, path, body)
+        except ValueError as e:
+            status, payload = 400, {'error': str(e)}
+        except Exception as e:  # keep serving after unexpected failures
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
         
-        # Simple contradiction patterns
-        positive_patterns = ['will', 'can', 'have', 'ready', 'available']
-        negative_patterns = ['cannot', 'lack', 'missing', 'need', 'require']
+        if isinstance(payload, str):
+            content_type, data = 'text/plain; version=0.0.4', payload.encode('utf-8')
+        else:
+            content_type, data = 'application/json', json.dumps(payload).encode('utf-8')
         
-        for i, sent in enumerate(sentences):
-            has_positive = any(p in sent for p in positive_patterns)
-            has_negative = any(p in sent for p in negative_patterns)
-            
-            if has_positive and has_negative:
-                contradictions.append({
-                    'sentence_num': i + 1,
-                    'text': sent[:100] + '...' if len(sent) > 100 else sent,
-                    'type': 'mixed_signals'
-                })
+        from http import HTTPStatus
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
         
-        return contradictions[:5]  # Return top 5
+        self.requests[(path, status)] += 1
+        self.counters['request_seconds_sum'] += time.perf_counter() - start
+        self.counters['request_seconds_count'] += 1
     
-    def format_report(self, results: Dict) -> str:
-        """Format results as a readable report."""
-        report = []
-        report.append("=" * 60)
-        report.append("HVAC AI ADOPTION PROPOSAL SCORE")
-        report.append("=" * 60)
-        report.append(f"\nOverall Score: {results['total_score']}/100 (Grade: {results['grade']})")
-        report.append(f"Percentile: {results['percentile']}")
-        report.append(f"\nProposal Stats:")
-        report.append(f"  - {results['word_count']} words")
-        report.append(f"  - {results['sentence_count']} sentences")
-        
-        report.append(f"\n{'Category':<25} {'Score':<10} {'Coverage'}")
-        report.append("-" * 60)
-        for category, score in results['category_scores'].items():
-            details = results['category_details'][category]
-            category_name = category.replace('_', ' ').title()
-            max_score = details['max_score']
-            coverage = details['coverage']
-            report.append(f"{category_name:<25} {score:.1f}/{max_score:<5} {coverage}%")
-        
-        if results['gaps']:
-            report.append("\n" + "=" * 60)
-            report.append("GAPS IDENTIFIED")
-            report.append("=" * 60)
-            for gap in results['gaps']:
-                report.append(f"\n{gap['category']}:")
-                report.append(f"  Current: {gap['current_score']}/{gap['max_score']}")
-                report.append(f"  Gap: {gap['gap']} points")
-                report.append(f"  Coverage: {gap['coverage']}%")
-        
-        if results['recommendations']:
-            report.append("\n" + "=" * 60)
-            report.append("RECOMMENDATIONS")
-            report.append("=" * 60)
-            for i, rec in enumerate(results['recommendations'], 1):
-                report.append(f"\n{i}. {rec}")
-        
-        if results['contradictions']:
-            report.append("\n" + "=" * 60)
-            report.append("POTENTIAL CONTRADICTIONS")
-            report.append("=" * 60)
-            for contradiction in results['contradictions']:
-                report.append(f"\nSentence {contradiction['sentence_num']}:")
-                report.append(f"  {contradiction['text']}")
-        
-        report.append("\n" + "=" * 60)
-        report.append("SCORING INTERPRETATION")
-        report.append("=" * 60)
-        report.append(f"\nGrade {results['grade']} - ", end='')
-        if results['grade'] == 'A':
-            report.append("Excellent! Ready for implementation.")
-        elif results['grade'] == 'B':
-            report.append("Good. Minor improvements recommended.")
-        elif results['grade'] == 'C':
-            report.append("Acceptable. Address key gaps before proceeding.")
-        elif results['grade'] == 'D':
-            report.append("Needs work. Significant improvements required.")
-        else:
-            report.append("Insufficient. Major revision needed.")
+    async def _read_request(self, reader) -> Tuple[str, str, bytes]:
+        """Parse the request line, headers and body."""
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            raise ValueError("Malformed request line")
+        method, path, _ = request_line
+        
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
         
-        report.append(f"\n\n⚠️  Minimum 75/100 recommended for pilot success")
-        report.append("=" * 60)
+        length = int(headers.get('content-length', 0))
+        if length > self.MAX_BODY_BYTES:
+            raise ValueError(f"Request body exceeds {self.MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b''
+        return method, path.split('?', 1)[0], body
+    
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        """Dispatch a request to its endpoint."""
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path == '/metrics':
+            return 200, self.render_metrics()
+        if path not in ('/score', '/score/batch'):
+            return 404, {'error': f"Unknown endpoint: {path}"}
+        if method != 'POST':
+            return 405, {'error': f"{path} requires POST"}
+        # Checked before parsing so a busy server skips large bodies
+        if self.in_flight >= self.max_concurrency:
+            self.counters['rejected_total'] += 1
+            return 503, {'error': 'Server busy, retry later'}
+        
+        try:
+            request = json.loads(body or b'{}')
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON body: {e}") from None
+        
+        if path == '/score':
+            texts = [request.get('text')]
+            if not isinstance(texts[0], str):
+                raise ValueError("Body must be {\"text\": \"...\"}")
+        else:
+            texts = request.get('texts')
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError("Body must be {\"texts\": [\"...\", ...]}")
+            if len(texts) > self.max_concurrency:
+                self.counters['rejected_total'] += 1
+                return 413, {'error': f"Batch of {len(texts)} texts exceeds the limit of "
+                                      f"{self.max_concurrency}; split it into smaller batches"}
+        if self.in_flight + len(texts) > self.max_concurrency:
+            self.counters['rejected_total'] += 1
+            return 503, {'error': 'Server busy, retry later'}
         
-        return '\n'.join(report)
+        self.in_flight += len(texts)
+        try:
+            if path == '/score':
+                result = await self._score(texts[0])
+                return (400 if 'error' in result else 200), result
+            import asyncio
+            results = await asyncio.gather(*(self._score(text) for text in texts))
+            return 200, {'results': list(results)}
+        finally:
+            self.in_flight -= len(texts)
+    
+    async def _score(self, text: str) -> Dict:
+        """Score one proposal in the worker pool, holding one of the slots."""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            _, result = await loop.run_in_executor(self._executor, self._score_func, (None, text))
+        self.counters['errors_total' if 'error' in result else 'proposals_scored_total'] += 1
+        return result
+    
+    def render_metrics(self) -> str:
+        """Render counters in the Prometheus text exposition format."""
+        lines = [
+            '# TYPE hvac_scorer_requests_total counter',
+            *(
+                f'hvac_scorer_requests_total{{path="{path}",status="{status}"}} {count}'
+                for (path, status), count in sorted(self.requests.items())
+            ),
+            '# TYPE hvac_scorer_proposals_scored_total counter',
+            f"hvac_scorer_proposals_scored_total {self.counters['proposals_scored_total']}",
+            '# TYPE hvac_scorer_errors_total counter',
+            f"hvac_scorer_errors_total {self.counters['errors_total']}",
+            '# TYPE hvac_scorer_rejected_total counter',
+            f"hvac_scorer_rejected_total {self.counters['rejected_total']}",
+            '# TYPE hvac_scorer_request_seconds summary',
+            f"hvac_scorer_request_seconds_sum {self.counters['request_seconds_sum']:.6f}",
+            f"hvac_scorer_request_seconds_count {self.counters['request_seconds_count']}",
+            '# TYPE hvac_scorer_in_flight gauge',
+            f"hvac_scorer_in_flight {self.in_flight}",
+            '# TYPE hvac_scorer_workers gauge',
+            f"hvac_scorer_workers {self.workers}",
+            '# TYPE hvac_scorer_uptime_seconds gauge',
+            f"hvac_scorer_uptime_seconds {time.time() - self.started_at:.1f}",
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+def serve_main(argv: List[str]) -> None:
+    """Entry point for ``score_proposal.py serve``."""
+    parser = argparse.ArgumentParser(
+        prog='score_proposal.py serve',
+        description='Run the local HTTP/JSON scoring service'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765)')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Scoring worker processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        default=16,
+        help='Proposals scored at once, counting each text of a batch, before '
+             'answering 503 (default: 16)'
+    )
+    parser.add_argument(
+        '--rubric-reload',
+        type=float,
+        default=5.0,
+        metavar='SECONDS',
+        help='How often workers check --rubric for changes and swap in the '
+             'new version (default: 5; 0 checks on every request)'
+    )
+    _add_scorer_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    if args.rubric and len(args.rubric) > 1:
+        print("Error: serve takes a single --rubric")
+        sys.exit(1)
+    
+    import asyncio
+    scorer = _scorer_from_args(args)
+    scorer.rubric_check_interval = args.rubric_reload
+    server = ScoringServer(scorer, args.workers, args.max_concurrency)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+def analyze_main(argv: List[str]) -> None:
+    """Entry point for ``score_proposal.py analyze``."""
+    parser = argparse.ArgumentParser(
+        prog='score_proposal.py analyze',
+        description='Import scoring results into a corpus store and report '
+                    'score distributions per rubric and category'
+    )
+    parser.add_argument('corpus', metavar='DB', help='Corpus store (SQLite file)')
+    parser.add_argument(
+        '--import',
+        dest='imports',
+        metavar='JSONL',
+        action='append',
+        default=[],
+        help='Append results written by --batch (one JSON object per line); '
+             'repeatable. Lines are keyed by absolute file path, so '
+             're-importing a file adds nothing'
+    )
+    parser.add_argument(
+        '--rubric',
+        metavar='FILE',
+        default=os.environ.get('HVAC_SCORER_RUBRIC'),
+        help='Rubric the imported results were scored with '
+             '(default: $HVAC_SCORER_RUBRIC or the built-in one)'
+    )
+    parser.add_argument('-j', '--json', action='store_true', help='Output the report as JSON')
+    args = parser.parse_args(argv)
+    
+    corpus = CorpusStore(args.corpus)
+    try:
+        rubric = ProposalScorer.compile_rubric(args.rubric)
+        for path in args.imports:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = (json.loads(line) for line in f if line.strip())
+                added = corpus.add_many(
+                    ((os.path.abspath(line['file']) if 'file' in line else None, line)
+                     for line in lines if 'error' not in line),
+                    rubric
+                )
+            print(f"Imported {added} results from {path}", file=sys.stderr)
+    except KeyError as e:
+        print(f"Error: Result without {e} in {path}")
+        sys.exit(1)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    report = corpus.analyze()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_analysis(report))
 
 
-def main():
+def format_analysis(report: List[Dict]) -> str:
+    """Render :meth:`CorpusStore.analyze` output as tables."""
+    if not report:
+        return "Corpus is empty."
+    columns = ('count', 'mean', 'stdev', 'min', 'p10', 'p25', 'p50', 'p75', 'p90', 'max')
+    lines = []
+    for entry in report:
+        lines.append("=" * 100)
+        lines.append(f"Rubric: {entry['rubric']} ({entry['fingerprint'][:12]}) - "
+                     f"{entry['proposals']:,} proposals")
+        lines.append("Grades: " + "  ".join(
+            f"{grade} {count:,}" for grade, count in entry['grades'].items()
+        ))
+        lines.append("=" * 100)
+        lines.append(f"{'':<24}" + "".join(f"{column:>7}" for column in columns))
+        rows = [('total_score', entry['total_score'])] + list(entry['category_scores'].items())
+        for name, stats in rows:
+            lines.append(f"{name:<24}" + "".join(
+                f"{stats[column]:>7,}" if column == 'count' else f"{stats[column]:>7.1f}"
+                for column in columns
+            ))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _add_scorer_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options that configure a ProposalScorer to ``parser``."""
+    parser.add_argument(
+        '--tokenizer',
+        choices=sorted(TOKENIZERS),
+        default='nltk',
+        help='Tokenizer backend (default: nltk; regex is much faster)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=os.environ.get('HVAC_SCORER_CACHE_DIR',
+                               os.path.join('~', '.cache', 'hvac-ai-adoption')),
+        help='Directory of the persistent result cache '
+             '(default: $HVAC_SCORER_CACHE_DIR or ~/.cache/hvac-ai-adoption)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always rescore; do not read or write the result cache'
+    )
+    parser.add_argument(
+        '--match',
+        choices=MATCH_MODES,
+        default='substring',
+        help="Keyword matching: 'substring' (default), 'word' (whole words "
+             "and phrases only) or 'stem' (whole words by word stem)"
+    )
+    parser.add_argument(
+        '--rubric',
+        metavar='FILE',
+        action='append',
+        help='YAML or JSON rubric to score against instead of the built-in one '
+             '(default: $HVAC_SCORER_RUBRIC); repeat to score a proposal '
+             'against several rubrics in one pass'
+    )
+    parser.add_argument(
+        '--corpus',
+        metavar='DB',
+        default=os.environ.get('HVAC_SCORER_CORPUS'),
+        help='Corpus store of earlier results (see the analyze subcommand); '
+             'percentiles become empirical ranks within it '
+             '(default: $HVAC_SCORER_CORPUS)'
+    )
+    parser.add_argument(
+        '--dedup',
+        metavar='DB',
+        default=os.environ.get('HVAC_SCORER_DEDUP'),
+        help='Near-duplicate index of earlier submissions; results report the '
+             'most similar one (default: $HVAC_SCORER_DEDUP)'
+    )
+    parser.add_argument(
+        '--reuse-duplicates',
+        metavar='SIMILARITY',
+        type=float,
+        help='With --dedup, reuse the cached result of an earlier submission '
+             'at least this similar (0-1) instead of rescoring'
+    )
+    parser.add_argument(
+        '--sections',
+        action='store_true',
+        help='Score proposals section by section (split at headings), reuse '
+             'the counts of sections seen before and report per-section scores'
+    )
+    parser.add_argument(
+        '--nltk-data',
+        metavar='DIR',
+        help='Vendored nltk_data directory (default: $HVAC_NLTK_DATA)'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Never download NLTK data; fail fast if it is missing '
+             '(default: $HVAC_SCORER_OFFLINE)'
+    )
+
+
+def _scorer_from_args(args: argparse.Namespace) -> ProposalScorer:
+    """Build a scorer from parsed options and load its resources (or exit)."""
+    configure_nltk(data_dir=args.nltk_data, offline=args.offline or None)
+    if not args.rubric and os.environ.get('HVAC_SCORER_RUBRIC'):
+        args.rubric = [os.environ['HVAC_SCORER_RUBRIC']]
+    cache = None
+    text_cache = None
+    section_cache = None
+    if not args.no_cache:
+        cache_dir = os.path.expanduser(args.cache_dir)
+        cache = ResultCache(os.path.join(cache_dir, 'results.sqlite3'))
+        text_cache = TextCache(os.path.join(cache_dir, 'text'))
+        if args.sections:
+            section_cache = ResultCache(
+                os.path.join(cache_dir, 'sections.sqlite3'), max_memory_entries=4096
+            )
+    try:
+        scorer = ProposalScorer(
+            verbose=getattr(args, 'verbose', False),
+            tokenizer=args.tokenizer,
+            cache=cache,
+            rubric=args.rubric[0] if args.rubric else None,
+            match=args.match,
+            text_cache=text_cache,
+            corpus=CorpusStore(os.path.expanduser(args.corpus)) if args.corpus else None,
+            dedup=DuplicateIndex(os.path.expanduser(args.dedup)) if args.dedup else None,
+            reuse_duplicates=args.reuse_duplicates,
+            sections=args.sections,
+            section_cache=section_cache
+        )
+        scorer.load_resources()
+    except (NLTKResourceError, RubricError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    return scorer
+
+
+def main(argv: Optional[List[str]] = None):
     """Main entry point for the scoring tool."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'serve':
+        return serve_main(argv[1:])
+    if argv and argv[0] == 'analyze':
+        return analyze_main(argv[1:])
+    
     parser = argparse.ArgumentParser(
         description='Score HVAC AI adoption proposals',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -408,15 +5987,35 @@ def main():
 Examples:
   %(prog)s proposal.txt
   %(prog)s proposal.txt --verbose
+  %(prog)s proposal.pdf --json
   %(prog)s proposal.txt --json --output results.json
   %(prog)s --interactive
+  %(prog)s appendix_bundle.txt --stream --tokenizer regex
+  %(prog)s --batch proposals/ --workers 8 --output results.jsonl
+  %(prog)s --batch 'archive/**/*.txt' --ordered
+  %(prog)s --batch archive/ --format csv --output scores.csv
+  %(prog)s --batch archive/ --pipeline --readers 8 --queue-size 32
+  %(prog)s proposal.txt --report-format html --output report.html
+  %(prog)s --batch proposals/ --report-dir reports/ --report-format markdown
+  %(prog)s proposal.txt --tokenizer regex
+  %(prog)s proposal.txt --compare-tokenizers
+  %(prog)s proposal.txt --json --profile
+  %(prog)s proposal.txt --rubric rubrics/northeast.yaml
+  %(prog)s proposal.txt --json --rubric corporate.yaml --rubric regional.yaml
+  %(prog)s --batch archive/ --corpus corpus.sqlite3 --record
+  %(prog)s proposal.txt --corpus corpus.sqlite3
+  %(prog)s analyze corpus.sqlite3 --import results.jsonl
+  %(prog)s --batch incoming/ --dedup dedup.sqlite3 --reuse-duplicates 0.95
+  %(prog)s --watch incoming/
+  %(prog)s --watch incoming/ --watch-log scores.jsonl --debounce 5
+  %(prog)s serve --port 8765 --workers 4
         """
     )
     
     parser.add_argument(
         'proposal_file',
         nargs='?',
-        help='Path to proposal text file'
+        help='Path to proposal file (.txt, or .pdf, .docx, .xlsx)'
     )
     parser.add_argument(
         '-v', '--verbose',
@@ -437,15 +6036,264 @@ Examples:
         action='store_true',
         help='Interactive mode'
     )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Read proposal_file in chunks instead of loading it whole '
+             '(bounded memory for very large files)'
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=1 << 20,
+        help='Characters per chunk for --stream (default: 1048576)'
+    )
+    parser.add_argument(
+        '--batch',
+        metavar='DIR|GLOB',
+        help=f"Score every {', '.join(sorted(READERS))} file in a directory "
+             "(or matching a glob) and write one record per file "
+             "(JSON Lines unless --format says otherwise)"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Worker processes for --batch (default: CPU count)'
+    )
+    parser.add_argument(
+        '--ordered',
+        action='store_true',
+        help='Emit --batch results in input order instead of completion order'
+    )
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='Run --batch as a staged pipeline: reader threads, scoring '
+             'processes and batched writes joined by bounded queues, with '
+             'per-stage stats at the end (results in completion order; not '
+             'with --format parquet)'
+    )
+    parser.add_argument(
+        '--readers',
+        type=int,
+        default=4,
+        help='Threads reading and extracting files for --pipeline (default: 4)'
+    )
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=64,
+        help='Texts read but not yet scored by --pipeline (default: 64)'
+    )
+    parser.add_argument(
+        '--result-queue-size',
+        type=int,
+        default=256,
+        help='Results scored but not yet written by --pipeline (default: 256)'
+    )
+    parser.add_argument(
+        '--write-batch',
+        type=int,
+        default=64,
+        help='Most results --pipeline writes and flushes at once (default: 64)'
+    )
+    parser.add_argument(
+        '--format',
+        choices=sorted(OUTPUT_FORMATS),
+        default='ndjson',
+        help='--batch output: ndjson (default; one compact JSON object per '
+             'line), or one flat row per file as csv, msgpack or parquet'
+    )
+    parser.add_argument(
+        '--watch',
+        metavar='DIR',
+        help='Keep scoring new and changed proposal files in DIR until '
+             'interrupted, writing <file>.score.json next to each one'
+    )
+    parser.add_argument(
+        '--watch-log',
+        metavar='FILE',
+        help='With --watch, append results to one NDJSON log instead '
+             '(rolled over to FILE.1 at 64 MB)'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=2.0,
+        help='Seconds between --watch polls where inotify is unavailable '
+             '(default: 2)'
+    )
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        default=1.0,
+        help='Seconds a changed file must stay unchanged before --watch '
+             'scores it (default: 1)'
+    )
+    parser.add_argument(
+        '--manifest',
+        metavar='FILE',
+        help='--watch manifest of scored files (default: one per directory '
+             'in --cache-dir)'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Time each scoring stage and record allocation peaks '
+             '(shown after the report, or as "timings" in --json output)'
+    )
+    parser.add_argument(
+        '--report-format',
+        choices=sorted(REPORT_FORMATS),
+        default='text',
+        help='Report format: text (default), markdown or html'
+    )
+    parser.add_argument(
+        '--report-dir',
+        metavar='DIR',
+        help='With --batch, also write one --report-format report per file '
+             'to DIR, named after the file (a.txt -> a.txt.html; rendered by '
+             'the workers)'
+    )
+    parser.add_argument(
+        '--record',
+        action='store_true',
+        help='Append the results to --corpus (keyed by absolute path, so a '
+             'file is counted once per rubric)'
+    )
+    parser.add_argument(
+        '--compare-tokenizers',
+        action='store_true',
+        help='Report score drift of the regex tokenizer against nltk '
+             'for proposal_file'
+    )
+    _add_scorer_arguments(parser)
     parser.add_argument(
         '--version',
         action='version',
-        version='%(prog)s 1.0.0'
+        version=f'%(prog)s {__version__}'
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    
+    if not (args.batch or args.interactive or args.proposal_file or args.watch):
+        parser.print_help()
+        sys.exit(1)
+    
+    if args.watch and (args.batch or args.interactive or args.proposal_file):
+        print("Error: --watch cannot be combined with a proposal file, --batch or --interactive")
+        sys.exit(1)
+    if args.watch_log and not args.watch:
+        print("Error: --watch-log applies to --watch")
+        sys.exit(1)
+    
+    if args.format != 'ndjson' and not args.batch:
+        print("Error: --format applies to --batch output")
+        sys.exit(1)
+    if args.report_dir and not args.batch:
+        print("Error: --report-dir applies to --batch")
+        sys.exit(1)
+    if args.pipeline and not args.batch:
+        print("Error: --pipeline applies to --batch")
+        sys.exit(1)
+    if args.pipeline and args.ordered:
+        print("Error: --pipeline writes results in completion order; drop --ordered")
+        sys.exit(1)
+    if args.pipeline and OUTPUT_FORMATS[args.format].buffered:
+        print(f"Error: --format {args.format} is written whole at the end; "
+              f"--pipeline needs ndjson, csv or msgpack")
+        sys.exit(1)
+    if args.record and not args.corpus:
+        print("Error: --record requires --corpus")
+        sys.exit(1)
+    
+    scorer = _scorer_from_args(args)
+    scorer.profile = args.profile
+    record = scorer.corpus if args.record else None
+    
+    # Several rubrics are scored together for a single proposal
+    rubrics = None
+    if args.rubric and len(args.rubric) > 1:
+        if args.batch or args.stream or args.compare_tokenizers:
+            print("Error: Multiple --rubric values need a single proposal "
+                  "(not --batch, --stream or --compare-tokenizers)")
+            sys.exit(1)
+        try:
+            rubrics = scorer._named_rubrics(args.rubric)
+        except RubricError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    
+    # Tokenizer drift report
+    if args.compare_tokenizers:
+        if not args.proposal_file:
+            print("Error: --compare-tokenizers requires a proposal file")
+            sys.exit(1)
+        with open(args.proposal_file, 'r', encoding='utf-8') as f:
+            print(json.dumps(compare_tokenizers([f.read()]), indent=2))
+        sys.exit(0)
+    
+    # Watch mode
+    if args.watch:
+        if not os.path.isdir(args.watch):
+            print(f"Error: Not a directory: {args.watch}")
+            sys.exit(1)
+        
+        scorer.verbose = False
+        manifest = WatchManifest(args.manifest or watch_manifest_path(args.cache_dir, args.watch))
+        watcher = ProposalWatcher(scorer, args.watch, manifest, log=args.watch_log,
+                                  interval=args.interval, debounce=args.debounce)
+        print(f"Watching {args.watch} (Ctrl+C to stop)", file=sys.stderr)
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+        print(f"\nScored {watcher.scored} proposals ({watcher.errors} failed)", file=sys.stderr)
+        sys.exit(0)
     
-    scorer = ProposalScorer(verbose=args.verbose)
+    # Batch mode
+    if args.batch:
+        paths = collect_batch_files(args.batch)
+        if not paths:
+            print(f"Error: No proposal files found: {args.batch}")
+            sys.exit(1)
+        
+        scorer.verbose = False
+        binary = OUTPUT_FORMATS[args.format].binary
+        
+        def score_batch(out) -> int:
+            if not args.pipeline:
+                return run_batch(scorer, paths, out, args.workers, args.ordered, record,
+                                 args.format, args.report_dir, args.report_format)
+            import asyncio
+            pipeline = BatchPipeline(
+                scorer, out, args.readers, args.workers, args.queue_size,
+                args.result_queue_size, args.write_batch, record,
+                args.format, args.report_dir, args.report_format
+            )
+            try:
+                return asyncio.run(pipeline.run(paths))
+            finally:
+                print(pipeline.format_stats(), file=sys.stderr)
+        
+        try:
+            if args.output:
+                if binary:
+                    out = open(args.output, 'wb')
+                else:
+                    out = open(args.output, 'w', encoding='utf-8', newline='')
+                with out:
+                    errors = score_batch(out)
+            else:
+                errors = score_batch(sys.stdout.buffer if binary else sys.stdout)
+        except (OutputError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Scored {len(paths) - errors}/{len(paths)} proposals", file=sys.stderr)
+        sys.exit(1 if errors else 0)
     
     # Interactive mode
     if args.interactive:
@@ -459,28 +6307,47 @@ Examples:
         except KeyboardInterrupt:
             print("\n\nCancelled.")
             sys.exit(0)
+        document = False
     
     # File mode
-    elif args.proposal_file:
+    else:
         proposal_path = Path(args.proposal_file)
         if not proposal_path.exists():
             print(f"Error: File not found: {args.proposal_file}")
             sys.exit(1)
         
-        with open(proposal_path, 'r', encoding='utf-8') as f:
-            proposal_text = f.read()
-    
-    else:
-        parser.print_help()
-        sys.exit(1)
+        # PDF, DOCX and XLSX text is extracted and streamed to the scorer
+        document = proposal_path.suffix.lower() in READERS.keys() - {'.txt'}
+        if document and rubrics:
+            print("Error: Multiple --rubric values need a text proposal")
+            sys.exit(1)
+        
+        proposal_text = None
     
     # Score the proposal
     try:
-        results = scorer.score_proposal(proposal_text)
+        if document:
+            results = scorer.score_document(args.proposal_file)
+        elif proposal_text is not None:
+            results = scorer.score_proposal(proposal_text, rubrics=rubrics)
+        elif args.stream:
+            with open(args.proposal_file, 'r', encoding='utf-8') as f:
+                results = scorer.score_stream(f, args.chunk_size)
+        else:
+            # Plain text is memory-mapped and scanned as bytes when it can be
+            results = scorer.score_file(args.proposal_file, rubrics=rubrics)
     except ValueError as e:
         print(f"Error: {e}")
         sys.exit(1)
     
+    if record is not None:
+        key = os.path.abspath(args.proposal_file) if args.proposal_file else None
+        if rubrics is None:
+            record.add(results, scorer.rubric, key)
+        else:
+            for name, rubric in rubrics.items():
+                record.add(results[name], rubric, key)
+    
     # Output results
     if args.json:
         output = json.dumps(results, indent=2)
@@ -491,13 +6358,24 @@ Examples:
         else:
             print(output)
     else:
-        report = scorer.format_report(results)
+        # Reports are rendered straight to the output file
+        reports = [(None, results)] if rubrics is None else list(results.items())
+        out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        try:
+            for i, (name, result) in enumerate(reports):
+                if i:
+                    out.write('\n\n')
+                scorer.render_report(result, out, args.report_format, name)
+        finally:
+            if args.output:
+                out.close()
         if args.output:
-            with open(args.output, 'w') as f:
-                f.write(report)
             print(f"Report saved to: {args.output}")
         else:
-            print(report)
+            out.write('\n')
+        timings = (next(iter(results.values())) if rubrics else results).get('timings')
+        if timings is not None:
+            print(scorer.format_timings(timings), file=sys.stderr)
 
 
 if __name__ == '__main__':
@@ -4,7 +4,16 @@ Test suite for the HVAC AI Adoption Proposal Scorer.
 This module tests the scoring functionality to ensure proposals are
 evaluated consistently and accurately across all key dimensions.
 """
+import asyncio
+import io
+import json
+import os
+import random
+import re
+import subprocess
 import sys
+import threading
+from array import array
 from pathlib import Path
 
 # Add scripts directory to Python path
@@ -13,7 +22,14 @@ scripts_path = repo_root / "scripts"
 sys.path.insert(0, str(scripts_path))
 
 import pytest
-from score_proposal import ProposalScorer
+import score_proposal
+from score_proposal import (
+    BatchPipeline, CompiledRubric, CorpusStore, Document, DuplicateIndex, IncrementalScorer,
+    KeywordMatcher, NLTKResourceError, OutputError, ProposalScorer,
+    ProposalWatcher, ReaderError, RegexTokenizer, ResultCache, RubricError, ScoreResult,
+    ScoringServer, SentenceSpans, TextCache, Vocabulary, WatchManifest,
+    collect_batch_files, compare_tokenizers, load_rubric, read_document, run_batch, split_sections
+)
 
 
 class TestProposalScorer:
@@ -148,6 +164,1618 @@ class TestEdgeCases:
         assert result is not None
 
 
+class TestKeywordMatcher:
+    """Test the single-pass rubric keyword matcher."""
+    
+    @staticmethod
+    def _naive_counts(text, sentences, keywords):
+        """Reference implementation: per-keyword substring checks."""
+        matches = sum(1 for kw in keywords if kw in text)
+        relevant = sum(1 for s in sentences if any(kw in s for kw in keywords))
+        return matches, relevant
+    
+    def test_overlapping_keywords(self):
+        """Test that prefix and nested keywords are all reported."""
+        groups = [['data', 'data quality', 'dataset'], ['quality', 'set']]
+        matcher = KeywordMatcher(groups)
+        text = "our data quality is good. the dataset is new."
+        spans = [(0, 25), (26, 45)]
+        
+        matches = matcher.scan(text, spans)
+        
+        assert matches.keywords_matched(0) == 3
+        assert matches.keywords_matched(1) == 2
+        assert matches.relevant_sentences(0) == 2
+        assert matches.relevant_sentences(1) == 2
+    
+    def test_keyword_across_sentence_boundary(self):
+        """Test that text-level hits include keywords spanning sentences."""
+        matcher = KeywordMatcher([['cost savings']])
+        text = "we cut cost. savings followed. cost savings"
+        
+        split = matcher.scan(text, [(0, 12), (13, 30)])
+        
+        assert split.keywords_matched(0) == 1
+        assert split.relevant_sentences(0) == 0
+    
+    def test_matches_naive_rubric_counts(self, comprehensive_proposal):
+        """Test that results equal per-keyword substring scans."""
+        scorer = ProposalScorer()
+        text = comprehensive_proposal.lower()
+        spans = [m.span() for m in re.finditer(r'[^\n]+', text)]
+        sentences = [text[start:end] for start, end in spans]
+        
+        matches = scorer.matcher.scan(text, spans)
+        
+        for index, config in enumerate(scorer.RUBRIC.values()):
+            expected = self._naive_counts(text, sentences, config['keywords'])
+            actual = (matches.keywords_matched(index),
+                      matches.relevant_sentences(index))
+            assert actual == expected
+
+
+class TestBatchScoring:
+    """Test batch scoring across worker processes."""
+    
+    def test_score_many_matches_single(self, sample_proposal, comprehensive_proposal):
+        """Test that pooled results equal one-by-one scoring, in input order."""
+        scorer = ProposalScorer()
+        proposals = [sample_proposal, comprehensive_proposal] * 3
+        
+        results = list(scorer.score_many(proposals, workers=2, ordered=True))
+        
+        assert [index for index, _ in results] == list(range(len(proposals)))
+        for index, result in results:
+            assert result == scorer.score_proposal(proposals[index])
+    
+    def test_score_many_reports_errors(self, sample_proposal):
+        """Test that invalid proposals yield an error instead of aborting."""
+        scorer = ProposalScorer()
+        
+        results = dict(scorer.score_many(['too short', sample_proposal]))
+        
+        assert 'error' in results[0]
+        assert 'total_score' in results[1]
+    
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_unexpected_errors_become_records(self, sample_proposal, workers):
+        """Test that an item raising outside validation does not end the run."""
+        scorer = ProposalScorer(tokenizer='regex')
+        
+        results = dict(scorer.score_many([sample_proposal, 123, sample_proposal], workers))
+        
+        assert results[1] == {'error': "AttributeError: 'int' object has no attribute 'strip'"}
+        assert results[0] == results[2] == scorer.score_proposal(sample_proposal)
+        # Scoring in this process leaves the worker scorer slot alone
+        assert score_proposal._WORKER_SCORER is None
+    
+    def test_run_batch_writes_json_lines(self, tmp_path, sample_proposal):
+        """Test that a directory batch streams one JSON object per file."""
+        for name in ('a.txt', 'b.txt', 'c.txt'):
+            (tmp_path / name).write_text(sample_proposal, encoding='utf-8')
+        (tmp_path / 'notes.md').write_text('ignored', encoding='utf-8')
+        out = io.StringIO()
+        
+        paths = collect_batch_files(str(tmp_path))
+        errors = run_batch(ProposalScorer(), paths, out, workers=2)
+        
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert errors == 0
+        assert len(paths) == 3
+        assert sorted(r['file'] for r in records) == paths
+
+
+class TestLazyStartup:
+    """Test that NLTK is loaded lazily and offline mode fails fast."""
+    
+    # Heavy or optional modules that are only imported when first used
+    LAZY_MODULES = (
+        'nltk', 'numpy', 'sqlite3', 'asyncio', 'concurrent.futures', 'multiprocessing',
+        'mmap', 'yaml', 'PyPDF2', 'docx', 'openpyxl', 'pandas', 'msgpack'
+    )
+    
+    @staticmethod
+    def _run(tmp_path, *args):
+        """Run python in the repo root with bytecode cached under tmp_path."""
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=str(tmp_path))
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        return subprocess.run(
+            [sys.executable, *args], cwd=str(repo_root), env=env,
+            capture_output=True, text=True, check=True
+        )
+    
+    def test_import_is_lazy(self, tmp_path):
+        """Test that importing the module loads none of the lazy dependencies."""
+        proc = self._run(tmp_path, '-c', (
+            'import sys, score_proposal; '
+            f'print([m for m in {self.LAZY_MODULES!r} if m in sys.modules])'
+        ))
+        
+        assert proc.stdout.strip() == '[]'
+    
+    def test_version_does_not_import_nltk(self, tmp_path):
+        """Test that --version and --help never import NLTK."""
+        for flag in ('--version', '--help'):
+            proc = self._run(tmp_path, '-X', 'importtime', 'score_proposal.py', flag)
+            assert '| nltk' not in proc.stderr
+    
+    def test_offline_missing_resource_fails_fast(self, monkeypatch):
+        """Test that offline mode raises instead of downloading."""
+        import nltk
+        
+        def no_download(*args, **kwargs):
+            raise AssertionError("download attempted in offline mode")
+        
+        monkeypatch.setitem(score_proposal._nltk_settings, 'offline', True)
+        monkeypatch.setattr(nltk, 'download', no_download)
+        
+        with pytest.raises(NLTKResourceError, match='offline'):
+            score_proposal._ensure_nltk_resource('corpora/no_such_corpus', 'no_such_corpus')
+
+
+class TestTokenizers:
+    """Test the pluggable tokenizer backends."""
+    
+    def test_regex_sentence_spans_and_words(self):
+        """Test one-pass sentence spans and Treebank-like word tokens."""
+        text = "roi is 8.2x. we save $50,000!  next (see e-mail.)\n last line"
+        
+        spans, words = RegexTokenizer().tokenize(text)
+        
+        assert [text[a:b] for a, b in spans] == [
+            "roi is 8.2x.", "we save $50,000!", "next (see e-mail.)", "last line"
+        ]
+        assert words == [
+            'roi', 'is', '8.2x', 'we', 'save', '50,000', 'next', 'see',
+            'e-mail', 'last', 'line'
+        ]
+    
+    def test_unknown_tokenizer(self):
+        """Test that an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            ProposalScorer(tokenizer='whitespace')
+    
+    def test_regex_drift_against_nltk(self, sample_proposal, comprehensive_proposal):
+        """Test that the regex backend scores exactly like NLTK."""
+        sample_file = (repo_root / 'sample_proposal.txt').read_text(encoding='utf-8')
+        
+        report = compare_tokenizers([sample_file, sample_proposal, comprehensive_proposal])
+        
+        for entry in report:
+            assert entry['total_drift'] == 0.0, entry
+            assert set(entry['category_drift'].values()) == {0.0}, entry
+
+
+class TestResultCache:
+    """Test the content-addressed result cache."""
+    
+    def test_cached_result_matches_fresh(self, sample_proposal):
+        """Test that a cache hit returns the same scores as scoring."""
+        scorer = ProposalScorer(cache=ResultCache())
+        
+        first = scorer.score_proposal(sample_proposal)
+        second = scorer.score_proposal('  ' + sample_proposal.upper() + '\n')
+        
+        assert first.pop('cache') == {'hit': False, 'hits': 0, 'misses': 1}
+        assert second.pop('cache') == {'hit': True, 'hits': 1, 'misses': 1}
+        assert first == second == ProposalScorer().score_proposal(sample_proposal)
+    
+    def test_hit_prints_verbose_breakdown(self, tmp_path, capsys, sample_proposal):
+        """Test that a cache hit prints the same --verbose output as scoring."""
+        path = tmp_path / 'proposal.txt'
+        path.write_text(sample_proposal)
+        scorer = ProposalScorer(tokenizer='regex', verbose=True, cache=ResultCache())
+        
+        scorer.score_proposal(sample_proposal)
+        scored = capsys.readouterr().out
+        assert scorer.score_proposal(sample_proposal)['cache']['hit']
+        hit = capsys.readouterr().out
+        assert scorer.score_file(str(path))['cache']['hit']
+        file_hit = capsys.readouterr().out
+        
+        assert 'Keywords matched:' in scored
+        assert hit == file_hit == scored
+    
+    def test_key_depends_on_configuration(self, sample_proposal):
+        """Test that scorers with different tokenizers never share entries."""
+        nltk_key = ProposalScorer(tokenizer='nltk').cache_key(sample_proposal)
+        regex_key = ProposalScorer(tokenizer='regex').cache_key(sample_proposal)
+        
+        assert nltk_key != regex_key
+    
+    def test_memory_tier_evicts_least_recent(self):
+        """Test LRU eviction of the in-memory tier."""
+        cache = ResultCache(max_memory_entries=2)
+        cache.put('a', {'n': 1})
+        cache.put('b', {'n': 2})
+        cache.get('a')
+        cache.put('c', {'n': 3})
+        
+        assert cache.get('b') is None
+        assert cache.get('a') == {'n': 1}
+        assert cache.get('c') == {'n': 3}
+    
+    def test_disk_tier_persists_and_is_bounded(self, tmp_path):
+        """Test that the SQLite tier survives restarts and caps its size."""
+        path = str(tmp_path / 'cache' / 'results.sqlite3')
+        cache = ResultCache(path, max_disk_entries=3)
+        for n in range(5):
+            cache.put(f'key{n}', {'n': n})
+        
+        reopened = ResultCache(path, max_disk_entries=3)
+        
+        assert reopened.get('key0') is None
+        assert reopened.get('key4') == {'n': 4}
+        assert reopened._db().execute('SELECT COUNT(*) FROM results').fetchone()[0] == 3
+
+
+class TestScoringServer:
+    """Test the HTTP/JSON scoring service with a local client."""
+    
+    @staticmethod
+    async def _request(port, method, path, payload=None):
+        """Send one HTTP request and return (status, body text)."""
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, _, data = response.partition(b'\r\n\r\n')
+        return int(head.split()[1]), data.decode('utf-8')
+    
+    def _serve(self, exchange, max_concurrency=4):
+        """Run ``exchange(port)`` against a server on an ephemeral port."""
+        async def run():
+            server = ScoringServer(ProposalScorer(), workers=1,
+                                   max_concurrency=max_concurrency)
+            listener = await server.start('127.0.0.1', 0)
+            try:
+                return await exchange(listener.sockets[0].getsockname()[1])
+            finally:
+                listener.close()
+                server.close()
+        return asyncio.run(run())
+    
+    def test_score_and_batch(self, sample_proposal):
+        """Test that /score and /score/batch return score_proposal results."""
+        async def exchange(port):
+            single = await self._request(port, 'POST', '/score', {'text': sample_proposal})
+            batch = await self._request(port, 'POST', '/score/batch',
+                                        {'texts': [sample_proposal, 'too short']})
+            metrics = await self._request(port, 'GET', '/metrics')
+            return single, batch, metrics
+        
+        single, batch, metrics = self._serve(exchange)
+        
+        expected = ProposalScorer().score_proposal(sample_proposal)
+        assert single == (200, json.dumps(expected))
+        results = json.loads(batch[1])['results']
+        assert results[0] == expected
+        assert 'error' in results[1]
+        assert 'hvac_scorer_proposals_scored_total 2' in metrics[1]
+        assert 'hvac_scorer_errors_total 1' in metrics[1]
+    
+    def test_error_statuses(self):
+        """Test bad requests, unknown endpoints and wrong methods."""
+        async def exchange(port):
+            return [
+                (await self._request(port, 'POST', '/score', {'text': 'too short'}))[0],
+                (await self._request(port, 'POST', '/score', {'body': 1}))[0],
+                (await self._request(port, 'GET', '/score'))[0],
+                (await self._request(port, 'GET', '/nope'))[0],
+            ]
+        
+        assert self._serve(exchange) == [400, 400, 405, 404]
+    
+    def test_batch_counts_each_text(self, sample_proposal):
+        """Test that every text of a batch counts against max_concurrency."""
+        async def exchange(port):
+            oversized = await self._request(port, 'POST', '/score/batch',
+                                            {'texts': [sample_proposal] * 3})
+            full = await self._request(port, 'POST', '/score/batch',
+                                       {'texts': [sample_proposal] * 2})
+            metrics = await self._request(port, 'GET', '/metrics')
+            return oversized, full, metrics
+        
+        oversized, full, metrics = self._serve(exchange, max_concurrency=2)
+        
+        assert oversized[0] == 413 and 'limit of 2' in oversized[1]
+        assert full[0] == 200 and len(json.loads(full[1])['results']) == 2
+        assert 'hvac_scorer_rejected_total 1' in metrics[1]
+        assert 'hvac_scorer_proposals_scored_total 2' in metrics[1]
+    
+    def test_busy_server_rejects_batch(self, sample_proposal):
+        """Test that a batch over the remaining capacity gets 503."""
+        server = ScoringServer(ProposalScorer(), max_concurrency=2)
+        server.in_flight = 1
+        body = json.dumps({'texts': [sample_proposal] * 2}).encode('utf-8')
+        
+        status, _ = asyncio.run(server._route('POST', '/score/batch', body))
+        
+        assert status == 503
+        assert server.counters['rejected_total'] == 1
+    
+    def test_concurrency_limit(self, sample_proposal):
+        """Test that requests beyond the concurrency limit get 503."""
+        async def exchange(port):
+            return await self._request(port, 'POST', '/score', {'text': sample_proposal})
+        
+        status, _ = self._serve(exchange, max_concurrency=0)
+        
+        assert status == 503
+
+
+class TestStreamingScorer:
+    """Test chunked scoring of large proposals."""
+    
+    @pytest.mark.parametrize('tokenizer', ['nltk', 'regex'])
+    @pytest.mark.parametrize('chunk_size', [1, 13, 256, 1 << 20])
+    def test_stream_matches_whole_text(self, comprehensive_proposal, tokenizer, chunk_size):
+        """Test that sentences spanning chunk boundaries score identically."""
+        scorer = ProposalScorer(tokenizer=tokenizer)
+        sample_file = (repo_root / 'sample_proposal.txt').read_text(encoding='utf-8')
+        
+        for text in (sample_file, comprehensive_proposal):
+            streamed = scorer.score_stream(
+                io.StringIO(text), chunk_size=chunk_size, max_sentence_chars=1 << 30
+            )
+            assert streamed == scorer.score_proposal(text)
+    
+    def test_stream_accepts_chunk_iterable(self, sample_proposal):
+        """Test scoring from an iterable of text chunks."""
+        scorer = ProposalScorer(tokenizer='regex')
+        chunks = [sample_proposal[i:i + 40] for i in range(0, len(sample_proposal), 40)]
+        
+        assert scorer.score_stream(chunks) == scorer.score_proposal(sample_proposal)
+    
+    def test_stream_rejects_binary_file(self, sample_proposal):
+        """Test that a binary file object is rejected instead of read forever."""
+        scorer = ProposalScorer(tokenizer='regex')
+        
+        with pytest.raises(TypeError, match='text mode'):
+            scorer.score_stream(io.BytesIO(sample_proposal.encode('utf-8')), chunk_size=64)
+    
+    def test_stream_rejects_short_text(self):
+        """Test the minimum length check without loading the text."""
+        scorer = ProposalScorer(tokenizer='regex')
+        
+        with pytest.raises(ValueError):
+            scorer.score_stream(io.StringIO('   ' + 'x' * 99 + '\n' * 500), chunk_size=16)
+    
+    def test_long_sentence_is_split(self):
+        """Test that a sentence without terminators cannot grow unbounded."""
+        scorer = ProposalScorer(tokenizer='regex')
+        text = 'roi data risk training kpi platform ' * 200
+        
+        result = scorer.score_stream(io.StringIO(text), chunk_size=64, max_sentence_chars=256)
+        
+        assert result['sentence_count'] > 1
+        assert result['word_count'] == scorer.score_proposal(text)['word_count']
+
+
+class TestIncrementalScorer:
+    """Test rescoring of edited proposals."""
+    
+    @pytest.mark.parametrize('tokenizer', ['nltk', 'regex'])
+    def test_edits_match_full_rescore(self, comprehensive_proposal, tokenizer):
+        """Test that replace and append give the same result as rescoring."""
+        scorer = ProposalScorer(tokenizer=tokenizer)
+        inc = IncrementalScorer(comprehensive_proposal, scorer)
+        assert inc.result() == scorer.score_proposal(comprehensive_proposal)
+        
+        pos = inc.text.index('roi analysis')
+        inc.replace(pos, pos + 3, 'Return on investment')
+        inc.append_paragraph('We will need a risk assessment. The data is not ready.')
+        pos = inc.text.index('security & privacy')
+        inc.replace(pos, pos + 18, 'Governance. Compliance')
+        inc.replace(0, inc.text.index('pilot scope'), '')
+        
+        assert inc.result() == scorer.score_proposal(inc.text)
+    
+    def test_edit_merging_sentences(self, sample_proposal):
+        """Test that deleting a sentence terminator merges neighbours."""
+        scorer = ProposalScorer(tokenizer='regex')
+        text = sample_proposal + ' First risk. Second risk! Third.'
+        inc = IncrementalScorer(text, scorer)
+        
+        pos = inc.text.index('. second')
+        inc.replace(pos, pos + 1, '')
+        
+        assert inc.result() == scorer.score_proposal(inc.text)
+        assert inc.result()['sentence_count'] == scorer.score_proposal(text)['sentence_count'] - 1
+    
+    @pytest.mark.parametrize('tokenizer', ['nltk', 'regex'])
+    def test_random_edits_match_full_rescore(self, sample_proposal, tokenizer):
+        """Test seeded random inserts, deletes and replaces against rescoring."""
+        rng = random.Random(8)
+        scorer = ProposalScorer(tokenizer=tokenizer)
+        # Multi-word keywords split by terminators, so edits join and split them
+        fragments = [
+            'risk assessment', 'risk. assessment', 'return on. investment',
+            'data quality', 'data! quality', 'backup plan', 'backup? plan',
+            'we will not ', 'roi', 'pilot', '. ', '.', '!', '?', ' ', '\n\n', 'x',
+        ]
+        inc = IncrementalScorer(sample_proposal, scorer)
+        
+        for step in range(60):
+            text = inc.text
+            start = rng.randrange(len(text) + 1)
+            kind = rng.choice(['insert', 'delete', 'replace'])
+            end = start if kind == 'insert' else min(start + rng.randint(1, 20), len(text))
+            new_text = '' if kind == 'delete' else rng.choice(fragments)
+            if len((text[:start] + new_text + text[end:]).strip()) < 100:
+                new_text = new_text + ' data collection. ' * 10
+            inc.replace(start, end, new_text)
+            
+            expected = scorer.score_proposal(inc.text, use_cache=False)
+            assert inc.result() == expected, (step, kind, start, end, new_text)
+    
+    def test_out_of_range_edit(self, sample_proposal):
+        """Test that edits outside the document are rejected."""
+        inc = IncrementalScorer(sample_proposal, ProposalScorer(tokenizer='regex'))
+        
+        with pytest.raises(ValueError):
+            inc.replace(5, len(inc.text) + 1, 'x')
+
+
+class TestScoreMatrix:
+    """Test vectorized scoring of pre-matched proposals."""
+    
+    def test_matches_scalar_scoring(self, sample_proposal, comprehensive_proposal):
+        """Test that array scores equal score_proposal for each proposal."""
+        pytest.importorskip('numpy')
+        scorer = ProposalScorer(tokenizer='regex')
+        texts = [sample_proposal, comprehensive_proposal, sample_proposal + ' Risk. ROI.']
+        
+        out = scorer.score_matrix(*scorer.match_matrix(texts))
+        
+        for i, text in enumerate(texts):
+            expected = scorer.score_proposal(text, use_cache=False)
+            assert list(out['category_scores'][i]) == list(expected['category_scores'].values())
+            assert round(float(out['total_score'][i]), 1) == expected['total_score']
+            assert out['grade'][i] == expected['grade']
+            assert out['percentile'][i] == expected['percentile']
+    
+    def test_wide_categories(self, sample_proposal):
+        """Test categories with more keywords than fit one 64-bit word."""
+        pytest.importorskip('numpy')
+        keywords = [f'term{i:03d}' for i in range(130)]
+        rubric = {
+            'wide': {'weight': 60, 'keywords': keywords},
+            'narrow': {'weight': 40, 'keywords': ['data', 'pilot']},
+        }
+        scorer = ProposalScorer(tokenizer='regex', rubric=rubric)
+        texts = [
+            sample_proposal + ' ' + ' '.join(f'{keyword}.' for keyword in keywords[::3]),
+            sample_proposal + ' term000 term064 term129.',
+            sample_proposal,
+        ]
+        
+        hits, relevant, sentences = scorer.match_matrix(texts)
+        out = scorer.score_matrix(hits, relevant, sentences)
+        
+        assert hits.shape == (3, 2, 130)
+        assert [int(n) for n in hits[:, 0].sum(axis=1)] == [44, 3, 0]
+        assert list(hits[1, 0].nonzero()[0]) == [0, 64, 129]
+        for i, text in enumerate(texts):
+            expected = scorer.score_proposal(text, use_cache=False)
+            assert list(out['category_scores'][i]) == list(expected['category_scores'].values())
+    
+    def test_grade_bands(self):
+        """Test that grade and percentile bands match the scalar helpers."""
+        np = pytest.importorskip('numpy')
+        scorer = ProposalScorer()
+        totals = [0, 59.9, 60, 69.9, 70, 80, 89.99, 90, 100]
+        
+        # Full depth only, so each category scores 0.3 of its weight
+        hits = np.zeros((1, len(scorer.RUBRIC), 1), dtype=bool)
+        relevant = np.full((1, len(scorer.RUBRIC)), 3)
+        sentences = np.full(1, np.inf)
+        
+        for target in totals:
+            weights = {name: target / 0.3 / len(scorer.RUBRIC) for name in scorer.RUBRIC}
+            out = scorer.score_matrix(hits, relevant, sentences, weights)
+            total = float(out['total_score'][0])
+            
+            assert total == pytest.approx(target)
+            assert out['grade'][0] == scorer._calculate_grade(total)
+            assert out['percentile'][0] == scorer._score_to_percentile(total)
+
+
+class TestBenchmarks:
+    """Smoke test for the benchmark harness."""
+    
+    def test_report(self, tmp_path):
+        """Test that a tiny benchmark run writes a JSON report."""
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = tmp_path / 'bench.json'
+        subprocess.run(
+            [sys.executable, os.path.join(root, 'benchmarks', 'run_benchmarks.py'),
+             '--sizes', '2KB', '--stages', 'tokenize,match,score_proposal',
+             '--repeat', '1', '--import-budget', 'inf', '-o', str(out)],
+            check=True, capture_output=True
+        )
+        
+        report = json.loads(out.read_text())
+        assert report['import_ms'] > 0
+        assert [entry['stage'] for entry in report['results']] == \
+            ['tokenize', 'match', 'score_proposal']
+        assert all(entry['median'] > 0 for entry in report['results'])
+        assert report['results'][0]['size'] == '2KB'
+
+
+class TestProfiling:
+    """Test per-stage timing instrumentation."""
+    
+    def test_disabled_by_default(self, sample_proposal):
+        """Test that results carry no timings unless profiling is on."""
+        results = ProposalScorer(tokenizer='regex').score_proposal(sample_proposal)
+        
+        assert 'timings' not in results
+    
+    def test_stage_timings(self, sample_proposal):
+        """Test that each stage is timed without changing the scores."""
+        received = []
+        scorer = ProposalScorer(tokenizer='regex', on_timings=received.append)
+        
+        results = scorer.score_proposal(sample_proposal)
+        timings = results.pop('timings')
+        
+        assert results == ProposalScorer(tokenizer='regex').score_proposal(sample_proposal)
+        assert received == [timings]
+        stages = timings['stages']
+        for stage in ('lowercase', 'sentence_tokenize', 'word_tokenize', 'stopword_filter',
+                      'keyword_match', 'claim_cues', 'detect_contradictions', 'identify_gaps'):
+            assert stages[stage]['seconds'] >= 0
+            assert stages[stage]['peak_bytes'] >= 0
+        assert len([name for name in stages if name.startswith('score_category:')]) == 6
+        assert timings['total_seconds'] >= sum(r['seconds'] for r in stages.values())
+        assert 'STAGE TIMINGS' in scorer.format_timings(timings)
+    
+    def test_cli_profile(self, tmp_path, capsys, sample_proposal):
+        """Test that --profile adds timings to --json output."""
+        path = tmp_path / 'proposal.txt'
+        path.write_text(sample_proposal)
+        
+        score_proposal.main([str(path), '--json', '--profile', '--no-cache',
+                             '--tokenizer', 'regex'])
+        
+        assert 'keyword_match' in json.loads(capsys.readouterr().out)['timings']['stages']
+    
+    def test_report_timings_fire_once(self, sample_proposal):
+        """Test that rendering a scored proposal does not call on_timings again."""
+        received = []
+        scorer = ProposalScorer(tokenizer='regex', on_timings=received.append)
+        
+        results = scorer.score_proposal(sample_proposal)
+        scorer.format_report(results)
+        
+        assert received == [results['timings']]
+        assert 'format_report' in received[0]['stages']
+    
+    def test_cli_profile_streamed_input(self, tmp_path, capsys, sample_proposal):
+        """Test that --stream and document input are profiled too."""
+        pytest.importorskip('PyPDF2')
+        path = tmp_path / 'proposal.txt'
+        path.write_text(sample_proposal)
+        write_pdf(tmp_path / 'proposal.pdf', TestDocumentReaders.PAGES)
+        
+        for args, stage in (([str(path), '--stream'], 'read'),
+                            ([str(tmp_path / 'proposal.pdf')], 'read_document')):
+            score_proposal.main(args + ['--json', '--profile', '--no-cache',
+                                        '--tokenizer', 'regex'])
+            stages = json.loads(capsys.readouterr().out)['timings']['stages']
+            assert stage in stages and 'keyword_match' in stages
+
+
+class TestRubric:
+    """Test external rubric loading, compilation and reloading."""
+    
+    @staticmethod
+    def write_rubric(path, risk_weight=10, recommendation='Quantify the payback period.'):
+        rubric = ProposalScorer.default_rubric().to_dict()
+        categories = rubric['categories']
+        categories['risk_management']['weight'] = risk_weight
+        categories['business_case']['recommendation'] = recommendation
+        categories['change_management']['weight'] = 20 - risk_weight
+        path.write_text(json.dumps(rubric))
+        # Make the change visible to mtime checks on coarse clocks
+        stamp = path.stat().st_mtime_ns + risk_weight * 1_000_000_000
+        os.utime(path, ns=(stamp, stamp))
+    
+    def test_builtin_rubric_file(self, sample_proposal):
+        """Test that rubrics/default.yaml is the built-in rubric."""
+        pytest.importorskip('yaml')
+        path = Path(__file__).parent.parent / 'rubrics' / 'default.yaml'
+        
+        scorer = ProposalScorer(tokenizer='regex', rubric=path)
+        
+        assert scorer.rubric.fingerprint == ProposalScorer.default_rubric().fingerprint
+        assert scorer.score_proposal(sample_proposal) == \
+            ProposalScorer(tokenizer='regex').score_proposal(sample_proposal)
+    
+    def test_custom_rubric(self, tmp_path, sample_proposal):
+        """Test that weights and recommendations come from the rubric."""
+        path = tmp_path / 'region.json'
+        self.write_rubric(path, risk_weight=5, recommendation='Quantify the payback period.')
+        
+        scorer = ProposalScorer(tokenizer='regex', rubric=str(path))
+        results = scorer.score_proposal(sample_proposal)
+        
+        assert results['category_details']['risk_management']['max_score'] == 5
+        assert results['category_details']['change_management']['max_score'] == 15
+        assert 'Quantify the payback period.' in results['recommendations']
+    
+    def test_categories_with_same_title(self, sample_proposal):
+        """Test that gaps and recommendations keep ids whose titles collide."""
+        rubric = {
+            'data_ai': {'weight': 50, 'keywords': ['data'], 'recommendation': 'Lower.'},
+            'Data_AI': {'weight': 50, 'keywords': ['zebra'], 'recommendation': 'Upper.'},
+        }
+        scorer = ProposalScorer(tokenizer='regex', rubric=rubric)
+        
+        results = scorer.score_proposal(sample_proposal)
+        
+        assert [gap['category_id'] for gap in results['gaps']] == ['Data_AI']
+        assert results['recommendations'][-1] == 'Upper.'
+        assert scorer.RUBRIC is ProposalScorer.RUBRIC
+        assert list(scorer.rubric.categories) == ['data_ai', 'Data_AI']
+    
+    def test_invalid_rubric(self, tmp_path):
+        """Test that malformed rubrics are rejected."""
+        rubric = ProposalScorer.default_rubric().to_dict()
+        rubric['categories']['business_case']['weight'] = 50
+        with pytest.raises(RubricError, match='sum to 100'):
+            CompiledRubric(rubric)
+        
+        rubric['categories']['business_case'] = {'weight': 25, 'keywords': []}
+        with pytest.raises(RubricError, match='keywords'):
+            CompiledRubric(rubric)
+        
+        with pytest.raises(RubricError):
+            load_rubric(str(tmp_path / 'missing.json'))
+        
+        compiled = ProposalScorer.default_rubric()
+        with pytest.raises(AttributeError):
+            compiled.name = 'changed'
+    
+    def test_reload(self, tmp_path, sample_proposal):
+        """Test that file changes are compiled once and swapped in."""
+        path = tmp_path / 'region.json'
+        self.write_rubric(path, risk_weight=10)
+        assert load_rubric(str(path)) is load_rubric(str(path))
+        
+        scorer = ProposalScorer(tokenizer='regex', rubric=str(path), rubric_check_interval=0)
+        before = scorer.rubric
+        
+        self.write_rubric(path, risk_weight=4)
+        results = scorer.score_proposal(sample_proposal)
+        
+        assert scorer.rubric is not before
+        assert scorer.rubric is load_rubric(str(path))
+        assert results['category_details']['risk_management']['max_score'] == 4
+    
+    def test_broken_edit_keeps_rubric(self, tmp_path, sample_proposal):
+        """Test that an invalid edit leaves the previous rubric in use."""
+        path = tmp_path / 'region.json'
+        self.write_rubric(path)
+        scorer = ProposalScorer(tokenizer='regex', rubric=str(path), rubric_check_interval=0)
+        before = scorer.rubric
+        
+        path.write_text('{"categories": ')
+        scorer.score_proposal(sample_proposal)
+        
+        assert scorer.rubric is before
+        assert scorer.rubric_error
+    
+    def test_multiple_rubrics(self, tmp_path, comprehensive_proposal):
+        """Test that one pass over several rubrics matches separate runs."""
+        path = tmp_path / 'utility.json'
+        self.write_rubric(path, risk_weight=15, recommendation='List eligible rebates.')
+        rubrics = {'corporate': None, 'utility': str(path)}
+        scorer = ProposalScorer(tokenizer='regex', cache=ResultCache())
+        
+        results = scorer.score_proposal(comprehensive_proposal, rubrics=rubrics)
+        
+        assert list(results) == ['corporate', 'utility']
+        for name, rubric in rubrics.items():
+            expected = ProposalScorer(tokenizer='regex', rubric=rubric).score_proposal(
+                comprehensive_proposal
+            )
+            assert results[name].pop('cache') == {'hit': False, 'hits': 0, 'misses': 2}
+            assert results[name] == expected
+        
+        # Results are cached per rubric
+        cached = scorer.score_proposal(comprehensive_proposal, rubrics={'utility': str(path)})
+        assert cached['utility']['cache']['hit']
+    
+    def test_duplicate_rubric_names(self):
+        """Test that rubric names must be unique."""
+        with pytest.raises(RubricError, match='Duplicate'):
+            ProposalScorer().score_proposal('x' * 100, rubrics=[None, None])
+
+
+class TestWordMatching:
+    """Test whole-word and stemmed keyword matching."""
+    
+    TEXT = (
+        "Our capital plan has an asterisk on page two. The new API feeds the "
+        "dispatch board. Staff will see a return. On investment we are clear. "
+        "We track three metrics every week for the pilot team."
+    )
+    
+    def matched(self, match, tokenizer='regex'):
+        results = ProposalScorer(tokenizer=tokenizer, match=match).score_proposal(self.TEXT)
+        return {name: d['keywords_matched'] for name, d in results['category_details'].items()}
+    
+    @pytest.mark.parametrize('tokenizer', ['nltk', 'regex'])
+    def test_whole_words(self, tokenizer):
+        """Test that keywords no longer match inside other words or across sentences."""
+        substring = self.matched('substring', tokenizer)
+        word = self.matched('word', tokenizer)
+        
+        # 'risk' in 'asterisk'; 'api' in both 'capital' and 'API'
+        assert substring['risk_management'] == 1
+        assert word['risk_management'] == 0
+        assert word['technical_readiness'] == 1
+        # 'return on investment' spans two sentences
+        assert word['business_case'] == 0
+        # 'metrics' is a data_foundation keyword and 'metric' is not matched
+        assert word['data_foundation'] == 1
+        assert word['success_metrics'] == 0
+    
+    def test_stems(self):
+        """Test that stem mode matches inflected keywords."""
+        stem = self.matched('stem')
+        
+        # 'metrics' -> 'metric' and 'track' -> 'tracking'
+        assert stem['success_metrics'] == 2
+        assert stem['data_foundation'] == 1
+    
+    def test_word_mode_paths_agree(self, comprehensive_proposal):
+        """Test that streaming and incremental scoring use the same matching."""
+        scorer = ProposalScorer(tokenizer='regex', match='word')
+        expected = scorer.score_proposal(comprehensive_proposal)
+        
+        assert scorer.score_stream(io.StringIO(comprehensive_proposal), chunk_size=64) == expected
+        assert IncrementalScorer(comprehensive_proposal, scorer).result() == expected
+        assert scorer.fingerprint != ProposalScorer(tokenizer='regex').fingerprint
+
+
+def write_pdf(path, pages):
+    """Write a minimal PDF with one Helvetica text block per page."""
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>']
+    kids = ' '.join(f'{4 + 2 * i} 0 R' for i in range(len(pages)))
+    objects.append(f'<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>'.encode())
+    objects.append(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+    for i, text in enumerate(pages):
+        lines = ' '.join(f'({line}) Tj T*' for line in text.split('\n'))
+        stream = f'BT /F1 11 Tf 72 720 Td 14 TL {lines} ET'
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>'.encode()
+        )
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream'.encode())
+    
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f'{number} 0 obj\n'.encode() + body + b'\nendobj\n')
+    xref = out.tell()
+    out.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode())
+    out.write(b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets))
+    out.write(f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n'
+              f'startxref\n{xref}\n%%EOF\n'.encode())
+    path.write_bytes(out.getvalue())
+
+
+class TestDocumentReaders:
+    """Test PDF, DOCX and XLSX ingestion."""
+    
+    PAGES = [
+        'Pilot: dispatch optimization with ROI and cost savings of 30 percent.\n'
+        'Data comes from CRM exports and work order history.',
+        'Security and privacy are handled on premises.\n'
+        'KPI baseline and target are tracked weekly by the team.',
+    ]
+    
+    def test_pdf(self, tmp_path):
+        """Test that PDF pages stream into the scorer."""
+        pytest.importorskip('PyPDF2')
+        path = tmp_path / 'proposal.pdf'
+        write_pdf(path, self.PAGES)
+        scorer = ProposalScorer(tokenizer='regex')
+        
+        chunks = list(read_document(str(path)))
+        
+        assert len(chunks) == 2
+        assert 'dispatch optimization' in chunks[0]
+        assert scorer.score_document(str(path)) == scorer.score_proposal(''.join(chunks))
+    
+    def test_docx_and_xlsx(self, tmp_path):
+        """Test that DOCX paragraphs and XLSX rows are read as sentences."""
+        docx = pytest.importorskip('docx')
+        openpyxl = pytest.importorskip('openpyxl')
+        
+        document = docx.Document()
+        for paragraph in self.PAGES:
+            document.add_paragraph(paragraph)
+        document.save(str(tmp_path / 'proposal.docx'))
+        
+        workbook = openpyxl.Workbook()
+        workbook.active.append(['Metric', 'Baseline', 'Target'])
+        workbook.active.append(['First-time fix rate', 0.71, 0.85])
+        workbook.save(str(tmp_path / 'kpis.xlsx'))
+        
+        text = ''.join(read_document(str(tmp_path / 'proposal.docx')))
+        rows = list(read_document(str(tmp_path / 'kpis.xlsx')))
+        
+        assert text.split('\n\n')[:2] == self.PAGES
+        assert rows == ['Metric Baseline Target.\n', 'First-time fix rate 0.71 0.85.\n']
+        assert ProposalScorer(tokenizer='regex').score_document(str(tmp_path / 'proposal.docx'))
+        assert collect_batch_files(str(tmp_path)) == [
+            str(tmp_path / 'kpis.xlsx'), str(tmp_path / 'proposal.docx')
+        ]
+    
+    def test_document_results_cached(self, tmp_path, monkeypatch):
+        """Test that an unchanged document is a result cache hit, with timings."""
+        pytest.importorskip('PyPDF2')
+        path = tmp_path / 'proposal.pdf'
+        write_pdf(path, self.PAGES)
+        scorer = ProposalScorer(tokenizer='regex', cache=ResultCache(), profile=True)
+        
+        first = scorer.score_document(str(path))
+        
+        def no_read(*args):
+            raise AssertionError("document extracted on a cache hit")
+        
+        monkeypatch.setattr(score_proposal, 'read_document', no_read)
+        second = scorer.score_document(str(path))
+        
+        assert (first.pop('cache')['hit'], second.pop('cache')['hit']) == (False, True)
+        assert 'read_document' in first.pop('timings')['stages']
+        assert 'cache_lookup' in second.pop('timings')['stages']
+        assert first == second
+    
+    def test_text_cache(self, tmp_path):
+        """Test that extracted text is reused until the file changes."""
+        pytest.importorskip('PyPDF2')
+        path = tmp_path / 'proposal.pdf'
+        write_pdf(path, self.PAGES)
+        cache = TextCache(str(tmp_path / 'text'))
+        
+        first = list(read_document(str(path), cache))
+        [entry] = os.listdir(cache.directory)
+        
+        # A hit is read back from the cached text file, not page by page
+        assert list(read_document(str(path), cache)) == [''.join(first)]
+        
+        write_pdf(path, self.PAGES[:1])
+        assert len(list(read_document(str(path), cache))) == 1
+        assert len(os.listdir(cache.directory)) == 2
+        assert entry in os.listdir(cache.directory)
+    
+    def test_text_cache_prunes_in_batches(self, tmp_path, monkeypatch):
+        """Test that the cache directory is scanned once per several writes."""
+        cache = TextCache(str(tmp_path / 'text'), max_entries=20)
+        scans = []
+        scandir = os.scandir
+        
+        def counting_scandir(path):
+            scans.append(path)
+            return scandir(path)
+        
+        monkeypatch.setattr(os, 'scandir', counting_scandir)
+        for i in range(60):
+            with cache.writer(f'entry{i:02d}') as out:
+                out.write(f'text {i}')
+            assert len(os.listdir(cache.directory)) <= 20
+        
+        assert len(scans) <= 60 // 3 + 1
+        assert 'entry59.txt' in os.listdir(cache.directory)
+    
+    def test_damaged_documents_in_batch(self, tmp_path, sample_proposal):
+        """Test that damaged documents become error records, not aborted batches."""
+        pytest.importorskip('PyPDF2')
+        docx = pytest.importorskip('docx')
+        write_pdf(tmp_path / 'broken.pdf', self.PAGES)
+        pdf = (tmp_path / 'broken.pdf').read_bytes()
+        # The first page's content stream points at a missing object
+        (tmp_path / 'broken.pdf').write_bytes(pdf.replace(b'/Contents 5 0 R', b'/Contents 9 9 R'))
+        document = docx.Document()
+        document.add_paragraph(self.PAGES[0])
+        document.save(str(tmp_path / 'full.docx'))
+        (tmp_path / 'truncated.docx').write_bytes((tmp_path / 'full.docx').read_bytes()[:3000])
+        (tmp_path / 'full.docx').unlink()
+        (tmp_path / 'ok.txt').write_text(sample_proposal, encoding='utf-8')
+        
+        with pytest.raises(ReaderError, match='Cannot read PDF'):
+            list(read_document(str(tmp_path / 'broken.pdf')))
+        
+        out = io.StringIO()
+        errors = run_batch(ProposalScorer(tokenizer='regex'),
+                           collect_batch_files(str(tmp_path)), out, workers=2)
+        
+        records = {os.path.basename(r['file']): r
+                   for r in map(json.loads, out.getvalue().splitlines())}
+        assert errors == 2
+        assert 'Cannot read PDF' in records['broken.pdf']['error']
+        assert 'Cannot read DOCX' in records['truncated.docx']['error']
+        assert 'total_score' in records['ok.txt']
+    
+    def test_unsupported(self, tmp_path):
+        """Test that unknown formats are rejected."""
+        path = tmp_path / 'proposal.odt'
+        path.write_bytes(b'')
+        
+        with pytest.raises(ReaderError, match='Unsupported'):
+            ProposalScorer().score_document(str(path))
+
+
+class TestContradictions:
+    """Test sentence-level contradiction detection."""
+    
+    TEXT = (
+        "Data collection is ready and available today for the pilot team. "
+        "We are willing to thread a needle and scan each form. "
+        "Our data collection is not ready yet and lacks an owner. "
+        "We will use existing data but the data is not ready."
+    )
+    
+    @pytest.mark.parametrize('match', ['substring', 'word', 'stem'])
+    def test_findings(self, match):
+        """Test whole-word cues, cross-sentence conflicts and ranking."""
+        scorer = ProposalScorer(tokenizer='regex', match=match)
+        findings = scorer.score_proposal(self.TEXT)['contradictions']
+        
+        # 'willing', 'needle' and 'scan' contain cues but are not claims
+        assert 2 not in [f['sentence_num'] for f in findings]
+        conflict, mixed = findings
+        assert conflict['type'] == 'conflicting_claims'
+        assert conflict['topic'] == 'data_foundation'
+        assert (conflict['sentence_num'], conflict['related_sentence_num']) == (1, 3)
+        assert mixed['type'] == 'mixed_signals'
+        assert mixed['sentence_num'] == 4
+        assert conflict['strength'] > mixed['strength']
+    
+    def test_paths_agree(self, comprehensive_proposal):
+        """Test that streaming and incremental scoring report the same findings."""
+        scorer = ProposalScorer(tokenizer='regex')
+        text = comprehensive_proposal + ' ' + self.TEXT
+        expected = scorer.score_proposal(text)
+        
+        assert expected['contradictions']
+        assert scorer.score_stream(io.StringIO(text), chunk_size=64) == expected
+        assert IncrementalScorer(text, scorer).result() == expected
+
+
+class TestCorpusStore:
+    """Test empirical percentiles from a corpus of earlier results."""
+    
+    def results(self, sample_proposal, comprehensive_proposal):
+        scorer = ProposalScorer(tokenizer='regex')
+        texts = [sample_proposal, comprehensive_proposal, comprehensive_proposal[:400]]
+        return scorer, [scorer.score_proposal(text) for text in texts]
+    
+    def test_percentiles(self, tmp_path, sample_proposal, comprehensive_proposal):
+        """Test ranks, deduplication by key and the minimum corpus size."""
+        scorer, results = self.results(sample_proposal, comprehensive_proposal)
+        corpus = CorpusStore(str(tmp_path / 'corpus.sqlite3'), min_size=4)
+        
+        assert corpus.add_many([('a', results[0]), ('b', results[1])], scorer.rubric) == 2
+        assert corpus.percentile(50, scorer.rubric) is None
+        assert not corpus.add(results[0], scorer.rubric, 'a')
+        corpus.add(results[2], scorer.rubric)
+        corpus.add(results[2], scorer.rubric)
+        
+        scores = sorted(r['total_score'] for r in results + results[2:])
+        assert list(corpus.sorted_scores(scorer.rubric)) == scores
+        # Ties count half: the two copies of the shortest proposal
+        assert corpus.percentile(results[2]['total_score'], scorer.rubric) == 25.0
+        assert corpus.percentile(scores[-1] + 1, scorer.rubric) == 100.0
+        
+        # A second handle sees the appended rows and ranks with them
+        scorer.corpus = CorpusStore(corpus.path, min_size=4)
+        ranked = scorer.score_proposal(sample_proposal)
+        assert ranked['corpus_size'] == 4
+        assert ranked['percentile'].endswith('(of 4 scored proposals)')
+        assert set(ranked['category_percentiles']) == set(scorer.rubric.categories)
+    
+    def test_batches_merge_and_refresh(self, tmp_path, sample_proposal, comprehensive_proposal):
+        """Test merged batches and rate-limited checks for other writers."""
+        scorer, results = self.results(sample_proposal, comprehensive_proposal)
+        path = str(tmp_path / 'corpus.sqlite3')
+        corpus = CorpusStore(path, min_size=1, refresh_interval=60)
+        corpus.add(results[1], scorer.rubric)
+        assert list(corpus.sorted_scores(scorer.rubric)) == [results[1]['total_score']]
+        
+        corpus.add_many([(None, result) for result in results * 3], scorer.rubric)
+        scores = sorted(r['total_score'] for r in results * 3 + results[1:2])
+        assert list(corpus.sorted_scores(scorer.rubric)) == scores
+        assert score_proposal._merge_sorted(array('d', [1, 3, 3, 5]), [0, 3, 6]) == \
+            array('d', [0, 1, 3, 3, 3, 5, 6])
+        
+        statements = []
+        corpus._db().set_trace_callback(statements.append)
+        for _ in range(5):
+            corpus.rank(results[0], scorer.rubric)
+        assert not any('MAX(id)' in statement for statement in statements)
+        
+        # Another writer's rows are seen once the refresh interval has passed
+        CorpusStore(path).add(results[0], scorer.rubric)
+        assert corpus.rank(results[0], scorer.rubric)['corpus_size'] == 10
+        corpus.refresh_interval = 0
+        assert corpus.rank(results[0], scorer.rubric)['corpus_size'] == 11
+    
+    def test_analyze(self, tmp_path, capsys, sample_proposal, comprehensive_proposal):
+        """Test importing batch output and reporting distributions."""
+        scorer, results = self.results(sample_proposal, comprehensive_proposal)
+        batch = tmp_path / 'results.jsonl'
+        batch.write_text(''.join(
+            json.dumps({'file': f'p{i}.txt', **result}) + '\n'
+            for i, result in enumerate(results)
+        ) + json.dumps({'file': 'bad.txt', 'error': 'too short'}) + '\n')
+        db = str(tmp_path / 'corpus.sqlite3')
+        
+        score_proposal.main(['analyze', db, '--import', str(batch), '--import', str(batch)])
+        out = capsys.readouterr()
+        
+        assert 'Imported 3 results' in out.err
+        assert 'Imported 0 results' in out.err
+        assert 'default' in out.out and 'change_management' in out.out
+        [report] = CorpusStore(db).analyze()
+        assert report['proposals'] == 3
+        assert report['total_score']['max'] == max(r['total_score'] for r in results)
+        assert list(report['category_scores']) == list(scorer.rubric.categories)
+
+
+class TestDuplicateIndex:
+    """Test near-duplicate detection in front of scoring."""
+    
+    def test_near_duplicate(self, tmp_path, sample_proposal, comprehensive_proposal):
+        """Test that an edited resubmission is flagged and its result reused."""
+        index = DuplicateIndex(str(tmp_path / 'dedup.sqlite3'))
+        scorer = ProposalScorer(tokenizer='regex', cache=ResultCache(), dedup=index,
+                                reuse_duplicates=0.8)
+        original = scorer.score_proposal(sample_proposal, source='branch-a.txt')
+        edited = sample_proposal.replace('the', 'our', 2) + '\nReviewed by the Denver branch.'
+        
+        result = scorer.score_proposal(edited, source='branch-b.txt')
+        
+        assert 'duplicate' not in original
+        assert result['duplicate']['source'] == 'branch-a.txt'
+        assert 0.8 <= result['duplicate']['similarity'] < 1
+        assert result['duplicate']['reused'] and result['cache']['hit']
+        assert result['total_score'] == original['total_score']
+        assert 'duplicate' not in scorer.score_proposal(comprehensive_proposal)
+        assert len(index) == 3
+    
+    def test_report_only(self, tmp_path, sample_proposal):
+        """Test that without reuse a resubmission is rescored, and that the
+        on-disk format is checked when reopened."""
+        path = str(tmp_path / 'dedup.sqlite3')
+        scorer = ProposalScorer(tokenizer='regex', dedup=DuplicateIndex(path))
+        scorer.score_proposal(sample_proposal, source='first.txt')
+        
+        # A fresh handle (e.g. the next CLI run) finds the earlier submission
+        scorer.dedup = DuplicateIndex(path)
+        result = scorer.score_proposal(sample_proposal)
+        assert result['duplicate']['similarity'] == 1.0
+        assert not result['duplicate']['reused']
+        
+        with pytest.raises(ValueError, match='different parameters'):
+            len(DuplicateIndex(path, shingle_size=5))
+    
+    @pytest.mark.parametrize('num_perm,bands', [(512, 512), (128, 0), (128, 3)])
+    def test_invalid_bands(self, tmp_path, num_perm, bands):
+        """Test that band counts the key format cannot hold are rejected up front."""
+        with pytest.raises(ValueError, match='bands'):
+            DuplicateIndex(str(tmp_path / 'dedup.sqlite3'), num_perm=num_perm, bands=bands)
+
+
+class TestCompactResults:
+    """Test slotted result objects and bulk output formats."""
+    
+    def test_round_trip(self, tmp_path, sample_proposal):
+        """Test that ScoreResult rebuilds the exact result dict."""
+        scorer = ProposalScorer(tokenizer='regex', cache=ResultCache(),
+                                dedup=DuplicateIndex(str(tmp_path / 'dedup.sqlite3')))
+        scorer.score_proposal(sample_proposal)
+        result = scorer.score_proposal(sample_proposal)
+        
+        compact = ScoreResult.from_dict(result)
+        
+        assert 'duplicate' in result and 'cache' in result
+        assert compact.to_dict() == result
+        assert ScoreResult.from_dict(json.loads(json.dumps(result))) == compact
+        assert not hasattr(compact, '__dict__')
+        assert dict(zip(compact.columns(), compact.row()))['grade'] == result['grade']
+    
+    def test_shared_limit(self, monkeypatch, sample_proposal):
+        """Test that the shared name and text table starts over when full."""
+        monkeypatch.setattr(ScoreResult, 'SHARED_LIMIT', 4)
+        monkeypatch.setattr(ScoreResult, '_shared', {})
+        result = ProposalScorer(tokenizer='regex').score_proposal(sample_proposal)
+        
+        compacts = []
+        for i in range(10):
+            result['recommendations'] = [f'Recommendation {i}.']
+            compacts.append(ScoreResult.from_dict(result))
+        
+        assert len(ScoreResult._shared) <= 4
+        assert compacts[0].recommendations == ('Recommendation 0.',)
+        assert compacts[-1].to_dict() == result
+    
+    def test_batch_closes_writer_on_error(self, monkeypatch):
+        """Test that rows held by the writer are flushed when a batch fails."""
+        def failing_pool(*args):
+            yield 'a.txt', {'error': 'unreadable'}
+            raise RuntimeError('pool died')
+        
+        monkeypatch.setattr(score_proposal, '_run_pool', failing_pool)
+        out = io.StringIO()
+        
+        with pytest.raises(RuntimeError):
+            run_batch(ProposalScorer(tokenizer='regex'), ['a.txt'], out, output_format='csv')
+        
+        assert out.getvalue().splitlines() == ['file,error', 'a.txt,unreadable']
+    
+    def test_csv_batch(self, tmp_path, sample_proposal):
+        """Test flat CSV rows, with errors before the first result."""
+        import csv
+        (tmp_path / 'a.txt').write_text('too short', encoding='utf-8')
+        (tmp_path / 'b.txt').write_text(sample_proposal, encoding='utf-8')
+        out = io.StringIO()
+        scorer = ProposalScorer(tokenizer='regex')
+        
+        errors = run_batch(scorer, collect_batch_files(str(tmp_path)), out,
+                           ordered=True, output_format='csv')
+        
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        assert errors == 1
+        assert [row['file'].rsplit(os.sep, 1)[-1] for row in rows] == ['a.txt', 'b.txt']
+        assert 'too short' in rows[0]['error'] and rows[0]['total_score'] == ''
+        expected = scorer.score_proposal(sample_proposal)
+        assert float(rows[1]['total_score']) == expected['total_score']
+        assert int(rows[1]['data_foundation_keywords']) == \
+            expected['category_details']['data_foundation']['keywords_matched']
+
+
+class TestReports:
+    """Test text, Markdown and HTML report rendering."""
+    
+    TEXT = (
+        "Data collection is ready and available today for the <pilot> team. "
+        "Our data collection is not ready yet and lacks an owner | for now. "
+        "We will use existing data but the data is not ready."
+    )
+    
+    def test_text_report(self, sample_proposal):
+        """Test that the text report renders, including the interpretation."""
+        scorer = ProposalScorer(tokenizer='regex')
+        results = scorer.score_proposal(sample_proposal)
+        
+        report = scorer.format_report(results)
+        
+        assert report.startswith('=' * 60 + '\nHVAC AI ADOPTION PROPOSAL SCORE')
+        assert f"Grade {results['grade']} - " in report
+        assert f"Overall Score: {results['total_score']}/100" in report
+        assert report.endswith('pilot success\n' + '=' * 60)
+    
+    def test_escaping(self):
+        """Test that findings are escaped per format and conflicts shown."""
+        scorer = ProposalScorer(tokenizer='regex')
+        results = scorer.score_proposal(self.TEXT)
+        
+        text = scorer.format_report(results)
+        markdown = scorer.format_report(results, 'markdown', rubric='default')
+        html = scorer.format_report(results, 'html')
+        
+        assert 'conflicts with sentence 2:' in text
+        assert '# HVAC AI Adoption Proposal Score (default)' in markdown
+        assert r'\<pilot\>' in markdown and r'owner \| for now' in markdown
+        assert '&lt;pilot&gt;' in html and '<pilot>' not in html
+        assert html.rstrip().endswith('</html>')
+        with pytest.raises(ValueError, match='Unknown report format'):
+            scorer.format_report(results, 'pdf')
+    
+    def test_batch_reports(self, tmp_path, sample_proposal):
+        """Test that batch workers write one report per file, mirroring the tree."""
+        (tmp_path / 'in' / 'north').mkdir(parents=True)
+        (tmp_path / 'in' / 'a.txt').write_text(sample_proposal, encoding='utf-8')
+        (tmp_path / 'in' / 'north' / 'b.txt').write_text(sample_proposal, encoding='utf-8')
+        out = io.StringIO()
+        scorer = ProposalScorer(tokenizer='regex')
+        
+        run_batch(scorer, collect_batch_files(str(tmp_path / 'in')), out, workers=2,
+                  report_dir=str(tmp_path / 'reports'), report_format='html')
+        
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        expected = scorer.format_report(scorer.score_proposal(sample_proposal), 'html')
+        assert sorted(os.path.relpath(r['report'], tmp_path) for r in records) == [
+            os.path.join('reports', 'a.txt.html'), os.path.join('reports', 'north', 'b.txt.html')
+        ]
+        report = tmp_path / 'reports' / 'north' / 'b.txt.html'
+        assert report.read_text(encoding='utf-8') == expected
+    
+    def test_batch_report_names_keep_extension(self, tmp_path, sample_proposal):
+        """Test that a.txt and a.pdf in one directory get separate reports."""
+        pytest.importorskip('PyPDF2')
+        (tmp_path / 'in').mkdir()
+        (tmp_path / 'in' / 'a.txt').write_text(sample_proposal, encoding='utf-8')
+        write_pdf(tmp_path / 'in' / 'a.pdf', TestDocumentReaders.PAGES)
+        out = io.StringIO()
+        
+        errors = run_batch(ProposalScorer(tokenizer='regex'),
+                           collect_batch_files(str(tmp_path / 'in')),
+                           out, workers=2, report_dir=str(tmp_path / 'reports'))
+        
+        reports = {os.path.basename(r['file']): r['report']
+                   for r in map(json.loads, out.getvalue().splitlines())}
+        assert errors == 0
+        assert sorted(os.listdir(tmp_path / 'reports')) == ['a.pdf.txt', 'a.txt.txt']
+        assert reports['a.pdf'].endswith('a.pdf.txt') and reports['a.txt'].endswith('a.txt.txt')
+
+
+class TestWatcher:
+    """Test watch mode: only new or changed files are scored."""
+    
+    @staticmethod
+    def _watcher(tmp_path, **kwargs):
+        (tmp_path / 'intake').mkdir(exist_ok=True)
+        manifest = WatchManifest(str(tmp_path / 'manifest.sqlite3'))
+        kwargs.setdefault('debounce', 0)
+        return ProposalWatcher(ProposalScorer(tokenizer='regex'), str(tmp_path / 'intake'),
+                               manifest, **kwargs)
+    
+    def test_rescores_only_changes(self, tmp_path, sample_proposal, comprehensive_proposal):
+        """Test that touches, restarts and unchanged files are not rescored."""
+        watcher = self._watcher(tmp_path)
+        path = tmp_path / 'intake' / 'a.txt'
+        path.write_text(sample_proposal, encoding='utf-8')
+        (tmp_path / 'intake' / 'notes.md').write_text('ignored', encoding='utf-8')
+        
+        assert [p for p, _ in watcher.poll()] == [str(path)]
+        sidecar = json.loads((tmp_path / 'intake' / 'a.txt.score.json').read_text(encoding='utf-8'))
+        expected = watcher.scorer.score_proposal(sample_proposal)
+        assert sidecar['total_score'] == expected['total_score']
+        assert watcher.poll() == []
+        
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert watcher.poll() == []
+        watcher.close()
+        
+        restarted = self._watcher(tmp_path)
+        assert restarted.poll() == []
+        path.write_text(comprehensive_proposal, encoding='utf-8')
+        [(_, result)] = restarted.poll()
+        assert result['word_count'] > sidecar['word_count']
+        
+        path.unlink()
+        assert restarted.poll() == [(str(path), {'deleted': True})]
+        assert not (tmp_path / 'intake' / 'a.txt.score.json').exists()
+        assert len(restarted.manifest) == 0
+        restarted.close()
+    
+    def test_debounce_and_log(self, tmp_path, sample_proposal):
+        """Test that a file is scored once it settles, into a rolling log."""
+        log = tmp_path / 'scores.jsonl'
+        watcher = self._watcher(tmp_path, debounce=60, log=str(log), max_log_bytes=1)
+        (tmp_path / 'intake' / 'a.txt').write_text(sample_proposal, encoding='utf-8')
+        
+        assert watcher.poll() == []
+        watcher.debounce = 0
+        assert len(watcher.poll()) == 1
+        watcher.close()
+        
+        record = json.loads((tmp_path / 'scores.jsonl.1').read_text(encoding='utf-8'))
+        assert record['file'].endswith('a.txt') and 'total_score' in record
+        assert not log.exists()
+    
+    @pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify is Linux-only')
+    def test_inotify_wakes_on_change(self, tmp_path):
+        """Test that the inotify wait returns early when a file appears."""
+        notify = score_proposal._Inotify()
+        notify.watch(str(tmp_path))
+        try:
+            assert notify.wait(0) is False
+            (tmp_path / 'a.txt').write_text('x', encoding='utf-8')
+            assert notify.wait(5) is True
+            assert notify.wait(0) is False
+        finally:
+            notify.close()
+
+
+class TestMappedScan:
+    """Test scoring plain-text files as memory-mapped bytes."""
+    
+    @pytest.mark.parametrize('variant', ['plain', 'upper', 'crlf', 'quotes', 'accents'])
+    def test_matches_str_path(self, tmp_path, comprehensive_proposal, variant):
+        """Test that score_file matches score_proposal, mapped or not."""
+        text = {
+            'plain': comprehensive_proposal,
+            'upper': comprehensive_proposal.upper(),
+            'crlf': comprehensive_proposal.replace('\n', '\r\n'),
+            'quotes': comprehensive_proposal.replace('. ', '.\u201d \u2014 '),
+            'accents': comprehensive_proposal.replace('data', 'd\u00e1ta'),
+        }[variant]
+        path = tmp_path / 'proposal.txt'
+        path.write_bytes(text.encode('utf-8'))
+        scorer = ProposalScorer(tokenizer='regex', cache=ResultCache())
+        
+        mapped = variant != 'accents'
+        assert score_proposal._bytes_scannable(path.read_bytes()) is mapped
+        result = scorer.score_file(str(path))
+        assert not result['cache']['hit']
+        expected = scorer.score_proposal(path.read_text(encoding='utf-8'))
+        # Both paths key the cache by the same normalized text
+        assert expected.pop('cache')['hit']
+        result.pop('cache')
+        assert result == expected
+    
+    def test_blocks(self, tmp_path, comprehensive_proposal):
+        """Test that results do not depend on where blocks end."""
+        path = tmp_path / 'proposal.txt'
+        path.write_text(comprehensive_proposal * 20, encoding='utf-8')
+        scorer = ProposalScorer(tokenizer='regex')
+        expected = scorer.score_proposal(comprehensive_proposal * 20)
+        
+        blocks = list(score_proposal._mapped_blocks(
+            path.read_bytes(), 0, path.stat().st_size, 4096
+        ))
+        assert len(blocks) > 1 and all(block[-1:].isspace() for block in blocks[:-1])
+        assert scorer._score_chunks(blocks, 1 << 30) == expected
+        assert scorer.score_file(str(path)) == expected
+
+
+class TestVocabulary:
+    """Test interned token ids and compact tokenized documents."""
+    
+    def test_encode_and_count(self):
+        """Test that ids are stable and counts match the stopword filter."""
+        vocabulary = Vocabulary()
+        words = ['the', 'pilot', 'will', 'cut', 'the', 'callbacks', '8.2', '-']
+        ids = vocabulary.encode(words)
+        assert ids.typecode == 'I' and len(vocabulary) == 7
+        assert list(vocabulary.encode(['pilot', 'the'])) == [ids[1], ids[0]]
+        assert [vocabulary.words[i] for i in ids] == words
+        assert vocabulary.id('unseen') is None
+        assert vocabulary.count(ids) == ProposalScorer()._count_words(words) == 3
+    
+    def test_stopwords_reload(self, monkeypatch):
+        """Test that counted flags are recomputed when stopwords change."""
+        vocabulary = Vocabulary()
+        ids = vocabulary.encode(['the', 'pilot', 'cut', 'callbacks'])
+        assert vocabulary.count(ids) == 3
+        
+        monkeypatch.setattr(score_proposal, '_nltk_stopwords', lambda: frozenset({'pilot'}))
+        assert vocabulary.count(ids) == 3
+        assert vocabulary.count(vocabulary.encode(['the', 'pilot'])) == 1
+    
+    def test_shared_limit(self, monkeypatch):
+        """Test that the shared vocabulary is renewed once it is full."""
+        monkeypatch.setattr(Vocabulary, 'SHARED_LIMIT', 50)
+        monkeypatch.setattr(score_proposal, '_vocabulary', None)
+        tokenizer = RegexTokenizer()
+        
+        def tokenize(text):
+            return Document.tokenize(text, tokenizer.sentence_spans(text), tokenizer)
+        
+        first = tokenize(' '.join(f'token{i}' for i in range(60)) + '.')
+        second = tokenize('a shorter proposal.')
+        
+        assert second.vocabulary is not first.vocabulary
+        assert list(second.words()) == second.vocabulary.words == ['a', 'shorter', 'proposal']
+        assert list(first.words())[:2] == ['token0', 'token1']
+        assert tokenize('another one.').vocabulary is second.vocabulary
+    
+    def test_normalized(self):
+        """Test that normalized forms are interned once per token."""
+        vocabulary = Vocabulary()
+        stem = score_proposal._porter_stem()
+        ids = vocabulary.encode(['metrics', 'metric', 'scheduling'])
+        stems = vocabulary.normalized(ids, stem)
+        assert [vocabulary.words[i] for i in stems] == ['metric', 'metric', 'schedul']
+        assert stems[0] == stems[1] == ids[1]
+    
+    @pytest.mark.parametrize('by_sentence', [False, True])
+    def test_document(self, comprehensive_proposal, by_sentence):
+        """Test that a Document holds the same tokens as whole-text tokenization."""
+        text = comprehensive_proposal.lower()
+        tokenizer = RegexTokenizer()
+        spans = tokenizer.sentence_spans(text)
+        document = Document.tokenize(text, spans, tokenizer, by_sentence=by_sentence, block=256)
+        assert list(document.words()) == tokenizer.words(text)
+        assert list(document.spans) == spans and document.spans[3] == spans[3]
+        if by_sentence:
+            starts = document.sentence_starts
+            assert len(starts) == len(spans) + 1
+            sentence = list(document.words())[starts[2]:starts[3]]
+            assert sentence == tokenizer.words(text[slice(*spans[2])])
+        else:
+            assert document.sentence_starts is None
+    
+    def test_token_index(self):
+        """Test phrase lookups that must not cross sentences."""
+        text = 'we track first call. resolution rates drop. first call resolution is tracked.'
+        tokenizer = RegexTokenizer()
+        spans = tokenizer.sentence_spans(text)
+        document = Document.tokenize(text, spans, tokenizer, by_sentence=True)
+        index = score_proposal.TokenIndex(document)
+        assert index.phrase_sentences(['first', 'call']) == {0, 2}
+        assert index.phrase_sentences(['call', 'resolution']) == {2}
+        assert index.phrase_sentences(['call', 'unseen']) == set()
+        assert list(index.positions('first')) == [2, 7]
+        assert index.sentence_of(7) == 2
+        assert len(SentenceSpans([(0, 20), (21, 43)])) == 2
+
+
+class TestSections:
+    """Test section-aware scoring with per-section memoization."""
+    
+    def test_split(self, comprehensive_proposal):
+        """Test splitting at colon and Markdown headings."""
+        sections = split_sections(comprehensive_proposal)
+        assert [heading for heading, _ in sections] == [
+            None, 'Pilot Scope', 'ROI Analysis', 'Data Sources', 'Security & Privacy',
+            'KPIs & Baselines', 'Timeline & Feasibility', 'Team & Resources'
+        ]
+        assert ''.join(text for _, text in sections) == comprehensive_proposal
+        assert split_sections('## Data ##\nBudget: $5k\n- Includes:\nx') == [
+            ('Data', '## Data ##\nBudget: $5k\n- Includes:\nx')
+        ]
+    
+    def test_matches_whole_text(self):
+        """Test that sections ending in full sentences score like the whole text."""
+        text = '\n\n'.join(
+            f"# Part {i}\nThe data platform tracks the kpi baseline for route {i}. "
+            f"We will not need training for stakeholder support." for i in range(6)
+        )
+        expected = ProposalScorer(tokenizer='regex').score_proposal(text)
+        result = ProposalScorer(tokenizer='regex', sections=True).score_proposal(text)
+        sections = result.pop('sections')
+        assert result == expected
+        assert [section['heading'] for section in sections] == [f'Part {i}' for i in range(6)]
+        assert sum(section['sentence_count'] for section in sections) == expected['sentence_count']
+    
+    @pytest.mark.parametrize('match', ['substring', 'word'])
+    def test_memoized(self, comprehensive_proposal, match):
+        """Test that unchanged sections are read from the section cache."""
+        scorer = ProposalScorer(tokenizer='regex', match=match, sections=True)
+        scorer.score_proposal(comprehensive_proposal)
+        assert scorer.section_cache.stats() == {'hits': 0, 'misses': 8}
+        
+        edited = comprehensive_proposal.replace('Regular security audits', 'No security audits yet')
+        result = scorer.score_proposal(edited)
+        assert scorer.section_cache.stats() == {'hits': 7, 'misses': 9}
+        fresh = ProposalScorer(tokenizer='regex', match=match, sections=True)
+        assert result == fresh.score_proposal(edited)
+        assert 'SECTION SCORES' in scorer.format_report(result)
+        assert '<h2>Section Scores</h2>' in scorer.format_report(result, 'html')
+    
+    def test_rubrics(self, comprehensive_proposal):
+        """Test section scoring against several rubrics at once."""
+        scorer = ProposalScorer(tokenizer='regex', sections=True)
+        rubric = {'security': {'weight': 100, 'keywords': ['security', 'private ai']}}
+        results = scorer.score_proposal(comprehensive_proposal,
+                                        rubrics={'default': None, 'security': rubric})
+        assert results['default'] == scorer.score_proposal(comprehensive_proposal)
+        security = {section['heading']: section['total_score']
+                    for section in results['security']['sections']}
+        assert security['Security & Privacy'] > 0 and security['Team & Resources'] == 0
+
+
+class TestBatchPipeline:
+    """Test the staged read -> score -> write batch pipeline."""
+    
+    @staticmethod
+    def _proposals(tmp_path, sample_proposal, comprehensive_proposal):
+        for i in range(12):
+            text = sample_proposal if i % 2 else comprehensive_proposal
+            (tmp_path / f'p{i:02d}.txt').write_text(text, encoding='utf-8')
+        (tmp_path / 'short.txt').write_text('too short', encoding='utf-8')
+        (tmp_path / 'latin1.txt').write_bytes(b'\xe9t\xe9 ' * 50)
+        return collect_batch_files(str(tmp_path))
+    
+    def test_matches_run_batch(self, tmp_path, sample_proposal, comprehensive_proposal):
+        """Test that the pipeline writes the same records as run_batch."""
+        paths = self._proposals(tmp_path, sample_proposal, comprehensive_proposal)
+        scorer = ProposalScorer(tokenizer='regex')
+        expected = io.StringIO()
+        assert run_batch(scorer, paths, expected) == 2
+        
+        out = io.StringIO()
+        pipeline = BatchPipeline(scorer, out, readers=3, workers=2, queue_size=2,
+                                 result_queue_size=3, write_batch=4)
+        assert asyncio.run(pipeline.run(paths)) == 2
+        
+        def records(output):
+            return sorted(output.getvalue().splitlines())
+        assert records(out) == records(expected)
+    
+    def test_stats(self, tmp_path, sample_proposal, comprehensive_proposal):
+        """Test per-stage counts and that queues never exceed their size."""
+        paths = self._proposals(tmp_path, sample_proposal, comprehensive_proposal)
+        pipeline = BatchPipeline(ProposalScorer(tokenizer='regex'), io.StringIO(),
+                                 readers=2, queue_size=2, result_queue_size=3, write_batch=4)
+        asyncio.run(pipeline.run(paths))
+        
+        stats = pipeline.stats()
+        assert (stats['files'], stats['errors']) == (14, 2)
+        items = [stats['stages'][stage]['items'] for stage in ('read', 'score', 'write')]
+        assert items == [14, 13, 14]
+        assert stats['stages']['read']['concurrency'] == 2
+        assert stats['stages']['write']['batches'] >= 4
+        for queue in stats['queues'].values():
+            assert 0 < queue['max_depth'] <= queue['size']
+        assert 'queue texts' in pipeline.format_stats()
+    
+    def test_record_and_reports(self, tmp_path, sample_proposal):
+        """Test recording to a corpus store and rendering reports."""
+        (tmp_path / 'in').mkdir()
+        for name in ('a.txt', 'b.txt'):
+            (tmp_path / 'in' / name).write_text(sample_proposal, encoding='utf-8')
+        scorer = ProposalScorer(tokenizer='regex')
+        corpus = CorpusStore(str(tmp_path / 'corpus.sqlite3'))
+        threads = []
+        add_many = corpus.add_many
+        
+        def recording_add_many(*args):
+            threads.append(threading.get_ident())
+            return add_many(*args)
+        
+        corpus.add_many = recording_add_many
+        pipeline = BatchPipeline(scorer, io.StringIO(), record=corpus,
+                                 report_dir=str(tmp_path / 'reports'), report_format='markdown')
+        assert asyncio.run(pipeline.run(collect_batch_files(str(tmp_path / 'in')))) == 0
+        
+        assert threads and threading.get_ident() not in threads
+        assert len(corpus.sorted_scores(scorer.rubric)) == 2
+        assert sorted(p.name for p in (tmp_path / 'reports').iterdir()) == ['a.txt.md', 'b.txt.md']
+    
+    def test_unexpected_reader_errors_become_records(self, tmp_path, monkeypatch, sample_proposal):
+        """Test that any reader exception becomes an error record."""
+        (tmp_path / 'a.txt').write_text(sample_proposal, encoding='utf-8')
+        (tmp_path / 'b.txt').write_text(sample_proposal, encoding='utf-8')
+        read = score_proposal._read_proposal
+        
+        def flaky_read(path, text_cache):
+            if path.endswith('b.txt'):
+                raise KeyError('word/document.xml')
+            return read(path, text_cache)
+        
+        monkeypatch.setattr(score_proposal, '_read_proposal', flaky_read)
+        out = io.StringIO()
+        pipeline = BatchPipeline(ProposalScorer(tokenizer='regex'), out)
+        
+        assert asyncio.run(pipeline.run(collect_batch_files(str(tmp_path)))) == 1
+        records = {os.path.basename(r['file']): r
+                   for r in map(json.loads, out.getvalue().splitlines())}
+        assert records['b.txt'] == {'file': records['b.txt']['file'],
+                                    'error': "KeyError: 'word/document.xml'"}
+        assert 'total_score' in records['a.txt']
+    
+    def test_rejects_buffered_formats(self, tmp_path, capsys):
+        """Test that Parquet, which holds every row until the end, is rejected."""
+        with pytest.raises(OutputError, match='parquet'):
+            BatchPipeline(ProposalScorer(), io.BytesIO(), output_format='parquet')
+        with pytest.raises(SystemExit):
+            score_proposal.main(['--batch', str(tmp_path), '--pipeline', '--format', 'parquet'])
+        assert '--pipeline needs ndjson, csv or msgpack' in capsys.readouterr().out
+    
+    def test_rejects_empty_queues(self):
+        """Test that stage sizes must be at least 1."""
+        with pytest.raises(ValueError, match='queue_size'):
+            BatchPipeline(ProposalScorer(), io.StringIO(), queue_size=0)
+
+
 # Test that can be run independently
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])